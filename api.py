@@ -1,8 +1,19 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+import os
 import subprocess
+import threading
 import time
 
+from rvc.lib.model_catalog import DEFAULT_ROOTS, ModelCatalog
+from rvc.train.process.model_information import (
+    model_information as read_model_information,
+)
+
 app = FastAPI()
+catalog = ModelCatalog()
+# Refreshes update the shared entries and rewrite the catalog file
+catalog_lock = threading.Lock()
 
 
 # Helper function to execute commands
@@ -63,11 +74,64 @@ async def index(request: Request):
     return execute_command(command)
 
 
-# Model Information
+# Model Information (answered from the model catalog, without a subprocess)
 @app.post("/model_information")
 async def model_information(request: Request):
-    command = ["python", "main.py", "model_information"] + await request.json()
-    return execute_command(command)
+    args = await request.json()
+    try:
+        pth_path = args[args.index("--pth_path") + 1]
+    except (ValueError, IndexError):
+        return {"error": "--pth_path is required"}
+    pth_path = model_path(pth_path)
+    try:
+        # A catalog miss reads the file's header; keep it off the loop
+        output = await run_in_threadpool(describe_model, pth_path)
+        return {"output": output, "error": ""}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def model_path(path):
+    """path resolved, which must lie within a configured model root."""
+    resolved = os.path.realpath(path)
+    for root in DEFAULT_ROOTS:
+        root = os.path.realpath(root)
+        if resolved == root or resolved.startswith(root + os.sep):
+            return resolved
+    raise HTTPException(
+        status_code=400, detail=f"{path} is not inside a model directory"
+    )
+
+
+def model_roots(roots):
+    """The requested roots, each of which must lie within a configured model root."""
+    return [model_path(root) for root in roots.split(",")]
+
+
+def describe_model(pth_path):
+    with catalog_lock:
+        return read_model_information(pth_path, catalog)
+
+
+def search_models(**kwargs):
+    with catalog_lock:
+        return catalog.search(**kwargs)
+
+
+# Model list and search
+@app.get("/models")
+async def models(
+    query: str = "", roots: str = "", version: str = "", sr: str = "", f0: str = ""
+):
+    # A refresh stats every file and may load new models; keep it off the loop
+    return await run_in_threadpool(
+        search_models,
+        query=query,
+        roots=model_roots(roots) if roots else DEFAULT_ROOTS,
+        version=version or None,
+        sr=sr or None,
+        f0=int(f0) if f0 else None,
+    )
 
 
 # Model Fusion
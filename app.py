@@ -5,8 +5,10 @@ from celery_worker import celery_app
 from celery_task import tts_task, process_audio_task
 from fastapi.middleware.cors import CORSMiddleware
 from youtube_utils import get_video_duration, validate_youtube_exists
+from metrics_utils import metrics_asgi_app
 
 app = FastAPI()
+app.mount("/metrics", metrics_asgi_app(celery_app.conf.broker_url))
 
 app.add_middleware(
     CORSMiddleware,
@@ -1,10 +1,6 @@
 import os
 import asyncio
-import tempfile
-import shutil
 import subprocess
-import threading
-import time
 import traceback
 import datetime
 from typing import Tuple
@@ -13,6 +9,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel
 from spleeter.separator import Separator
+from scratch_utils import ScratchSpace, ScratchQuotaExceeded
 
 app = FastAPI()
 
@@ -100,30 +97,19 @@ async def spleeter_separate(audio_path: str, temp_dir: str) -> Tuple[str, str]:
     return vocal_path, accompaniment_path
 
 
-# 중복 삭제 방지를 위한 집합과 락
-deleted_dirs = set()
-lock = threading.Lock()
+# 작업 디렉터리: TTL + 디스크 쿼터 관리, 단일 reaper 스레드가 정리
+scratch = ScratchSpace.from_env()
+STREAM_GRACE_SECONDS = float(os.environ.get("SCRATCH_STREAM_GRACE_SECONDS", "60"))
 
-# 중복 방지 안전 삭제 함수
-def safe_cleanup(cleanup_dir: str):
-    with lock:
-        if cleanup_dir in deleted_dirs:
-            return
-        deleted_dirs.add(cleanup_dir)
-    
-    time.sleep(60)  # 1분 대기 후 삭제
-    print(f"[CLEANUP] Deleting temp dir: {cleanup_dir}")
-    shutil.rmtree(cleanup_dir, ignore_errors=True)
-
-async def async_stream_file_and_cleanup(file_path: str, cleanup_dir: str):
+async def async_stream_file_and_cleanup(file_path: str, job_id: str):
     print(f"▶️ [STREAM] Start streaming: {file_path}")
     try:
         with open(file_path, "rb") as f:
             while chunk := f.read(1024 * 1024):  # 1MB 단위 스트리밍
                 yield chunk
     finally:
-        print(f"🧹 [CLEANUP] Trigger cleanup for: {cleanup_dir}")
-        threading.Thread(target=safe_cleanup, args=(cleanup_dir,)).start()
+        print(f"🧹 [CLEANUP] Schedule cleanup for job: {job_id}")
+        scratch.expire(job_id, STREAM_GRACE_SECONDS)
 
 
 
@@ -131,7 +117,12 @@ async def async_stream_file_and_cleanup(file_path: str, cleanup_dir: str):
 async def process_audio(youtube: YoutubeURL):
     async with spleeter_lock:  # 🔐 오직 1명만 접근 가능
         print("✅ [STEP1] 유튜브 URL 수신:", youtube.url)
-        temp_dir = tempfile.mkdtemp()
+        try:
+            # 처리 중에는 만료되지 않고, 응답 직전부터 TTL 이 흐른다
+            job_id, temp_dir = scratch.create_job(hold=True)
+        except ScratchQuotaExceeded as e:
+            print("⛔ [SCRATCH] 작업 거절:", e)
+            raise HTTPException(status_code=503, detail="Server is busy. Please try again later.", headers={"Retry-After": "30"})
         print("✅ [STEP2] 임시 디렉토리 생성:", temp_dir)
         try:
             input_audio = await asyncio.get_event_loop().run_in_executor(
@@ -149,15 +140,20 @@ async def process_audio(youtube: YoutubeURL):
             base_name = os.path.splitext(os.path.basename(input_audio))[0]
             print(f"✅ [STEP6] 응답 준비 완료: {base_name}")
 
+            scratch.start_ttl(job_id)
             return {
-                "vocal_stream_url": f"/stream/vocal/{os.path.basename(temp_dir)}/{base_name}",
-                "accompaniment_stream_url": f"/stream/accompaniment/{os.path.basename(temp_dir)}/{base_name}"
+                "vocal_stream_url": f"/stream/vocal/{job_id}/{base_name}",
+                "accompaniment_stream_url": f"/stream/accompaniment/{job_id}/{base_name}"
             }
+        except asyncio.CancelledError:
+            # 클라이언트가 끊긴 경우: hold 된 작업이 남지 않도록 바로 정리
+            scratch.release(job_id)
+            raise
         except Exception as e:
             print("❌ 예외 발생:")
             import traceback
             traceback.print_exc()
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            scratch.release(job_id)
             raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -175,7 +171,10 @@ async def stream_audio(track_type: str, temp_id: str, base_name: str):
         print("⚠️ [ERROR] Invalid track type:", track_type)
         raise HTTPException(status_code=400, detail="Invalid track type")
 
-    temp_base = os.path.join(tempfile.gettempdir(), temp_id)
+    temp_base = scratch.path(temp_id)
+    if temp_base is None or os.path.basename(base_name) != base_name:
+        print("❌ [ERROR] Unknown or expired job:", temp_id)
+        raise HTTPException(status_code=404, detail="File not found.")
     file_path = os.path.join(temp_base, base_name, filename_map[track_type])
 
     print("📂 [CHECK FILE] Looking for:", file_path)
@@ -186,8 +185,9 @@ async def stream_audio(track_type: str, temp_id: str, base_name: str):
 
     print(f"🚀 [STREAM START] Begin streaming: {file_path}")
 
+    scratch.touch(temp_id, STREAM_GRACE_SECONDS)
     return StreamingResponse(
-        async_stream_file_and_cleanup(file_path, temp_base),
+        async_stream_file_and_cleanup(file_path, temp_id),
         media_type="audio/wav"
     )
 
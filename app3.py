@@ -1,26 +1,38 @@
 import os
+import math
+import time
 import asyncio
-import tempfile
-import shutil
 import subprocess
-import threading
-import time
 import traceback
 import datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from typing import Tuple
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from prometheus_client import REGISTRY, Counter, Gauge, make_asgi_app
+from prometheus_client.core import CounterMetricFamily
 from spleeter.separator import Separator
 import tensorflow as tf
+from stream_utils import RangeFileResponse
+from scratch_utils import ScratchSpace, ScratchQuotaExceeded
 
 app = FastAPI()
+app.mount("/metrics", make_asgi_app())
+
+# 다운로드(I/O)는 별도 풀에서 동시에, 분리는 separator 슬롯을 잡은 요청만 실행
+DOWNLOAD_WORKERS = int(os.environ.get("DOWNLOAD_WORKERS", "4"))
+SEPARATOR_SLOTS = int(os.environ.get("SEPARATOR_SLOTS", "1"))
+SEPARATION_QUEUE_MAX = int(os.environ.get("SEPARATION_QUEUE_MAX", "4"))
+
+download_pool = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix="yt-dlp")
 
-# 전역 락: 동시에 하나의 요청만 처리
-spleeter_lock = asyncio.Lock()
-separator_instance = None
-separator_lock = asyncio.Lock()
+QUEUE_DEPTH = Gauge("yass_separation_queue_depth", "Requests admitted but not yet holding a separator slot")
+SEPARATOR_BUSY = Gauge("yass_separator_busy_slots", "Separator slots currently running spleeter")
+SEPARATION_REJECTED = Counter("yass_separation_rejected_total", "Requests rejected with 429 because the separation queue was full")
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -64,19 +76,97 @@ def download_audio_temp(youtube_url: str, temp_dir: str) -> str:
         raise HTTPException(status_code=500, detail=f"Audio download failed: {e.stderr.decode()}")
 
 
+class SeparationQueueFull(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Separation queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class SeparatorPool:
+    """separator 인스턴스 N개(슬롯)와 대기열 깊이 제한.
+
+    admit() 로 들어와 아직 슬롯을 잡지 못한 요청 수(다운로드 중 + 슬롯 대기 중)가 max_queue 에 닿으면
+    다운로드를 시작하기 전에 바로 거절한다.
+    """
+
+    def __init__(self, slots: int, max_queue: int):
+        self.slots = slots
+        self.max_queue = max_queue
+        self.admitted = 0
+        self.busy = 0
+        self._free = asyncio.Queue()
+        for index in range(slots):
+            self._free.put_nowait(index)
+        self._separators = [None] * slots
+        self._idle_total = 0.0
+        self._idle_since = time.monotonic()
+        self._avg_seconds = 30.0
+
+    @property
+    def queued(self) -> int:
+        return self.admitted - self.busy
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil((self.queued / self.slots + 1) * self._avg_seconds))
+
+    def idle_seconds_total(self) -> float:
+        if self.busy == 0:
+            return self._idle_total + time.monotonic() - self._idle_since
+        return self._idle_total
+
+    @asynccontextmanager
+    async def admit(self):
+        if self.queued >= self.max_queue:
+            SEPARATION_REJECTED.inc()
+            raise SeparationQueueFull(self.retry_after())
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.admitted -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        index = await self._free.get()
+        if self.busy == 0:
+            self._idle_total += time.monotonic() - self._idle_since
+        self.busy += 1
+        start = time.monotonic()
+        try:
+            if self._separators[index] is None:
+                self._separators[index] = await asyncio.to_thread(create_separator)
+            yield self._separators[index]
+        finally:
+            self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * (time.monotonic() - start)
+            self.busy -= 1
+            if self.busy == 0:
+                self._idle_since = time.monotonic()
+            self._free.put_nowait(index)
+
+
+class SeparatorIdleCollector:
+    def __init__(self, pool: SeparatorPool):
+        self.pool = pool
+
+    def collect(self):
+        yield CounterMetricFamily(
+            "yass_separator_idle_seconds",
+            "Seconds during which no separator slot was busy",
+            value=self.pool.idle_seconds_total(),
+        )
+
+
 def create_separator():
     return Separator('spleeter:2stems')
 
-async def get_or_create_separator():
-    global separator_instance
-    async with separator_lock:
-        if separator_instance is None:
-            separator_instance = await asyncio.to_thread(create_separator)
-        return separator_instance
+separator_pool = SeparatorPool(SEPARATOR_SLOTS, SEPARATION_QUEUE_MAX)
+QUEUE_DEPTH.set_function(lambda: separator_pool.queued)
+SEPARATOR_BUSY.set_function(lambda: separator_pool.busy)
+REGISTRY.register(SeparatorIdleCollector(separator_pool))
 
 async def spleeter_separate(audio_path: str, temp_dir: str) -> Tuple[str, str]:
-    separator = await get_or_create_separator()
-    await asyncio.to_thread(separator.separate_to_file, audio_path, temp_dir, codec="wav")
+    async with separator_pool.slot() as separator:
+        await asyncio.to_thread(separator.separate_to_file, audio_path, temp_dir, codec="wav")
 
     base_name = os.path.splitext(os.path.basename(audio_path))[0]
     vocal_path = os.path.join(temp_dir, base_name, "vocals.wav")
@@ -87,60 +177,62 @@ async def spleeter_separate(audio_path: str, temp_dir: str) -> Tuple[str, str]:
 
     return vocal_path, accompaniment_path
 
-deleted_dirs = set()
-lock = threading.Lock()
+# 작업 디렉터리: TTL + 디스크 쿼터 관리, 단일 reaper 스레드가 정리
+scratch = ScratchSpace.from_env()
+STREAM_GRACE_SECONDS = float(os.environ.get("SCRATCH_STREAM_GRACE_SECONDS", "60"))
 
-def safe_cleanup(cleanup_dir: str):
-    with lock:
-        if cleanup_dir in deleted_dirs:
-            return
-        deleted_dirs.add(cleanup_dir)
-
-    time.sleep(60)
-    print(f"[CLEANUP] Deleting temp dir: {cleanup_dir}")
-    shutil.rmtree(cleanup_dir, ignore_errors=True)
+@app.post("/process_audio/")
+async def process_audio(youtube: YoutubeURL):
+    print("✅ [STEP1] 유튜브 URL 수신:", youtube.url)
+    try:
+        async with separator_pool.admit():
+            return await run_separation_job(youtube.url)
+    except SeparationQueueFull as e:
+        print("⛔ [QUEUE] 분리 대기열 가득 참:", e)
+        raise HTTPException(
+            status_code=429,
+            detail="Too many separation requests. Please try again later.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
 
-async def async_stream_file_and_cleanup(file_path: str, cleanup_dir: str):
-    print(f"▶️ [STREAM] Start streaming: {file_path}")
+async def run_separation_job(url: str):
     try:
-        with open(file_path, "rb") as f:
-            while chunk := f.read(1024 * 1024):
-                yield chunk
-    finally:
-        print(f"🪹 [CLEANUP] Trigger cleanup for: {cleanup_dir}")
-        threading.Thread(target=safe_cleanup, args=(cleanup_dir,)).start()
+        # 처리 중에는 만료되지 않고, 응답 직전부터 TTL 이 흐른다
+        job_id, temp_dir = scratch.create_job(hold=True)
+    except ScratchQuotaExceeded as e:
+        print("⛔ [SCRATCH] 작업 거절:", e)
+        raise HTTPException(status_code=503, detail="Server is busy. Please try again later.", headers={"Retry-After": "30"})
+    print("✅ [STEP2] 임시 디렉터리 생성:", temp_dir)
+    try:
+        input_audio = await asyncio.get_running_loop().run_in_executor(
+            download_pool, download_audio_temp, url, temp_dir
+        )
+        print("✅ [STEP3] 오디오 다운로드 완료:", input_audio)
 
-@app.post("/process_audio/")
-async def process_audio(youtube: YoutubeURL):
-    async with spleeter_lock:
-        print("✅ [STEP1] 유튜브 URL 수신:", youtube.url)
-        temp_dir = tempfile.mkdtemp()
-        print("✅ [STEP2] 임시 디렉터리 생성:", temp_dir)
-        try:
-            input_audio = await asyncio.get_event_loop().run_in_executor(
-                None, download_audio_temp, youtube.url, temp_dir
-            )
-            print("✅ [STEP3] 오디오 다운로드 완료:", input_audio)
-
-            vocal_path, accompaniment_path = await spleeter_separate(input_audio, temp_dir)
-            print("✅ [STEP4] 스플리터 완료")
-
-            base_name = os.path.splitext(os.path.basename(input_audio))[0]
-            print(f"✅ [STEP5] 응답 준비 완료: {base_name}")
-
-            return {
-                "vocal_stream_url": f"/stream/vocal/{os.path.basename(temp_dir)}/{base_name}",
-                "accompaniment_stream_url": f"/stream/accompaniment/{os.path.basename(temp_dir)}/{base_name}"
-            }
-        except Exception as e:
-            print("❌ 예외 발생:")
-            traceback.print_exc()
-            shutil.rmtree(temp_dir, ignore_errors=True)
-            raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/stream/{track_type}/{temp_id}/{base_name}")
-async def stream_audio(track_type: str, temp_id: str, base_name: str):
-    print(f"🎷 [STREAM REQUEST] type={track_type}, temp_id={temp_id}, base_name={base_name}")
+        vocal_path, accompaniment_path = await spleeter_separate(input_audio, temp_dir)
+        print("✅ [STEP4] 스플리터 완료")
+
+        base_name = os.path.splitext(os.path.basename(input_audio))[0]
+        print(f"✅ [STEP5] 응답 준비 완료: {base_name}")
+
+        scratch.start_ttl(job_id)
+        return {
+            "vocal_stream_url": f"/stream/vocal/{job_id}/{base_name}",
+            "accompaniment_stream_url": f"/stream/accompaniment/{job_id}/{base_name}"
+        }
+    except asyncio.CancelledError:
+        # 클라이언트가 끊긴 경우: hold 된 작업이 남지 않도록 바로 정리
+        scratch.release(job_id)
+        raise
+    except Exception as e:
+        print("❌ 예외 발생:")
+        traceback.print_exc()
+        scratch.release(job_id)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.api_route("/stream/{track_type}/{temp_id}/{base_name}", methods=["GET", "HEAD"])
+async def stream_audio(request: Request, track_type: str, temp_id: str, base_name: str):
+    print(f"🎷 [STREAM REQUEST] type={track_type}, temp_id={temp_id}, base_name={base_name}, range={request.headers.get('range')}")
 
     filename_map = {
         "vocal": "vocals.wav",
@@ -151,7 +243,10 @@ async def stream_audio(track_type: str, temp_id: str, base_name: str):
         print("⚠️ [ERROR] Invalid track type:", track_type)
         raise HTTPException(status_code=400, detail="Invalid track type")
 
-    temp_base = os.path.join(tempfile.gettempdir(), temp_id)
+    temp_base = scratch.path(temp_id)
+    if temp_base is None or os.path.basename(base_name) != base_name:
+        print("❌ [ERROR] Unknown or expired job:", temp_id)
+        raise HTTPException(status_code=404, detail="File not found.")
     file_path = os.path.join(temp_base, base_name, filename_map[track_type])
 
     print("📂 [CHECK FILE] Looking for:", file_path)
@@ -162,7 +257,12 @@ async def stream_audio(track_type: str, temp_id: str, base_name: str):
 
     print(f"🚀 [STREAM START] Begin streaming: {file_path}")
 
-    return StreamingResponse(
-        async_stream_file_and_cleanup(file_path, temp_base),
-        media_type="audio/wav"
+    # 재생/탐색 중에는 만료를 미루고, 마지막 바이트까지 보낸 뒤 grace 후 정리
+    scratch.touch(temp_id, STREAM_GRACE_SECONDS)
+    return RangeFileResponse(
+        file_path,
+        request.headers,
+        media_type="audio/wav",
+        method=request.method,
+        on_complete=BackgroundTask(scratch.expire, temp_id, STREAM_GRACE_SECONDS),
     )
\ No newline at end of file
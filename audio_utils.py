@@ -1,8 +1,11 @@
 import os
 import subprocess
 from spleeter.separator import Separator
+from spleeter.audio.adapter import AudioAdapter
 import threading
 import logging
+from metrics_utils import observe_stage, SEPARATOR_BUSY, SEPARATOR_WAITING, SEPARATOR_INSTANCES
+from youtube_utils import YTDLP_CMD
 
 # ✅ 락은 그대로 유지
 spleeter_lock = threading.Lock()
@@ -19,6 +22,7 @@ def get_separator():
     if _separator_instance is None:
         logger.info("🧠 Spleeter 모델 초기화 (최초 1회)")
         _separator_instance = Separator('spleeter:2stems')
+        SEPARATOR_INSTANCES.inc()
     return _separator_instance
 
 def download_audio(youtube_url: str, temp_dir: str) -> str:
@@ -26,10 +30,7 @@ def download_audio(youtube_url: str, temp_dir: str) -> str:
     output_path = os.path.join(temp_dir, "input.%(ext)s")
 
     logger.info("💻 서버 환경 구성 중")
-    command = [
-        "/usr/bin/sudo", "-u", "user1",
-        "/home/user1/.local/bin/yt-dlp",
-        "--cookies-from-browser", "chrome",
+    command = YTDLP_CMD + [
         "-x", "--audio-format", "mp3",
         "-o", output_path,
         youtube_url
@@ -38,7 +39,8 @@ def download_audio(youtube_url: str, temp_dir: str) -> str:
     logger.info(f"⚙️ [download_audio] yt-dlp 명령어: {' '.join(command)}")
 
     try:
-        subprocess.run(command, check=True, timeout=30)
+        with observe_stage("download"):
+            subprocess.run(command, check=True, timeout=30)
         logger.info("✅ [download_audio] yt-dlp 명령어 실행 완료")
     except subprocess.TimeoutExpired:
         logger.warning("⏱️ [download_audio] yt-dlp 타임아웃: 30초 내에 완료되지 않음")
@@ -59,9 +61,21 @@ def download_audio(youtube_url: str, temp_dir: str) -> str:
 def separate_audio(audio_path: str, temp_dir: str) -> tuple[str, str]:
     logger.info("🎧 [separate_audio] Spleeter 분리 시작")
 
+    SEPARATOR_WAITING.inc()
     with spleeter_lock:
-        separator = get_separator()  # ✅ 전역 싱글톤 사용
-        separator.separate_to_file(audio_path, temp_dir, codec="wav")
+        SEPARATOR_WAITING.dec()
+        SEPARATOR_BUSY.inc()
+        try:
+            separator = get_separator()  # ✅ 전역 싱글톤 사용
+            audio_adapter = AudioAdapter.default()
+            # separate_to_file 을 분리/인코딩 단계로 나눠서 각각 시간 측정
+            with observe_stage("separation"):
+                waveform, _ = audio_adapter.load(audio_path, offset=0, duration=600.0, sample_rate=separator._sample_rate)
+                sources = separator.separate(waveform, audio_path)
+            with observe_stage("encode"):
+                separator.save_to_file(sources, audio_path, temp_dir, codec="wav", audio_adapter=audio_adapter)
+        finally:
+            SEPARATOR_BUSY.dec()
 
     base_name = os.path.splitext(os.path.basename(audio_path))[0]
     output_dir = os.path.join(temp_dir, base_name)
@@ -0,0 +1,179 @@
+"""Real-time factor of crepe and crepe-tiny F0: per-call torchcrepe.predict vs batched mode.
+
+    python benchmarks/bench_crepe.py --vocals_dir benchmarks/vocals --silence_db -60
+
+"baseline" is the previous path: torchcrepe.predict with hop_length * 2
+frames per batch, Viterbi decoding and NumPy interpolation. "batched" is
+VC.get_f0_crepe_computation with the batch size picked from free memory (or
+--batch_size), --decoder and, with --silence_db, silent frames skipped.
+RTF is F0 wall time over audio duration (lower is faster); agreement is the
+share of frames voiced in both runs whose F0 differs by under 50 cents.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import types
+
+import numpy as np
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(REPO)
+sys.path.append(REPO)
+sys.path.append(os.path.join(REPO, "rvc", "infer"))
+
+MODELS = {"crepe": "full", "crepe-tiny": "tiny"}
+
+
+def synthetic_clips(n, seconds=10, sr=16000):
+    rng = np.random.default_rng(0)
+    t = np.arange(seconds * sr) / sr
+    for i in range(n):
+        f0 = 150 + 80 * np.sin(2 * np.pi * 0.3 * t + i)
+        phase = 2 * np.pi * np.cumsum(f0) / sr
+        voice = sum(np.sin(k * phase) / k for k in range(1, 10))
+        # Phrases separated by silence, as in real vocals
+        gate = (np.sin(2 * np.pi * 0.2 * t) > -0.3).astype(np.float64)
+        yield f"synthetic_{i}", (
+            0.1 * voice * gate + 1e-4 * rng.standard_normal(len(t))
+        ).astype(np.float32)
+
+
+def vocal_clips(vocals_dir):
+    import soundfile as sf
+    from scipy import signal
+
+    for name in sorted(os.listdir(vocals_dir)):
+        audio, sr = sf.read(os.path.join(vocals_dir, name), dtype="float32")
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1)
+        if sr != 16000:
+            audio = signal.resample_poly(audio, 16000, sr).astype(np.float32)
+        yield name, audio
+
+
+def baseline_f0(vc, x, model, hop_length):
+    import torch
+    from rvc.lib import f0_registry
+
+    x = x.astype(np.float32)
+    x /= np.quantile(np.abs(x), 0.999)
+    device = vc.get_optimal_torch_device()
+    pitch = f0_registry.crepe_predict(
+        torch.from_numpy(x).to(device)[None],
+        16000,
+        hop_length,
+        50,
+        1100,
+        model,
+        batch_size=hop_length * 2,
+        device=device,
+        pad=True,
+    )
+    p_len = x.shape[0] // vc.window
+    source = pitch.squeeze(0).cpu().float().numpy()
+    source[source < 0.001] = np.nan
+    target = np.interp(
+        np.arange(0, len(source) * p_len, len(source)) / p_len,
+        np.arange(0, len(source)),
+        source,
+    )
+    return np.nan_to_num(target)
+
+
+def batched_f0(vc, x, model, hop_length):
+    return vc.get_f0_crepe_computation(
+        x.copy(), 50, 1100, x.shape[0] // vc.window, hop_length, model
+    )
+
+
+def agreement(reference, candidate):
+    voiced = (reference > 0) & (candidate > 0)
+    if not voiced.any():
+        return 1.0
+    cents = 1200 * np.abs(np.log2(candidate[voiced] / reference[voiced]))
+    return float(np.mean(cents < 50))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vocals_dir", default="", help="vocal files to time")
+    parser.add_argument("--methods", default=",".join(MODELS))
+    parser.add_argument("--hop_length", type=int, default=128)
+    parser.add_argument("--batch_size", type=int, default=0, help="0 = auto")
+    parser.add_argument(
+        "--decoder",
+        default="viterbi",
+        choices=["viterbi", "weighted_argmax", "argmax"],
+    )
+    parser.add_argument("--silence_db", type=float, default=None)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", default="bench_crepe.json")
+    args = parser.parse_args()
+
+    from pipeline import VC
+    from rvc.lib import f0_registry
+
+    vc = VC(
+        16000,
+        types.SimpleNamespace(
+            x_pad=1,
+            x_query=6,
+            x_center=38,
+            x_max=41,
+            is_half=False,
+            device="cpu",
+            crepe_batch_size=args.batch_size,
+            crepe_decoder=args.decoder,
+            crepe_silence_db=args.silence_db,
+        ),
+    )
+    device = vc.get_optimal_torch_device()
+    clips = list(
+        vocal_clips(args.vocals_dir) if args.vocals_dir else synthetic_clips(3)
+    )
+    duration = sum(len(audio) for _, audio in clips) / 16000
+    modes = {"baseline": baseline_f0, "batched": batched_f0}
+
+    report = {"config": vars(args), "device": str(device), "methods": {}}
+    for method in args.methods.split(","):
+        model = MODELS[method]
+        f0_registry.warm_up([method], device)
+        rows = {}
+        outputs = {}
+        for mode, extract in modes.items():
+            samples = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                outputs[mode] = [
+                    extract(vc, audio, model, args.hop_length) for _, audio in clips
+                ]
+                samples.append(time.perf_counter() - start)
+            rows[mode] = {"rtf": statistics.median(samples) / duration}
+        rows["batched"]["agreement"] = statistics.mean(
+            agreement(a, b) for a, b in zip(outputs["baseline"], outputs["batched"])
+        )
+        rows["batched"]["batch_size"] = args.batch_size or (
+            f0_registry.crepe_batch_size(device, model)
+        )
+        report["methods"][method] = rows
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{duration:.1f} s of audio on {device}")
+    print(f"{'method':<11} {'baseline':>9} {'batched':>9} {'speedup':>8} {'agree':>7}")
+    for method, rows in report["methods"].items():
+        baseline, batched = rows["baseline"]["rtf"], rows["batched"]["rtf"]
+        print(
+            f"{method:<11} {baseline:>9.3f} {batched:>9.3f} "
+            f"{baseline / batched:>7.2f}x {rows['batched']['agreement']:>6.1%}"
+        )
+    print(f"report: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Segmented parallel Harvest against single-pass Harvest: speed and parity.
+
+    python benchmarks/bench_harvest.py --vocals_dir benchmarks/vocals --workers 8
+
+Every file in --vocals_dir (or a minute of synthetic phrases) is analysed by
+rvc.lib.harvest.harvest in one pass and by segmented_harvest with --workers
+processes, both with stonemask refinement at the inference settings (16 kHz,
+10 ms, 50-1100 Hz). RTF is wall time over audio duration. Parity fails, and
+the script exits non-zero, when any file has more than --max_voicing_mismatch
+of its frames voiced in only one contour or a 99th percentile difference
+above --max_cents over frames voiced in both.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(REPO)
+sys.path.append(REPO)
+
+SR = 16000
+
+
+def synthetic_clips(n, seconds=60):
+    rng = np.random.default_rng(0)
+    t = np.arange(seconds * SR) / SR
+    for i in range(n):
+        f0 = (
+            180 + 90 * np.sin(2 * np.pi * 0.23 * t + i) + 20 * np.sin(2 * np.pi * 5 * t)
+        )
+        phase = 2 * np.pi * np.cumsum(f0) / SR
+        voice = sum(np.sin(k * phase) * np.exp(-k / 6) for k in range(1, 15))
+        # Phrases with pauses between them
+        gate = (
+            np.sin(2 * np.pi * 0.17 * t + i) + 0.5 * np.sin(2 * np.pi * 0.61 * t) > -0.2
+        )
+        yield f"synthetic_{i}", 0.2 * voice * gate + 0.003 * rng.standard_normal(len(t))
+
+
+def vocal_clips(vocals_dir):
+    import soundfile as sf
+    from scipy import signal
+
+    for name in sorted(os.listdir(vocals_dir)):
+        audio, sr = sf.read(os.path.join(vocals_dir, name))
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1)
+        if sr != SR:
+            audio = signal.resample_poly(audio, SR, sr)
+        yield name, audio
+
+
+def timed(function, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function()
+        samples.append(time.perf_counter() - start)
+    return result, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vocals_dir", default="")
+    parser.add_argument("--workers", type=int, default=0, help="0 = one per CPU")
+    parser.add_argument("--segment_seconds", type=float, default=None)
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--max_cents", type=float, default=5.0)
+    parser.add_argument("--max_voicing_mismatch", type=float, default=0.005)
+    parser.add_argument("--output", default="bench_harvest.json")
+    args = parser.parse_args()
+
+    from rvc.lib.harvest import compare, get_pool, harvest, segmented_harvest
+
+    workers = args.workers or os.cpu_count()
+    # Start the workers before timing; they are reused across calls
+    get_pool(workers)
+
+    rows = []
+    clips = vocal_clips(args.vocals_dir) if args.vocals_dir else synthetic_clips(2)
+    for name, audio in clips:
+        reference, single_s = timed(lambda: harvest(audio, SR, 50, 1100, 10), args.runs)
+        candidate, segmented_s = timed(
+            lambda: segmented_harvest(
+                audio, SR, 50, 1100, 10, workers, args.segment_seconds
+            ),
+            args.runs,
+        )
+        duration = len(audio) / SR
+        row = {
+            "clip": name,
+            "seconds": duration,
+            "single_rtf": single_s / duration,
+            "segmented_rtf": segmented_s / duration,
+            **compare(reference, candidate),
+        }
+        row["ok"] = (
+            len(candidate) == len(reference)
+            and row["voicing_mismatch"] <= args.max_voicing_mismatch
+            and row["p99_cents"] <= args.max_cents
+        )
+        rows.append(row)
+        print(
+            f"{name[:30]:<30} {duration:>6.1f} s  RTF {row['single_rtf']:.3f} -> "
+            f"{row['segmented_rtf']:.3f} ({single_s / segmented_s:.2f}x)  "
+            f"voicing mismatch {row['voicing_mismatch']:.2%}  "
+            f"p99 {row['p99_cents']:.2f} cents  {'ok' if row['ok'] else 'FAIL'}"
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {"config": vars(args), "workers": workers, "clips": rows}, f, indent=2
+        )
+    print(f"report: {args.output}")
+    if not all(row["ok"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Parity and load time of the fairseq-free HuBERT extractor against fairseq.
+
+    python benchmarks/bench_hubert.py --hubert_path hubert_base.pt --vocals_dir benchmarks/vocals
+
+Parity: every file in --vocals_dir (or a few synthetic clips) goes through
+fairseq's HubertModel and rvc.lib.hubert, and the v1 (layer 9 + final_proj)
+and v2 (layer 12) features are compared by max absolute difference and
+cosine similarity; exceeding --tolerance exits non-zero. Load time: each
+loader runs --runs times in a fresh interpreter, timing imports plus model
+construction from inside the child and reading peak RSS from wait4.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import numpy as np
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(REPO)
+sys.path.append(REPO)
+
+LOADERS = {
+    "fairseq": """
+from fairseq import checkpoint_utils
+models, _, _ = checkpoint_utils.load_model_ensemble_and_task([{hubert_path!r}], suffix="")
+model = models[0].eval()
+""",
+    "converted": """
+from rvc.lib.hubert import load_hubert
+model = load_hubert({converted_path!r})
+""",
+}
+CHILD = """
+import json, time
+start = time.perf_counter()
+{loader}
+print(json.dumps({{"seconds": time.perf_counter() - start}}))
+"""
+
+
+def synthetic_clips(n, seconds=4, sr=16000):
+    rng = np.random.default_rng(0)
+    t = np.arange(seconds * sr) / sr
+    for i in range(n):
+        f0 = 120 + 60 * np.sin(2 * np.pi * 0.5 * t + i)
+        phase = 2 * np.pi * np.cumsum(f0) / sr
+        voice = sum(np.sin(k * phase) / k for k in range(1, 10))
+        yield f"synthetic_{i}", (0.1 * voice + 0.01 * rng.standard_normal(len(t)))
+
+
+def vocal_clips(vocals_dir):
+    import soundfile as sf
+    from scipy import signal
+
+    for name in sorted(os.listdir(vocals_dir)):
+        audio, sr = sf.read(os.path.join(vocals_dir, name), dtype="float32")
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1)
+        if sr != 16000:
+            audio = signal.resample_poly(audio, 16000, sr)
+        yield name, audio
+
+
+def features(model, source):
+    import torch
+
+    with torch.no_grad():
+        padding_mask = torch.zeros_like(source, dtype=torch.bool)
+        layer9 = model.extract_features(
+            source=source, padding_mask=padding_mask, output_layer=9
+        )[0]
+        layer12 = model.extract_features(
+            source=source, padding_mask=padding_mask, output_layer=12
+        )[0]
+        return {"v1": model.final_proj(layer9)[0], "v2": layer12[0]}
+
+
+def parity(args, converted_path):
+    import torch
+    from fairseq import checkpoint_utils
+    from rvc.lib.hubert import load_hubert
+
+    models, _, _ = checkpoint_utils.load_model_ensemble_and_task(
+        [args.hubert_path], suffix=""
+    )
+    reference = models[0].float().eval()
+    candidate = load_hubert(converted_path)
+    clips = vocal_clips(args.vocals_dir) if args.vocals_dir else synthetic_clips(3)
+    rows = []
+    for name, audio in clips:
+        source = torch.from_numpy(np.asarray(audio, dtype=np.float32)).view(1, -1)
+        expected, actual = features(reference, source), features(candidate, source)
+        for version in ("v1", "v2"):
+            a, b = expected[version], actual[version]
+            rows.append(
+                {
+                    "clip": name,
+                    "version": version,
+                    "frames": a.shape[0],
+                    "max_abs_diff": (a - b).abs().max().item(),
+                    "min_cosine": torch.nn.functional.cosine_similarity(a, b, dim=-1)
+                    .min()
+                    .item(),
+                }
+            )
+            print(
+                f"{name[:30]:<30} {version} {rows[-1]['frames']:>5} frames "
+                f"max |diff| {rows[-1]['max_abs_diff']:.2e} "
+                f"min cos {rows[-1]['min_cosine']:.6f}"
+            )
+    return rows
+
+
+def load_time(args, converted_path):
+    rows = []
+    for name in args.loaders.split(","):
+        loader = LOADERS[name].format(
+            hubert_path=args.hubert_path, converted_path=converted_path
+        )
+        samples, peaks = [], []
+        for _ in range(args.runs):
+            process = subprocess.Popen(
+                [sys.executable, "-c", CHILD.format(loader=loader)],
+                cwd=REPO,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+            output = process.stdout.read()
+            _, status, usage = os.wait4(process.pid, 0)
+            if os.waitstatus_to_exitcode(status) != 0:
+                raise RuntimeError(f"The {name} loader failed")
+            samples.append(json.loads(output.strip().splitlines()[-1])["seconds"])
+            peaks.append(usage.ru_maxrss / 1024)
+        rows.append(
+            {
+                "loader": name,
+                "median_s": statistics.median(samples),
+                "min_s": min(samples),
+                "peak_rss_mb": max(peaks),
+            }
+        )
+        print(
+            f"{name:<10} median {rows[-1]['median_s']:.2f} s, min {rows[-1]['min_s']:.2f} s, "
+            f"peak RSS {rows[-1]['peak_rss_mb']:.0f} MB"
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hubert_path", default="hubert_base.pt")
+    parser.add_argument(
+        "--vocals_dir", default="", help="16 kHz or resampled vocal files"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=1e-3, help="max abs feature difference"
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--loaders", default=",".join(LOADERS))
+    parser.add_argument("--skip_parity", action="store_true")
+    parser.add_argument("--output", default="bench_hubert.json")
+    args = parser.parse_args()
+
+    from rvc.lib.hubert import convert, converted_path
+
+    path = converted_path(args.hubert_path)
+    if not os.path.exists(path):
+        convert(args.hubert_path, path)
+
+    report = {"config": vars(args)}
+    if not args.skip_parity:
+        report["parity"] = parity(args, path)
+    report["load_time"] = load_time(args, path)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"report: {args.output}")
+
+    worst = max((row["max_abs_diff"] for row in report.get("parity", [])), default=0)
+    if worst > args.tolerance:
+        print(f"Parity FAILED: max |diff| {worst:.2e} > {args.tolerance:.0e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
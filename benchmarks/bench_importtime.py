@@ -0,0 +1,126 @@
+"""Cold import cost of the inference modules, from python -X importtime.
+
+    python benchmarks/bench_importtime.py --modules pipeline infer --max_ms 3000
+
+Each module is imported in a fresh interpreter with -X importtime (rvc/infer
+on sys.path, repo root as cwd), --runs times; the median cumulative time is
+reported together with the heaviest imports it pulled in. Modules in --forbid
+are the optional dependencies that should only load when their F0 method,
+retrieval or clean-up option is used; importing any of them, or exceeding
+--max_ms, makes the script exit non-zero so it can guard cold start in CI.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FORBIDDEN = [
+    "parselmouth",
+    "torchcrepe",
+    "pyworld",
+    "faiss",
+    "librosa",
+    "noisereduce",
+    "fairseq",
+    "onnxruntime",
+    "rvc.lib.FCPEF0Predictor",
+    "rvc.lib.rmvpe",
+]
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def importtime(module):
+    """{top-level-or-nested module name: (self us, cumulative us)} for one cold import."""
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join([os.path.join(REPO, "rvc", "infer"), REPO]),
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.splitlines()[-1]}")
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            timings[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--modules", nargs="+", default=["postprocess", "pipeline", "infer"]
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="heaviest imports to list")
+    parser.add_argument("--forbid", nargs="*", default=FORBIDDEN)
+    parser.add_argument(
+        "--max_ms", type=float, default=0, help="fail above this median (0: no limit)"
+    )
+    parser.add_argument("--output", default="bench_importtime.json")
+    args = parser.parse_args()
+
+    rows, failures = [], []
+    for module in args.modules:
+        try:
+            runs = [importtime(module) for _ in range(args.runs)]
+        except RuntimeError as error:
+            print(error)
+            failures.append(module)
+            continue
+        total_ms = statistics.median(run[module][1] / 1000 for run in runs)
+        last = runs[-1]
+        heaviest = sorted(last.items(), key=lambda item: item[1][0], reverse=True)[
+            : args.top
+        ]
+        loaded = sorted(
+            name
+            for name in args.forbid
+            if name in last or any(n.startswith(name + ".") for n in last)
+        )
+        rows.append(
+            {
+                "module": module,
+                "cumulative_ms": total_ms,
+                "modules_imported": len(last),
+                "forbidden_loaded": loaded,
+                "heaviest_self_ms": {name: t[0] / 1000 for name, t in heaviest},
+            }
+        )
+        print(
+            f"\nimport {module}: {total_ms:.0f} ms (median of {args.runs}), {len(last)} modules"
+        )
+        for name, (self_us, cumulative_us) in heaviest:
+            print(
+                f"  {self_us / 1000:>8.1f} ms self {cumulative_us / 1000:>9.1f} ms cumulative  {name}"
+            )
+        if loaded:
+            print(f"  loaded optional dependencies: {', '.join(loaded)}")
+            failures.append(module)
+        if args.max_ms and total_ms > args.max_ms:
+            print(f"  over the {args.max_ms:.0f} ms budget")
+            failures.append(module)
+
+    with open(args.output, "w") as f:
+        json.dump({"config": vars(args), "results": rows}, f, indent=2)
+    print(f"\nreport: {args.output}")
+    if failures:
+        print(f"Import-time check FAILED for: {', '.join(sorted(set(failures)))}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
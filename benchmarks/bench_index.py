@@ -0,0 +1,146 @@
+"""Retrieval latency, memory and recall of the faiss index types extract_index.py can build.
+
+    python benchmarks/bench_index.py --total_fea logs/my_model/total_fea.npy
+
+The feature matrix is shuffled and --queries rows are held out as queries; the
+rest is indexed once per configuration. Ground truth is an exact IndexFlatL2
+search with the same k=8 VC.pipeline uses, and recall@8 is the fraction of the
+exact neighbours each index returns. Queries are searched in --batch-frame
+blocks, like one pipeline chunk. Memory is the serialized index size plus the
+reconstructed feature matrix VC.pipeline keeps next to it.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPO, "rvc", "train", "process"))
+
+K = 8
+
+
+def search_us(index, queries, batch):
+    start = time.perf_counter()
+    ids = [
+        index.search(queries[i : i + batch], K)[1]
+        for i in range(0, len(queries), batch)
+    ]
+    elapsed = time.perf_counter() - start
+    return np.concatenate(ids), elapsed * 1e6 / len(queries)
+
+
+def recall(ids, truth):
+    return float(np.mean([len(set(a) & set(b)) / K for a, b in zip(ids, truth)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--total_fea", required=True, help="total_fea.npy written by extract_index.py"
+    )
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument(
+        "--batch", type=int, default=1000, help="frames per search call"
+    )
+    parser.add_argument(
+        "--types",
+        default="ivf_flat,hnsw,ivf_pq,ivf_sq8,opq_ivf_pq",
+        help="comma-separated index types",
+    )
+    parser.add_argument(
+        "--index_params", default="", help="build parameters, as for main.py index"
+    )
+    parser.add_argument(
+        "--nprobe", default="1,4,16,64", help="nprobe values to sweep for IVF types"
+    )
+    parser.add_argument(
+        "--efSearch", default="16,64,128", help="efSearch values to sweep for HNSW"
+    )
+    parser.add_argument("--threads", type=int, default=0, help="faiss OpenMP threads")
+    parser.add_argument("--output", default="bench_index.json")
+    args = parser.parse_args()
+
+    import faiss
+
+    from extract_index import build_index, index_factory_string, parse_index_params
+
+    if args.threads:
+        faiss.omp_set_num_threads(args.threads)
+
+    features = np.load(args.total_fea).astype(np.float32)
+    np.random.default_rng(0).shuffle(features)
+    queries, base = features[: args.queries], features[args.queries :]
+    dim = base.shape[1]
+    n_ivf = min(int(16 * np.sqrt(base.shape[0])), base.shape[0] // 39)
+    params = parse_index_params(args.index_params)
+    print(
+        f"{base.shape[0]} indexed vectors, {len(queries)} queries, dim {dim}, IVF lists {n_ivf}"
+    )
+
+    flat = faiss.IndexFlatL2(dim)
+    flat.add(base)
+    truth, flat_us = search_us(flat, queries, args.batch)
+    feature_mb = base.nbytes / 2**20
+
+    rows = [
+        {
+            "type": "flat",
+            "factory": "Flat",
+            "query": "",
+            "build_s": 0.0,
+            "us_per_query": flat_us,
+            "index_mb": faiss.serialize_index(flat).nbytes / 2**20,
+            "total_mb": faiss.serialize_index(flat).nbytes / 2**20 + feature_mb,
+            "recall": 1.0,
+        }
+    ]
+    for index_type in args.types.split(","):
+        start = time.perf_counter()
+        index = build_index(base, dim, index_type, n_ivf, params)
+        build_s = time.perf_counter() - start
+        index_mb = faiss.serialize_index(index).nbytes / 2**20
+        name, values = (
+            ("efSearch", args.efSearch)
+            if index_type == "hnsw"
+            else ("nprobe", args.nprobe)
+        )
+        for value in values.split(","):
+            query = f"{name}={value}"
+            faiss.ParameterSpace().set_index_parameters(index, query)
+            ids, us = search_us(index, queries, args.batch)
+            rows.append(
+                {
+                    "type": index_type,
+                    "factory": index_factory_string(index_type, n_ivf, params),
+                    "query": query,
+                    "build_s": build_s,
+                    "us_per_query": us,
+                    "index_mb": index_mb,
+                    "total_mb": index_mb + feature_mb,
+                    "recall": recall(ids, truth),
+                }
+            )
+
+    with open(args.output, "w") as f:
+        json.dump({"config": vars(args), "n_ivf": n_ivf, "results": rows}, f, indent=2)
+
+    print(
+        f"{'factory':<24} {'query':<13} {'build s':>8} {'us/query':>9} "
+        f"{'index MB':>9} {'total MB':>9} {'recall@8':>9}"
+    )
+    for row in rows:
+        print(
+            f"{row['factory']:<24} {row['query']:<13} {row['build_s']:>8.1f} "
+            f"{row['us_per_query']:>9.1f} {row['index_mb']:>9.1f} {row['total_mb']:>9.1f} "
+            f"{row['recall']:>9.3f}"
+        )
+    print(f"report: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Load time and per-chunk synthesizer latency: eager net_g vs cached TorchScript.
+
+    python benchmarks/bench_jit.py --pth_path logs/model.pth --chunk_seconds 5,10,38
+
+Load time is measured for eager, for the first JIT load (trace + save) and
+for a warm JIT load from the cache. Per-chunk latency feeds random features
+of the pipeline's chunk sizes straight into net_g.infer, so HuBERT and F0
+extraction do not blur the comparison.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(REPO)
+sys.path.append(REPO)
+sys.path.append(os.path.join(REPO, "rvc", "infer"))
+
+
+def timed_load(infer, pth_path, use_jit):
+    infer.config.use_jit = use_jit
+    start = time.perf_counter()
+    infer.get_vc(pth_path, 0)
+    return time.perf_counter() - start
+
+
+def chunk_latency(infer, synthesizer_jit, seconds, repeats):
+    import torch
+
+    frames = int(seconds * 100)
+    if_f0 = infer.cpt.get("f0", 1)
+    inputs = synthesizer_jit.example_inputs(
+        frames, if_f0, infer.version, infer.config.device, infer.config.is_half
+    )
+    latencies = []
+    with torch.no_grad():
+        infer.net_g.infer(*inputs)
+        for _ in range(repeats):
+            start = time.perf_counter()
+            infer.net_g.infer(*inputs)
+            latencies.append(time.perf_counter() - start)
+    return {
+        "mean_s": float(np.mean(latencies)),
+        "p50_s": float(np.percentile(latencies, 50)),
+        "p95_s": float(np.percentile(latencies, 95)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pth_path", required=True)
+    parser.add_argument("--chunk_seconds", default="5,10,38")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", default="bench_jit.json")
+    args = parser.parse_args()
+
+    import infer
+    import synthesizer_jit
+
+    cache_path = synthesizer_jit.jit_cache_path(
+        args.pth_path, infer.config.device, infer.config.is_half
+    )
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+
+    chunks = [float(c) for c in args.chunk_seconds.split(",")]
+    report = {"load_s": {}, "chunks": {}}
+
+    report["load_s"]["eager"] = timed_load(infer, args.pth_path, False)
+    report["chunks"]["eager"] = {
+        c: chunk_latency(infer, synthesizer_jit, c, args.repeats) for c in chunks
+    }
+
+    report["load_s"]["jit_export"] = timed_load(infer, args.pth_path, True)
+    report["load_s"]["jit_cached"] = timed_load(infer, args.pth_path, True)
+    if not isinstance(infer.net_g, synthesizer_jit.JitSynthesizer):
+        raise SystemExit("TorchScript export failed, nothing to compare")
+    report["chunks"]["jit"] = {
+        c: chunk_latency(infer, synthesizer_jit, c, args.repeats) for c in chunks
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print("load time")
+    for name, seconds in report["load_s"].items():
+        print(f"  {name:<11} {seconds:>7.2f} s")
+    print(f"\n{'chunk s':>8} {'eager p50':>10} {'jit p50':>10} {'speedup':>8}")
+    for c in chunks:
+        eager, jit = report["chunks"]["eager"][c], report["chunks"]["jit"][c]
+        print(
+            f"{c:>8.1f} {eager['p50_s']:>10.3f} {jit['p50_s']:>10.3f} "
+            f"{eager['p50_s'] / jit['p50_s']:>7.2f}x"
+        )
+    print(f"report: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
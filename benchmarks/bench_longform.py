@@ -0,0 +1,146 @@
+"""Peak memory of long-form versus whole-file conversion as input length grows.
+
+    python benchmarks/bench_longform.py --pth_path logs/model.pth --minutes 5,20,60
+
+For every duration an input is written by looping --source (or a synthetic
+voiced signal), then each mode converts it in a fresh child process so its
+peak resident set size can be read from wait4. Long-form peak memory should
+stay flat as the duration grows; whole-file conversion grows with it and may
+be killed for the longest inputs, which is recorded rather than treated as an
+error.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import soundfile as sf
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(REPO)
+sys.path.append(REPO)
+sys.path.append(os.path.join(REPO, "rvc", "infer"))
+
+MODES = ("long_form", "full")
+
+
+def synthetic_block(sr, seconds, seed):
+    # A gliding harmonic tone with a syllable-rate envelope, so F0 extraction
+    # and the voiced/unvoiced paths all get exercised
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(sr * seconds)) / sr
+    f0 = 140 + 40 * np.sin(2 * np.pi * 0.3 * t + rng.uniform(0, np.pi))
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.clip(np.sin(2 * np.pi * 3 * t), 0, None)
+    return (0.2 * voice * envelope + 0.003 * rng.standard_normal(len(t))).astype(
+        np.float32
+    )
+
+
+def write_input(path, minutes, source, sr=44100):
+    if os.path.exists(path):
+        return path
+    block = sf.read(source, dtype="float32")[0] if source else None
+    with sf.SoundFile(path, "w", samplerate=sr, channels=1, format="FLAC") as f:
+        written, seed = 0, 0
+        while written < minutes * 60 * sr:
+            data = block if block is not None else synthetic_block(sr, 10, seed)
+            if data.ndim > 1:
+                data = data.mean(axis=1)
+            data = data[: int(minutes * 60 * sr) - written]
+            f.write(data)
+            written += len(data)
+            seed += 1
+    return path
+
+
+def child(args):
+    import infer
+
+    infer.get_vc(args.pth_path, 0)
+    output_path = os.path.join(args.workdir, f"out_{args.child}.wav")
+    kwargs = dict(
+        sid=0,
+        input_audio_path=args.input,
+        f0_up_key=0,
+        f0_method=args.f0method,
+        file_index=args.index_path,
+        index_rate=args.index_rate,
+        rms_mix_rate=1,
+        protect=0.33,
+        hop_length=128,
+        output_path=output_path,
+    )
+    if args.child == "long_form":
+        infer.vc_long_form(window_seconds=args.window, **kwargs)
+    else:
+        infer.vc_single(**kwargs)
+
+
+def run_child(args, mode, input_path):
+    command = [sys.executable, os.path.abspath(__file__), "--child", mode]
+    command += ["--input", input_path, "--pth_path", args.pth_path]
+    command += ["--index_path", args.index_path, "--index_rate", str(args.index_rate)]
+    command += ["--f0method", args.f0method, "--window", str(args.window)]
+    command += ["--workdir", args.workdir]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    return {
+        "mode": mode,
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": usage.ru_maxrss / 1024,
+        "exit_code": os.waitstatus_to_exitcode(status),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pth_path", required=True)
+    parser.add_argument("--index_path", default="")
+    parser.add_argument("--index_rate", type=float, default=0.3)
+    parser.add_argument("--f0method", default="rmvpe")
+    parser.add_argument("--minutes", default="5,20,60")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--window", type=float, default=30)
+    parser.add_argument(
+        "--source", default="", help="audio file to loop instead of a synthetic signal"
+    )
+    parser.add_argument("--workdir", default="bench_longform")
+    parser.add_argument("--output", default="bench_longform.json")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--input", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    os.makedirs(args.workdir, exist_ok=True)
+    rows = []
+    for minutes in [float(m) for m in args.minutes.split(",")]:
+        input_path = write_input(
+            os.path.join(args.workdir, f"input_{minutes:g}min.flac"),
+            minutes,
+            args.source,
+        )
+        for mode in args.modes.split(","):
+            row = dict(minutes=minutes, **run_child(args, mode, input_path))
+            rows.append(row)
+            print(
+                f"{minutes:>6g} min {mode:<10} peak RSS {row['peak_rss_mb']:>8.0f} MB "
+                f"in {row['seconds']:>7.1f} s (exit {row['exit_code']})"
+            )
+
+    with open(args.output, "w") as f:
+        json.dump({"config": vars(args), "results": rows}, f, indent=2)
+    print(f"report: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Cost of each extra key: separate vc_single runs vs one vc_multi_key call.
+
+    python benchmarks/bench_multikey.py --pth_path logs/model.pth --input_path song.wav --keys -4,-2,0,2
+
+Separate runs convert the input once per key with vc_single, so F0,
+HuBERT, retrieval and chunking are repeated; vc_multi_key is timed with the
+first 1, 2, ... N keys, and the marginal cost per key is the slope of that
+series. Harvest's per-path F0 cache is cleared before every run so neither
+side reuses an earlier extraction. Outputs of both paths are compared key
+by key (max absolute int16 difference).
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(REPO)
+sys.path.append(REPO)
+sys.path.append(os.path.join(REPO, "rvc", "infer"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pth_path", required=True)
+    parser.add_argument("--input_path", required=True)
+    parser.add_argument("--index_path", default="")
+    parser.add_argument("--index_rate", type=float, default=0.75)
+    parser.add_argument("--keys", default="-4,-2,0,2")
+    parser.add_argument("--f0method", default="rmvpe")
+    parser.add_argument("--hop_length", type=int, default=128)
+    parser.add_argument("--output", default="bench_multikey.json")
+    args = parser.parse_args()
+
+    import infer
+    import pipeline
+
+    keys = [int(key) for key in args.keys.split(",")]
+    infer.filter_radius = 3
+    infer.get_vc(args.pth_path, 0)
+    out_dir = tempfile.mkdtemp(prefix="bench_multikey_")
+    common = dict(
+        sid=0,
+        input_audio_path=args.input_path,
+        f0_method=args.f0method,
+        file_index=args.index_path,
+        index_rate=args.index_rate,
+        rms_mix_rate=1,
+        protect=0.33,
+        hop_length=args.hop_length,
+        f0autotune="False",
+    )
+
+    def separate(key):
+        pipeline.cache_harvest_f0.cache_clear()
+        return infer.vc_single(
+            f0_up_key=key,
+            output_path=os.path.join(out_dir, f"single_key{key:+d}.wav"),
+            **common,
+        )[1]
+
+    def shared(n):
+        pipeline.cache_harvest_f0.cache_clear()
+        results = infer.vc_multi_key(
+            f0_up_keys=keys[:n],
+            output_path=os.path.join(out_dir, "multi.wav"),
+            **common,
+        )
+        return {key: audio for key, (_, audio) in results.items()}
+
+    # First call pays model loading and kernel selection on both paths
+    separate(keys[0])
+
+    single_s, single_audio = {}, {}
+    for key in keys:
+        start = time.perf_counter()
+        single_audio[key] = separate(key)
+        single_s[key] = time.perf_counter() - start
+
+    multi_s, multi_audio = [], {}
+    for n in range(1, len(keys) + 1):
+        start = time.perf_counter()
+        multi_audio = shared(n)
+        multi_s.append(time.perf_counter() - start)
+
+    marginal = (
+        np.polyfit(range(1, len(keys) + 1), multi_s, 1)[0] if len(keys) > 1 else 0
+    )
+    report = {
+        "config": vars(args),
+        "single_s": single_s,
+        "multi_s": dict(zip(range(1, len(keys) + 1), multi_s)),
+        "separate_total_s": sum(single_s.values()),
+        "marginal_key_s": float(marginal),
+        "max_abs_diff": {
+            key: int(
+                np.abs(
+                    single_audio[key].astype(np.int32)
+                    - multi_audio[key].astype(np.int32)
+                ).max()
+            )
+            for key in keys
+        },
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{'keys':>5} {'separate s':>11} {'multi-key s':>12} {'speedup':>8}")
+    for n in range(1, len(keys) + 1):
+        separate_total = sum(single_s[key] for key in keys[:n])
+        print(
+            f"{n:>5} {separate_total:>11.2f} {multi_s[n - 1]:>12.2f} "
+            f"{separate_total / multi_s[n - 1]:>7.2f}x"
+        )
+    print(
+        f"extra key: {marginal:.2f} s with vc_multi_key vs "
+        f"{np.mean(list(single_s.values())):.2f} s per separate run"
+    )
+    print(f"max |diff| per key: {report['max_abs_diff']}")
+    print(f"report: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
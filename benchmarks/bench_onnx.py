@@ -0,0 +1,155 @@
+"""Parity and speed of the ONNX Runtime backend against torch.
+
+    python benchmarks/bench_onnx.py --pth_path logs/model.pth --vocals_dir benchmarks/vocals
+
+Parity checks HuBERT features (cosine similarity, max abs error) on every
+file, then compares full conversions by spectral distance; the NSF source
+draws fresh noise in each backend, so waveforms are not expected to match
+sample for sample. Exits non-zero when a threshold is missed. The benchmark
+reports the real time factor of each backend on the same files.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Also chdirs to the repo root and puts rvc/infer on sys.path
+from bench_quantize import spectral_distance
+
+
+def convert(infer, path, args):
+    start = time.perf_counter()
+    result = infer.vc_single(
+        sid=0,
+        input_audio_path=path,
+        f0_up_key=args.f0up_key,
+        f0_method=args.f0method,
+        file_index=args.index_path,
+        index_rate=args.index_rate,
+        rms_mix_rate=1,
+        protect=0.33,
+        hop_length=128,
+        output_path=None,
+    )
+    elapsed = time.perf_counter() - start
+    if result is None:
+        raise RuntimeError(f"Conversion failed for {path}")
+    return result[1], elapsed
+
+
+def hubert_parity(infer, onnx_backend, files):
+    import torch
+    from rvc.lib.utils import load_audio
+
+    infer.load_hubert()
+    torch_hubert = onnx_backend.HubertFeatures(infer.hubert_model, infer.version).eval()
+    infer.load_onnx_hubert(infer.version)
+    rows = []
+    for path in files:
+        source = torch.from_numpy(load_audio(path, 16000)).float().view(1, -1)
+        with torch.no_grad():
+            expected = torch_hubert(source).numpy()
+        actual = infer.hubert_model.features(source).numpy()
+        cosine = np.sum(expected * actual, axis=-1) / (
+            np.linalg.norm(expected, axis=-1) * np.linalg.norm(actual, axis=-1) + 1e-9
+        )
+        rows.append(
+            {
+                "file": os.path.basename(path),
+                "min_cosine": float(cosine.min()),
+                "max_abs_error": float(np.abs(expected - actual).max()),
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pth_path", required=True)
+    parser.add_argument("--index_path", default="")
+    parser.add_argument("--index_rate", type=float, default=0.3)
+    parser.add_argument("--vocals_dir", required=True)
+    parser.add_argument("--f0method", default="rmvpe")
+    parser.add_argument("--f0up_key", default="0")
+    parser.add_argument(
+        "--threads", type=int, default=0, help="torch and ORT intra-op threads"
+    )
+    parser.add_argument("--min_cosine", type=float, default=0.999)
+    parser.add_argument("--max_lsd_db", type=float, default=1.5)
+    parser.add_argument("--output", default="bench_onnx.json")
+    args = parser.parse_args()
+
+    import torch
+    import soundfile as sf
+
+    import infer
+    import onnx_backend
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    files = sorted(
+        os.path.join(args.vocals_dir, name)
+        for name in os.listdir(args.vocals_dir)
+        if name.endswith((".wav", ".flac"))
+    )
+    if not files:
+        raise SystemExit(f"No .wav/.flac files in {args.vocals_dir}")
+    durations = {path: sf.info(path).duration for path in files}
+
+    outputs, rtf = {}, {}
+    for backend in ("torch", "onnx"):
+        infer.get_vc(
+            args.pth_path, 0, backend_name=backend, onnx_intra_threads=args.threads
+        )
+        convert(infer, files[0], args)
+        rtf[backend] = []
+        for path in files:
+            audio, elapsed = convert(infer, path, args)
+            outputs[backend, path] = audio
+            rtf[backend].append(elapsed / durations[path])
+
+    hubert = hubert_parity(infer, onnx_backend, files)
+    audio = [
+        dict(
+            file=os.path.basename(path),
+            **spectral_distance(outputs["torch", path], outputs["onnx", path]),
+        )
+        for path in files
+    ]
+    failures = [r["file"] for r in hubert if r["min_cosine"] < args.min_cosine]
+    failures += [r["file"] for r in audio if r["lsd_db"] > args.max_lsd_db]
+
+    report = {
+        "config": vars(args),
+        "hubert": hubert,
+        "audio": audio,
+        "rtf": {backend: float(np.mean(values)) for backend, values in rtf.items()},
+        "passed": not failures,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{'file':<28} {'min cos':>8} {'max err':>9} {'LSD dB':>8} {'SNR dB':>8}")
+    for h, a in zip(hubert, audio):
+        print(
+            f"{h['file']:<28} {h['min_cosine']:>8.5f} {h['max_abs_error']:>9.2e} "
+            f"{a['lsd_db']:>8.2f} {a['snr_db']:>8.1f}"
+        )
+    print(
+        f"\nRTF torch {report['rtf']['torch']:.3f}  onnx {report['rtf']['onnx']:.3f}  "
+        f"speedup {report['rtf']['torch'] / report['rtf']['onnx']:.2f}x"
+    )
+    print(f"report: {args.output}")
+    if failures:
+        print(f"Parity FAILED for: {', '.join(sorted(set(failures)))}")
+        sys.exit(1)
+    print("Parity passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Accuracy and real-time factor of dynamic int8 quantization for CPU inference.
+
+    python benchmarks/bench_quantize.py --pth_path logs/model.pth --vocals_dir benchmarks/vocals
+
+Every file in --vocals_dir is converted once per quantization mode. The fp32
+("none") output is the reference: each quantized output is compared with it
+by log-spectral distance, multi-resolution STFT distance and SNR. The real
+time factor is conversion time divided by input duration (lower is faster).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from scipy import signal
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(REPO)
+sys.path.append(REPO)
+sys.path.append(os.path.join(REPO, "rvc", "infer"))
+
+STFT_RESOLUTIONS = ((512, 128), (1024, 256), (2048, 512))
+
+
+def log_magnitude(audio, n_fft, hop):
+    _, _, spec = signal.stft(audio, nperseg=n_fft, noverlap=n_fft - hop)
+    return np.log10(np.maximum(np.abs(spec), 1e-7))
+
+
+def spectral_distance(reference, candidate):
+    n = min(len(reference), len(candidate))
+    reference = reference[:n].astype(np.float32) / 32768
+    candidate = candidate[:n].astype(np.float32) / 32768
+
+    ref_log, cand_log = log_magnitude(reference, 2048, 512), log_magnitude(
+        candidate, 2048, 512
+    )
+    lsd = np.mean(np.sqrt(np.mean((20 * (ref_log - cand_log)) ** 2, axis=0)))
+    mrstft = np.mean(
+        [
+            np.mean(
+                np.abs(
+                    log_magnitude(reference, n_fft, hop)
+                    - log_magnitude(candidate, n_fft, hop)
+                )
+            )
+            for n_fft, hop in STFT_RESOLUTIONS
+        ]
+    )
+    noise = np.sum((reference - candidate) ** 2)
+    snr = 10 * np.log10(np.sum(reference**2) / max(noise, 1e-12))
+    return {"lsd_db": float(lsd), "mrstft": float(mrstft), "snr_db": float(snr)}
+
+
+def convert(infer, path, args):
+    start = time.perf_counter()
+    result = infer.vc_single(
+        sid=0,
+        input_audio_path=path,
+        f0_up_key=args.f0up_key,
+        f0_method=args.f0method,
+        file_index=args.index_path,
+        index_rate=args.index_rate,
+        rms_mix_rate=1,
+        protect=0.33,
+        hop_length=128,
+        output_path=None,
+    )
+    elapsed = time.perf_counter() - start
+    if result is None:
+        raise RuntimeError(f"Conversion failed for {path}")
+    return result[1], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pth_path", required=True)
+    parser.add_argument("--index_path", default="")
+    parser.add_argument("--index_rate", type=float, default=0.3)
+    parser.add_argument(
+        "--vocals_dir", required=True, help="Fixed set of vocal .wav files"
+    )
+    parser.add_argument("--f0method", default="rmvpe")
+    parser.add_argument("--f0up_key", default="0")
+    parser.add_argument("--modes", default="hubert", help="Modes compared against fp32")
+    parser.add_argument(
+        "--threads", type=int, default=0, help="torch intra-op threads (0 = default)"
+    )
+    parser.add_argument("--output", default="bench_quantize.json")
+    args = parser.parse_args()
+
+    import torch
+    import soundfile as sf
+
+    import infer
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    files = sorted(
+        os.path.join(args.vocals_dir, name)
+        for name in os.listdir(args.vocals_dir)
+        if name.endswith((".wav", ".flac"))
+    )
+    if not files:
+        raise SystemExit(f"No .wav/.flac files in {args.vocals_dir}")
+    durations = {path: sf.info(path).duration for path in files}
+
+    modes = ["none"] + [m for m in args.modes.split(",") if m and m != "none"]
+    outputs, results = {}, []
+    for mode in modes:
+        infer.get_vc(args.pth_path, 0, mode)
+        # Warm-up loads HuBERT/F0 models so they do not count towards the first file
+        convert(infer, files[0], args)
+        for path in files:
+            audio, elapsed = convert(infer, path, args)
+            outputs[mode, path] = audio
+            row = {
+                "mode": mode,
+                "file": os.path.basename(path),
+                "rtf": elapsed / durations[path],
+            }
+            if mode != "none":
+                row.update(spectral_distance(outputs["none", path], audio))
+            results.append(row)
+
+    summary = {}
+    for mode in modes:
+        rows = [r for r in results if r["mode"] == mode]
+        summary[mode] = {
+            key: float(np.mean([r[key] for r in rows]))
+            for key in ("rtf", "lsd_db", "mrstft", "snr_db")
+            if key in rows[0]
+        }
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {"config": vars(args), "files": results, "summary": summary}, f, indent=2
+        )
+
+    print(
+        f"{'mode':<8} {'RTF':>7} {'speedup':>8} {'LSD dB':>8} {'MR-STFT':>8} {'SNR dB':>8}"
+    )
+    for mode, s in summary.items():
+        speedup = summary["none"]["rtf"] / s["rtf"]
+        print(
+            f"{mode:<8} {s['rtf']:>7.3f} {speedup:>7.2f}x {s.get('lsd_db', 0):>8.2f} "
+            f"{s.get('mrstft', 0):>8.3f} {s.get('snr_db', float('inf')):>8.1f}"
+        )
+    print(f"report: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Check that mapped safetensors weights stay shared between processes.
+
+    python benchmarks/bench_shared_weights.py --path logs/model.safetensors --processes 2
+    python benchmarks/bench_shared_weights.py --path hubert_base.safetensors --kind hubert
+
+--processes children each load --path (a voice model through
+load_voice_model, or HuBERT through load_hubert) and read every weight.
+While all of them are alive, each one's memory map is read. The check
+fails (exit 1) if any child's Private_Dirty grew by more than --max_private
+of the weights' size, or if less than 1 - --max_private of the weights is
+resident as Shared_Clean pages of the file's own mapping, i.e. the same
+page-cache pages in every child. Without --path, a 256 MB synthetic voice
+model is written to a temporary directory. Linux only (/proc).
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(REPO)
+sys.path.append(REPO)
+
+CHILD = """
+import sys, json
+sys.path.append({repo!r})
+import torch
+
+def smaps():
+    with open("/proc/self/smaps_rollup") as f:
+        return {{l.split(":")[0]: int(l.split()[1]) for l in f if l.split()[-1] == "kB"}}
+
+before = smaps()
+if {kind!r} == "hubert":
+    from rvc.lib.hubert import load_hubert
+    weights = list(load_hubert({path!r}).state_dict().values())
+else:
+    from rvc.lib.model_io import load_voice_model
+    weights = list(load_voice_model({path!r})["weight"].values())
+nbytes = sum(w.numel() * w.element_size() for w in weights)
+# Read every page, as inference would
+checksum = sum(float(w.float().sum()) for w in weights if w.numel())
+print(json.dumps({{"before": before, "nbytes": nbytes}}), flush=True)
+sys.stdin.read()
+"""
+
+
+def synthetic_model(directory):
+    import torch
+    from rvc.lib.model_io import save_voice_model
+
+    path = os.path.join(directory, "synthetic.safetensors")
+    weight = {f"dec.ups.{i}.weight": torch.randn(8 << 20) for i in range(8)}
+    opt = {"weight": weight, "config": [0], "f0": 1, "version": "v2", "sr": "40k"}
+    return save_voice_model(opt, path)
+
+
+def smaps(pid, mapped_path=None):
+    """smaps_rollup of pid, or the summed smaps entries mapping mapped_path, in kB."""
+    if mapped_path is None:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            return {
+                l.split(":")[0]: int(l.split()[1]) for l in f if l.split()[-1] == "kB"
+            }
+    totals, current = {}, False
+    with open(f"/proc/{pid}/smaps") as f:
+        for line in f:
+            fields = line.split()
+            if not line[0].isupper():
+                # A mapping header: address range, perms, offset, dev, inode, path
+                current = len(fields) >= 6 and fields[5] == mapped_path
+            elif current and fields[-1] == "kB":
+                key = fields[0].rstrip(":")
+                totals[key] = totals.get(key, 0) + int(fields[1])
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="")
+    parser.add_argument("--kind", default="voice", choices=["voice", "hubert"])
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--max_private", type=float, default=0.1)
+    parser.add_argument("--output", default="bench_shared_weights.json")
+    args = parser.parse_args()
+
+    path = args.path or synthetic_model(tempfile.mkdtemp(prefix="bench_shared_"))
+    code = CHILD.format(repo=REPO, kind=args.kind, path=path)
+    children = [
+        subprocess.Popen(
+            [sys.executable, "-c", code],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(args.processes)
+    ]
+    rows = []
+    try:
+        loaded = [json.loads(child.stdout.readline()) for child in children]
+        for child, info in zip(children, loaded):
+            after = smaps(child.pid)
+            mapping = smaps(child.pid, os.path.realpath(path))
+            weights_kb = info["nbytes"] / 1024
+            rows.append(
+                {
+                    "pid": child.pid,
+                    "weights_mb": weights_kb / 1024,
+                    "rss_mb": after["Rss"] / 1024,
+                    "pss_mb": after["Pss"] / 1024,
+                    "private_dirty_growth_mb": (
+                        after["Private_Dirty"] - info["before"]["Private_Dirty"]
+                    )
+                    / 1024,
+                    "mapped_rss_mb": mapping.get("Rss", 0) / 1024,
+                    "mapped_shared_mb": mapping.get("Shared_Clean", 0) / 1024,
+                }
+            )
+    finally:
+        for child in children:
+            child.stdin.close()
+            child.wait()
+
+    ok = True
+    for row in rows:
+        limit = args.max_private * row["weights_mb"]
+        row["ok"] = (
+            row["private_dirty_growth_mb"] <= limit
+            and row["mapped_shared_mb"] >= row["weights_mb"] - limit
+        )
+        ok = ok and row["ok"]
+        print(
+            f"pid {row['pid']}: weights {row['weights_mb']:.0f} MB, "
+            f"RSS {row['rss_mb']:.0f} MB, PSS {row['pss_mb']:.0f} MB, "
+            f"Private_Dirty +{row['private_dirty_growth_mb']:.0f} MB, "
+            f"file mapping {row['mapped_rss_mb']:.0f} MB resident, "
+            f"{row['mapped_shared_mb']:.0f} MB shared  "
+            f"{'ok' if row['ok'] else 'FAIL'}"
+        )
+    with open(args.output, "w") as f:
+        json.dump({"config": vars(args), "path": path, "processes": rows}, f, indent=2)
+    print(f"report: {args.output}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
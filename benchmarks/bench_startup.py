@@ -0,0 +1,116 @@
+"""Cold-start cost of constructing Config, and whether it touches files in the tree.
+
+    python benchmarks/bench_startup.py --trees . ../yass-before --runs 20
+
+Each run is a fresh interpreter that imports rvc.configs.config and builds
+Config(), timed from inside the child so interpreter start-up is excluded
+(the torch import is reported separately). Pass a second checkout to compare
+before and after. Modification times of rvc/configs/*/*.json and
+rvc/train/preprocess/preprocess.py are compared across all runs to catch
+rewrites.
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import torch
+imported = time.perf_counter()
+from rvc.configs.config import Config
+Config()
+done = time.perf_counter()
+print(json.dumps({"import_torch": imported - start, "config": done - imported}))
+"""
+
+
+def watched_files(tree):
+    return sorted(glob.glob(os.path.join(tree, "rvc", "configs", "*", "*.json"))) + [
+        os.path.join(tree, "rvc", "train", "preprocess", "preprocess.py")
+    ]
+
+
+def mtimes(paths):
+    return {path: os.stat(path).st_mtime_ns for path in paths if os.path.exists(path)}
+
+
+def measure(tree, runs, env):
+    files = watched_files(tree)
+    before = mtimes(files)
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD],
+            cwd=tree,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    after = mtimes(files)
+    config_ms = sorted(s["config"] * 1000 for s in samples)
+    return {
+        "tree": os.path.abspath(tree),
+        "runs": runs,
+        "import_torch_ms": statistics.median(s["import_torch"] * 1000 for s in samples),
+        "config_median_ms": statistics.median(config_ms),
+        "config_p95_ms": config_ms[min(len(config_ms) - 1, int(0.95 * len(config_ms)))],
+        "first_run_ms": samples[0]["config"] * 1000,
+        "files_rewritten": sorted(
+            os.path.relpath(path, tree)
+            for path in before
+            if before[path] != after.get(path)
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--trees", nargs="+", default=["."], help="checkouts to compare"
+    )
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument(
+        "--device_cache",
+        default="",
+        help="RVC_DEVICE_CACHE for the children; empty starts from a fresh cache file",
+    )
+    parser.add_argument("--output", default="bench_startup.json")
+    args = parser.parse_args()
+
+    rows = []
+    for tree in args.trees:
+        env = dict(os.environ)
+        # A fresh cache per tree: the first run probes, the rest may reuse it
+        env["RVC_DEVICE_CACHE"] = args.device_cache or os.path.join(
+            tempfile.gettempdir(), f"bench_startup_device_cache_{len(rows)}.json"
+        )
+        if not args.device_cache and os.path.exists(env["RVC_DEVICE_CACHE"]):
+            os.remove(env["RVC_DEVICE_CACHE"])
+        rows.append(measure(tree, args.runs, env))
+
+    with open(args.output, "w") as f:
+        json.dump({"config": vars(args), "results": rows}, f, indent=2)
+
+    print(
+        f"{'tree':<40} {'torch ms':>9} {'first ms':>9} {'median ms':>10} {'p95 ms':>8}  rewritten"
+    )
+    for row in rows:
+        print(
+            f"{row['tree'][-40:]:<40} {row['import_torch_ms']:>9.0f} {row['first_run_ms']:>9.1f} "
+            f"{row['config_median_ms']:>10.1f} {row['config_p95_ms']:>8.1f}  "
+            f"{len(row['files_rewritten'])} files"
+        )
+    print(f"report: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Concurrent /stream throughput and server CPU: legacy generator vs RangeFileResponse.
+
+    python benchmarks/bench_stream.py --size_mb 50 --concurrency 16 --requests 64
+
+Each implementation runs in its own uvicorn process so the reported CPU time
+(read from /proc, Linux only) belongs to the server alone.
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_app(mode: str, file_path: str):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import StreamingResponse
+
+    from stream_utils import RangeFileResponse
+
+    app = FastAPI()
+
+    async def legacy_stream(path: str):
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                yield chunk
+
+    @app.get("/ready")
+    async def ready():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream(request: Request):
+        if mode == "legacy":
+            return StreamingResponse(legacy_stream(file_path), media_type="audio/wav")
+        return RangeFileResponse(
+            file_path, request.headers, media_type="audio/wav", method=request.method
+        )
+
+    return app
+
+
+def process_cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    utime, stime = int(fields[11]), int(fields[12])
+    return (utime + stime) / os.sysconf("SC_CLK_TCK")
+
+
+async def drive(
+    port: int, concurrency: int, requests: int, range_bytes: int, file_size: int
+):
+    semaphore = asyncio.Semaphore(concurrency)
+    total_bytes = 0
+    latencies = []
+
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}", timeout=None
+    ) as client:
+
+        async def one(i: int):
+            nonlocal total_bytes
+            headers = {}
+            if range_bytes and i % 2:
+                offset = (i * range_bytes) % max(file_size - range_bytes, 1)
+                headers["Range"] = f"bytes={offset}-{offset + range_bytes - 1}"
+            async with semaphore:
+                start = time.perf_counter()
+                async with client.stream("GET", "/stream", headers=headers) as response:
+                    async for chunk in response.aiter_raw():
+                        total_bytes += len(chunk)
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        wall = time.perf_counter() - start
+
+    latencies.sort()
+    return wall, total_bytes, latencies
+
+
+def run_mode(mode: str, args, file_path: str) -> dict:
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            __file__,
+            "--serve",
+            mode,
+            "--file",
+            file_path,
+            "--port",
+            str(args.port),
+        ],
+    )
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                httpx.get(f"http://127.0.0.1:{args.port}/ready")
+                break
+            except httpx.TransportError:
+                if time.time() > deadline:
+                    raise RuntimeError(f"{mode} server did not start")
+                time.sleep(0.2)
+
+        cpu_before = process_cpu_seconds(server.pid)
+        wall, total_bytes, latencies = asyncio.run(
+            drive(
+                args.port,
+                args.concurrency,
+                args.requests,
+                args.range_kb * 1024,
+                os.path.getsize(file_path),
+            )
+        )
+        cpu = process_cpu_seconds(server.pid) - cpu_before
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {
+        "mode": mode,
+        "wall_s": wall,
+        "mb_per_s": total_bytes / wall / 1024 / 1024,
+        "server_cpu_s": cpu,
+        "cpu_ms_per_mb": cpu * 1000 / max(total_bytes / 1024 / 1024, 1e-9),
+        "p50_s": latencies[len(latencies) // 2],
+        "p95_s": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size_mb", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument(
+        "--range_kb",
+        type=int,
+        default=0,
+        help="Send every other request as a Range request of this size",
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--serve", choices=["legacy", "range"], help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        import uvicorn
+
+        uvicorn.run(
+            build_app(args.serve, args.file),
+            host="127.0.0.1",
+            port=args.port,
+            log_level="warning",
+        )
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "vocals.wav")
+        with open(file_path, "wb") as f:
+            f.write(os.urandom(args.size_mb * 1024 * 1024))
+
+        results = [run_mode(mode, args, file_path) for mode in ("legacy", "range")]
+
+    print(
+        f"{'mode':<8} {'wall s':>8} {'MB/s':>9} {'cpu s':>8} {'cpu ms/MB':>10} {'p50 s':>8} {'p95 s':>8}"
+    )
+    for r in results:
+        print(
+            f"{r['mode']:<8} {r['wall_s']:>8.2f} {r['mb_per_s']:>9.1f} {r['server_cpu_s']:>8.2f} "
+            f"{r['cpu_ms_per_mb']:>10.2f} {r['p50_s']:>8.3f} {r['p95_s']:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""Deterministic stand-in for edge-tts used by the load-test harness.
+
+Writes the fixture audio from FAKE_TTS_FIXTURE instead of calling the Edge
+service. FAKE_TTS_DELAY (seconds) emulates synthesis latency.
+"""
+
+import asyncio
+import os
+import shutil
+
+
+class Communicate:
+    def __init__(self, text, voice, **kwargs):
+        self.text = text
+        self.voice = voice
+
+    async def save(self, audio_fname):
+        delay = float(os.environ.get("FAKE_TTS_DELAY", "0"))
+        if delay:
+            await asyncio.sleep(delay)
+        shutil.copyfile(os.environ["FAKE_TTS_FIXTURE"], audio_fname)
@@ -0,0 +1,44 @@
+"""Local-directory stand-in for the MinIO client used by storage_utils.
+
+Objects are copied to FAKE_MINIO_DIR/<bucket>/<object>. FAKE_MINIO_DELAY
+(seconds) is added to each request to emulate network latency.
+"""
+
+import os
+import shutil
+import time
+
+
+class Minio:
+    def __init__(
+        self, endpoint, access_key=None, secret_key=None, secure=True, **kwargs
+    ):
+        self.root = os.environ.get("FAKE_MINIO_DIR", "/tmp/fake-minio")
+        self.delay = float(os.environ.get("FAKE_MINIO_DELAY", "0"))
+
+    def _wait(self):
+        if self.delay:
+            time.sleep(self.delay)
+
+    def bucket_exists(self, bucket_name):
+        self._wait()
+        return os.path.isdir(os.path.join(self.root, bucket_name))
+
+    def make_bucket(self, bucket_name):
+        self._wait()
+        os.makedirs(os.path.join(self.root, bucket_name), exist_ok=True)
+
+    def fput_object(
+        self, bucket_name, object_name, file_path, content_type=None, **kwargs
+    ):
+        self._wait()
+        target = os.path.join(self.root, bucket_name, object_name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(file_path, target)
+
+    def remove_object(self, bucket_name, object_name):
+        self._wait()
+        try:
+            os.remove(os.path.join(self.root, bucket_name, object_name))
+        except FileNotFoundError:
+            pass
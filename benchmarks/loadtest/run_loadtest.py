@@ -0,0 +1,529 @@
+"""Offline load test for app.py + Celery workers with fake yt-dlp, edge-tts and MinIO.
+
+    python benchmarks/loadtest/run_loadtest.py --mix separate:3,tts:1 --concurrency 8 --requests 40
+
+Starts a private redis-server, a Celery worker and uvicorn (app:app) with
+benchmarks/loadtest/fakes first on PYTHONPATH, so yt-dlp, edge-tts and MinIO
+are replaced by deterministic local stand-ins serving a generated fixture.
+Each simulated user submits a job, polls /status until it settles and then
+fetches /result. Reports throughput, p50/p95/p99 per endpoint and end-to-end,
+per-stage quantiles estimated from the yass_stage_seconds histogram, and
+CPU/RSS of every started process tree (read from /proc, Linux only).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+import numpy as np
+import soundfile as sf
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(os.path.dirname(HERE))
+FAKES = os.path.join(HERE, "fakes")
+
+ENDPOINTS = {"separate": "/process_audio/", "tts": "/tts/"}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        kind, _, weight = part.partition(":")
+        kind = kind.strip()
+        if kind not in ENDPOINTS:
+            raise SystemExit(
+                f"Unknown request kind {kind!r}; expected one of {sorted(ENDPOINTS)}"
+            )
+        weights[kind] = float(weight or 1)
+    return weights
+
+
+def percentile(values, q: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def summarize(values) -> dict:
+    return {
+        "count": len(values),
+        "p50_s": percentile(values, 50),
+        "p95_s": percentile(values, 95),
+        "p99_s": percentile(values, 99),
+        "max_s": max(values) if values else None,
+    }
+
+
+def make_fixture(path: str, seconds: float, sample_rate: int = 44100):
+    """Deterministic stereo mix of two tones, encoded to mp3 with ffmpeg."""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    left = 0.3 * np.sin(2 * np.pi * 220.0 * t) + 0.1 * np.sin(2 * np.pi * 660.0 * t)
+    right = 0.3 * np.sin(2 * np.pi * 330.0 * t) + 0.1 * np.sin(2 * np.pi * 880.0 * t)
+    wav_path = os.path.splitext(path)[0] + ".wav"
+    sf.write(wav_path, np.stack([left, right], axis=1).astype(np.float32), sample_rate)
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-i", wav_path, "-b:a", "192k", path],
+        check=True,
+    )
+    os.remove(wav_path)
+
+
+# ---- /proc sampling ----
+
+
+def _children(pid: int):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def _tree(pid: int):
+    pids, stack = [], [pid]
+    while stack:
+        p = stack.pop()
+        pids.append(p)
+        stack.extend(_children(p))
+    return pids
+
+
+def _cpu_rss(pid: int):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return 0.0, 0
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    rss = int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+    return cpu, rss
+
+
+class ResourceSampler(threading.Thread):
+    """Samples CPU seconds and RSS of each named process tree at a fixed interval."""
+
+    def __init__(self, procs: dict, interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.procs = procs
+        self.interval = interval
+        self.stop_event = threading.Event()
+        # 종료된 자식 프로세스의 CPU 도 잃지 않도록 pid 별 최대값을 누적한다
+        self.cpu = {name: {} for name in procs}
+        self.peak_rss = {name: 0 for name in procs}
+        self.rss_samples = {name: [] for name in procs}
+
+    def sample(self):
+        for name, proc in self.procs.items():
+            total_rss = 0
+            for pid in _tree(proc.pid):
+                cpu, rss = _cpu_rss(pid)
+                self.cpu[name][pid] = max(self.cpu[name].get(pid, 0.0), cpu)
+                total_rss += rss
+            self.peak_rss[name] = max(self.peak_rss[name], total_rss)
+            self.rss_samples[name].append(total_rss)
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+
+    def report(self, baseline: dict) -> dict:
+        return {
+            name: {
+                "cpu_s": sum(self.cpu[name].values()) - baseline.get(name, 0.0),
+                "peak_rss_mb": self.peak_rss[name] / 1024 / 1024,
+                "mean_rss_mb": (
+                    float(np.mean(self.rss_samples[name])) / 1024 / 1024
+                    if self.rss_samples[name]
+                    else 0.0
+                ),
+            }
+            for name in self.procs
+        }
+
+
+# ---- histogram scraping ----
+
+
+def stage_quantiles(metrics_text: str) -> dict:
+    """Estimate per-stage p50/p95/p99 from cumulative yass_stage_seconds buckets."""
+    from prometheus_client.parser import text_string_to_metric_families
+
+    buckets = {}
+    for family in text_string_to_metric_families(metrics_text):
+        if family.name != "yass_stage_seconds":
+            continue
+        for sample in family.samples:
+            if sample.name.endswith("_bucket"):
+                stage = sample.labels["stage"]
+                buckets.setdefault(stage, []).append(
+                    (float(sample.labels["le"]), sample.value)
+                )
+
+    result = {}
+    for stage, pairs in buckets.items():
+        pairs.sort()
+        total = pairs[-1][1]
+        if not total:
+            continue
+        stats = {"count": int(total)}
+        for q in (50, 95, 99):
+            rank = total * q / 100
+            prev_le, prev_count = 0.0, 0.0
+            for le, count in pairs:
+                if count >= rank:
+                    if le == float("inf"):
+                        # +Inf 버킷은 보간할 상한이 없으므로 마지막 유한 경계를 보고한다
+                        stats[f"p{q}_s"] = prev_le
+                    else:
+                        fraction = (rank - prev_count) / max(count - prev_count, 1e-9)
+                        stats[f"p{q}_s"] = prev_le + (le - prev_le) * fraction
+                    break
+                prev_le, prev_count = le, count
+        result[stage] = stats
+    return result
+
+
+# ---- load driver ----
+
+
+async def drive(base_url: str, args, weights: dict) -> dict:
+    rng = random.Random(args.seed)
+    kinds = list(weights)
+    plan = rng.choices(kinds, weights=[weights[k] for k in kinds], k=args.requests)
+
+    endpoint_latency = {}
+    end_to_end = {kind: [] for kind in kinds}
+    outcomes = {kind: {} for kind in kinds}
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    def record(name: str, seconds: float):
+        endpoint_latency.setdefault(name, []).append(seconds)
+
+    async def timed(client, method: str, path: str, name: str, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, path, **kwargs)
+        record(name, time.perf_counter() - start)
+        return response
+
+    async def one(i: int, kind: str, client):
+        async with semaphore:
+            start = time.perf_counter()
+            if kind == "separate":
+                response = await timed(
+                    client,
+                    "POST",
+                    ENDPOINTS[kind],
+                    "POST /process_audio/",
+                    json={"url": f"https://www.youtube.com/watch?v=loadtest{i:05d}"},
+                )
+            else:
+                response = await timed(
+                    client,
+                    "POST",
+                    ENDPOINTS[kind],
+                    "POST /tts/",
+                    data={
+                        "text": f"load test sentence number {i}",
+                        "voice": "ko-KR-SunHiNeural",
+                    },
+                )
+
+            if response.status_code != 200:
+                status = f"http_{response.status_code}"
+            else:
+                task_id = response.json()["task_id"]
+                deadline = time.perf_counter() + args.task_timeout
+                status = "timeout"
+                while time.perf_counter() < deadline:
+                    state = (
+                        await timed(client, "GET", f"/status/{task_id}", "GET /status")
+                    ).json()["status"]
+                    if state in ("SUCCESS", "FAILURE", "REVOKED"):
+                        result = await timed(
+                            client, "GET", f"/result/{task_id}", "GET /result"
+                        )
+                        status = (
+                            "ok"
+                            if state == "SUCCESS" and result.status_code == 200
+                            else state.lower()
+                        )
+                        break
+                    await asyncio.sleep(args.poll_interval)
+
+            outcomes[kind][status] = outcomes[kind].get(status, 0) + 1
+            if status == "ok":
+                end_to_end[kind].append(time.perf_counter() - start)
+
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=args.task_timeout
+    ) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i, kind, client) for i, kind in enumerate(plan)))
+        wall = time.perf_counter() - start
+
+    completed = sum(len(v) for v in end_to_end.values())
+    return {
+        "wall_s": wall,
+        "completed": completed,
+        "throughput_jobs_per_s": completed / wall if wall else 0.0,
+        "outcomes": outcomes,
+        "endpoints": {
+            name: summarize(values) for name, values in sorted(endpoint_latency.items())
+        },
+        "end_to_end": {kind: summarize(values) for kind, values in end_to_end.items()},
+    }
+
+
+# ---- process management ----
+
+
+def wait_until(predicate, timeout: float, what: str):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if predicate():
+                return
+        except Exception:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{what} did not become ready within {timeout:.0f}s")
+
+
+def stop(proc: subprocess.Popen):
+    if proc.poll() is not None:
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=20)
+    except subprocess.TimeoutExpired:
+        os.killpg(proc.pid, signal.SIGKILL)
+        proc.wait()
+    except ProcessLookupError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--mix",
+        default="separate:3,tts:1",
+        help="Weighted request kinds, e.g. separate:3,tts:1",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="Simulated concurrent users"
+    )
+    parser.add_argument("--requests", type=int, default=40, help="Total jobs to submit")
+    parser.add_argument(
+        "--worker_concurrency", type=int, default=2, help="Celery worker processes"
+    )
+    parser.add_argument("--fixture_seconds", type=float, default=30.0)
+    parser.add_argument(
+        "--download_delay",
+        type=float,
+        default=0.0,
+        help="Seconds the fake yt-dlp sleeps per download",
+    )
+    parser.add_argument(
+        "--tts_delay",
+        type=float,
+        default=0.0,
+        help="Seconds the fake edge-tts sleeps per synthesis",
+    )
+    parser.add_argument(
+        "--minio_delay",
+        type=float,
+        default=0.0,
+        help="Seconds added to each fake MinIO call",
+    )
+    parser.add_argument("--poll_interval", type=float, default=0.5)
+    parser.add_argument("--task_timeout", type=float, default=600.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="loadtest_report.json")
+    parser.add_argument(
+        "--keep_logs", action="store_true", help="Keep the work dir with service logs"
+    )
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+    redis_server = shutil.which("redis-server")
+    if redis_server is None:
+        raise SystemExit("redis-server not found on PATH")
+
+    work_dir = tempfile.mkdtemp(prefix="yass-loadtest-")
+    multiproc_dir = os.path.join(work_dir, "prometheus")
+    os.makedirs(multiproc_dir)
+    fixture = os.path.join(work_dir, "fixture.mp3")
+    make_fixture(fixture, args.fixture_seconds)
+
+    redis_port, api_port, metrics_port = free_port(), free_port(), free_port()
+    broker = f"redis://127.0.0.1:{redis_port}/0"
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(
+            [FAKES, REPO, os.environ.get("PYTHONPATH", "")]
+        ).rstrip(os.pathsep),
+        CELERY_BROKER_URL=broker,
+        CELERY_RESULT_BACKEND=broker,
+        YTDLP_CMD=f"{sys.executable} {os.path.join(FAKES, 'bin', 'yt-dlp')}",
+        FAKE_YTDLP_FIXTURE=fixture,
+        FAKE_YTDLP_DURATION=str(int(args.fixture_seconds)),
+        FAKE_YTDLP_DELAY=str(args.download_delay),
+        FAKE_TTS_FIXTURE=fixture,
+        FAKE_TTS_DELAY=str(args.tts_delay),
+        FAKE_MINIO_DIR=os.path.join(work_dir, "minio"),
+        FAKE_MINIO_DELAY=str(args.minio_delay),
+        PROMETHEUS_MULTIPROC_DIR=multiproc_dir,
+        WORKER_METRICS_PORT=str(metrics_port),
+    )
+
+    def spawn(name: str, command):
+        log = open(os.path.join(work_dir, f"{name}.log"), "wb")
+        return subprocess.Popen(
+            command,
+            cwd=REPO,
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+
+    procs = {}
+    try:
+        procs["redis"] = spawn(
+            "redis",
+            [
+                redis_server,
+                "--port",
+                str(redis_port),
+                "--save",
+                "",
+                "--appendonly",
+                "no",
+            ],
+        )
+        wait_until(
+            lambda: socket.create_connection(
+                ("127.0.0.1", redis_port), timeout=1
+            ).close()
+            is None,
+            15,
+            "redis",
+        )
+
+        procs["worker"] = spawn(
+            "worker",
+            [
+                sys.executable,
+                "-m",
+                "celery",
+                "-A",
+                "celery_task",
+                "worker",
+                "--loglevel",
+                "INFO",
+                "--concurrency",
+                str(args.worker_concurrency),
+            ],
+        )
+        procs["api"] = spawn(
+            "api",
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "app:app",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(api_port),
+                "--log-level",
+                "warning",
+            ],
+        )
+        wait_until(
+            lambda: httpx.get(f"http://127.0.0.1:{api_port}/metrics/").status_code
+            == 200,
+            60,
+            "api",
+        )
+        wait_until(
+            lambda: httpx.get(f"http://127.0.0.1:{metrics_port}/metrics").status_code
+            == 200,
+            120,
+            "worker",
+        )
+
+        sampler = ResourceSampler(procs)
+        sampler.sample()
+        baseline = {name: sum(cpu.values()) for name, cpu in sampler.cpu.items()}
+        sampler.start()
+
+        load = asyncio.run(drive(f"http://127.0.0.1:{api_port}", args, weights))
+
+        sampler.stop_event.set()
+        sampler.join()
+        sampler.sample()
+        # 워커와 API 가 같은 multiproc 디렉터리를 쓰므로 한 번의 스크레이프로 모든 단계가 합산된다
+        metrics_text = httpx.get(f"http://127.0.0.1:{metrics_port}/metrics").text
+    finally:
+        for name in ("api", "worker", "redis"):
+            if name in procs:
+                stop(procs[name])
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        **load,
+        "stages": stage_quantiles(metrics_text),
+        "resources": sampler.report(baseline),
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.keep_logs:
+        print(f"logs: {work_dir}")
+    else:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    def fmt(value):
+        return f"{value:8.3f}" if value is not None else "       -"
+
+    print(
+        f"completed {load['completed']}/{args.requests} jobs in {load['wall_s']:.1f}s "
+        f"({load['throughput_jobs_per_s']:.2f} jobs/s)  outcomes={load['outcomes']}"
+    )
+    print(f"\n{'latency':<22} {'count':>6} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8}")
+    rows = [(name, s) for name, s in load["endpoints"].items()]
+    rows += [(f"e2e {kind}", s) for kind, s in load["end_to_end"].items()]
+    rows += [(f"stage {stage}", s) for stage, s in sorted(report["stages"].items())]
+    for name, s in rows:
+        print(
+            f"{name:<22} {s['count']:>6} {fmt(s.get('p50_s'))} {fmt(s.get('p95_s'))} {fmt(s.get('p99_s'))}"
+        )
+    print(f"\n{'process':<8} {'cpu s':>8} {'peak MB':>9} {'mean MB':>9}")
+    for name, r in report["resources"].items():
+        print(
+            f"{name:<8} {r['cpu_s']:>8.2f} {r['peak_rss_mb']:>9.1f} {r['mean_rss_mb']:>9.1f}"
+        )
+    print(f"\nreport: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
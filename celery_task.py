@@ -12,6 +12,7 @@ from celery_worker import celery_app
 from mytts import run_tts_task
 from audio_utils import download_audio, separate_audio
 from storage_utils import upload_to_minio, delete_from_minio
+from metrics_utils import observe_stage
 import traceback
 
 logger = logging.getLogger(__name__)
@@ -64,8 +65,9 @@ def process_audio_task(self, youtube_url: str):
 
         # 5. 업로드 및 삭제예약
         logger.info("☁️ MinIO 업로드 시작")
-        vocal_url = upload_with_deletion("separation-bucket", vocal_final, vocal_name)
-        accomp_url = upload_with_deletion("separation-bucket", accomp_final, accomp_name)
+        with observe_stage("upload"):
+            vocal_url = upload_with_deletion("separation-bucket", vocal_final, vocal_name)
+            accomp_url = upload_with_deletion("separation-bucket", accomp_final, accomp_name)
         logger.info("✅ 모든 업로드 및 삭제예약 완료")
 
         return {
@@ -91,9 +93,11 @@ def tts_task(self, text: str, voice: str):
         output_path = os.path.join(temp_dir, filename)
 
         logger.info("🗣️ TTS 작업 시작")
-        run_tts_task(text, voice, output_path)
+        with observe_stage("tts"):
+            run_tts_task(text, voice, output_path)
 
-        url = upload_with_deletion("tts-bucket", output_path, filename)
+        with observe_stage("upload"):
+            url = upload_with_deletion("tts-bucket", output_path, filename)
         logger.info(f"✅ TTS 업로드 및 삭제 예약 완료 - URL: {url}")
 
         return {"url": url}
@@ -1,13 +1,18 @@
+import os
 from celery import Celery
+from metrics_utils import install_celery_metrics
 
 celery_app = Celery(
     "yass_tasks",
-    broker="redis://localhost:6379/0",
-    backend="redis://localhost:6379/0",
+    broker=os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/0"),
+    backend=os.environ.get("CELERY_RESULT_BACKEND", "redis://localhost:6379/0"),
 )
 
 celery_app.conf.task_track_started = True
 
+# 📈 태스크 재시도/실패 카운터 + 워커 exporter (WORKER_METRICS_PORT, 기본 9808)
+install_celery_metrics(celery_app)
+
 # ✅ Task 모듈 명시적으로 import해서 등록되게 함
 import celery_task
 
@@ -12,8 +12,13 @@ from rvc.configs.config import Config
 from rvc.train.extract.preparing_files import generate_config, generate_filelist
 from rvc.lib.tools.pretrained_selector import pretrained_selector
 
-from rvc.train.process.model_blender import model_blender
+from rvc.train.process.model_blender import (
+    model_blender,
+    parse_group_weights,
+    parse_weights,
+)
 from rvc.train.process.model_information import model_information
+from rvc.lib.model_catalog import DEFAULT_ROOTS, ModelCatalog
 
 config = Config()
 current_script_directory = os.path.dirname(os.path.realpath(__file__))
@@ -44,6 +49,18 @@ def run_infer_script(
     clean_audio,
     clean_strength,
     export_format,
+    quantize="none",
+    use_jit="False",
+    backend="torch",
+    pipelined="False",
+    long_form="False",
+    long_form_window=30,
+    crepe_batch_size="0",
+    crepe_decoder="viterbi",
+    crepe_silence_db="none",
+    f0up_keys="",
+    onnx_intra_threads="0",
+    onnx_inter_threads="0",
 ):
     infer_script_path = os.path.join("rvc", "infer", "infer.py")
     command = [
@@ -68,6 +85,18 @@ def run_infer_script(
                 clean_audio,
                 clean_strength,
                 export_format,
+                quantize,
+                use_jit,
+                backend,
+                pipelined,
+                long_form,
+                long_form_window,
+                crepe_batch_size,
+                crepe_decoder,
+                crepe_silence_db,
+                f0up_keys,
+                onnx_intra_threads,
+                onnx_inter_threads,
             ],
         ),
     ]
@@ -93,53 +122,54 @@ def run_batch_infer_script(
     clean_audio,
     clean_strength,
     export_format,
+    quantize="none",
+    use_jit="False",
+    backend="torch",
+    f0_workers="0",
+    pipelined="False",
+    crepe_batch_size="0",
+    crepe_decoder="viterbi",
+    crepe_silence_db="none",
+    onnx_intra_threads="0",
+    onnx_inter_threads="0",
 ):
-    infer_script_path = os.path.join("rvc", "infer", "infer.py")
-
-    audio_files = [
-        f for f in os.listdir(input_folder) if f.endswith((".mp3", ".wav", ".flac"))
-    ]
-    print(f"Detected {len(audio_files)} audio files for inference.")
-
-    for audio_file in audio_files:
-        if "_output" in audio_file:
-            pass
-        else:
-            input_path = os.path.join(input_folder, audio_file)
-            output_file_name = os.path.splitext(os.path.basename(audio_file))[0]
-            output_path = os.path.join(
+    batch_infer_script_path = os.path.join("rvc", "infer", "batch_infer.py")
+    command = [
+        "python",
+        *map(
+            str,
+            [
+                batch_infer_script_path,
+                f0up_key,
+                filter_radius,
+                index_rate,
+                hop_length,
+                f0method,
+                input_folder,
                 output_folder,
-                f"{output_file_name}_output{os.path.splitext(audio_file)[1]}",
-            )
-            print(f"Inferring {input_path}...")
-
-        command = [
-            "python",
-            *map(
-                str,
-                [
-                    infer_script_path,
-                    f0up_key,
-                    filter_radius,
-                    index_rate,
-                    hop_length,
-                    f0method,
-                    input_path,
-                    output_path,
-                    pth_path,
-                    index_path,
-                    split_audio,
-                    f0autotune,
-                    rms_mix_rate,
-                    protect,
-                    clean_audio,
-                    clean_strength,
-                    export_format,
-                ],
-            ),
-        ]
-        subprocess.run(command)
-
+                pth_path,
+                index_path,
+                split_audio,
+                f0autotune,
+                rms_mix_rate,
+                protect,
+                clean_audio,
+                clean_strength,
+                export_format,
+                quantize,
+                use_jit,
+                backend,
+                f0_workers,
+                pipelined,
+                crepe_batch_size,
+                crepe_decoder,
+                crepe_silence_db,
+                onnx_intra_threads,
+                onnx_inter_threads,
+            ],
+        ),
+    ]
+    subprocess.run(command)
     return f"Files from {input_folder} inferred successfully."
 
 
@@ -163,6 +193,10 @@ def run_tts_script(
     clean_audio,
     clean_strength,
     export_format,
+    quantize="none",
+    use_jit="False",
+    backend="torch",
+    pipelined="False",
 ):
     tts_script_path = os.path.join("rvc", "lib", "tools", "tts.py")
     infer_script_path = os.path.join("rvc", "infer", "infer.py")
@@ -200,6 +234,10 @@ def run_tts_script(
                 clean_audio,
                 clean_strength,
                 export_format,
+                quantize,
+                use_jit,
+                backend,
+                pipelined,
             ],
         ),
     ]
@@ -210,7 +248,7 @@ def run_tts_script(
 
 # Preprocess
 def run_preprocess_script(model_name, dataset_path, sampling_rate):
-    per = 3.0 if config.is_half else 3.7
+    per = config.preprocess_per
     preprocess_script_path = os.path.join("rvc", "train", "preprocess", "preprocess.py")
     command = [
         "python",
@@ -295,6 +333,7 @@ def run_train_script(
     custom_pretrained,
     g_pretrained_path=None,
     d_pretrained_path=None,
+    model_format="pth",
 ):
     f0 = 1 if str(pitch_guidance) == "True" else 0
     latest = 1 if str(save_only_latest) == "True" else 0
@@ -350,6 +389,8 @@ def run_train_script(
                 detector,
                 "-ot",
                 overtraining_threshold,
+                "-mf",
+                model_format,
             ],
         ),
     ]
@@ -360,13 +401,15 @@ def run_train_script(
 
 
 # Index
-def run_index_script(model_name, rvc_version):
+def run_index_script(model_name, rvc_version, index_type="ivf_flat", index_params=""):
     index_script_path = os.path.join("rvc", "train", "process", "extract_index.py")
     command = [
         "python",
         index_script_path,
         os.path.join(logs_path, model_name),
         rvc_version,
+        index_type,
+        index_params,
     ]
 
     subprocess.run(command)
@@ -375,7 +418,14 @@ def run_index_script(model_name, rvc_version):
 
 # Model extract
 def run_model_extract_script(
-    pth_path, model_name, sampling_rate, pitch_guidance, rvc_version, epoch, step
+    pth_path,
+    model_name,
+    sampling_rate,
+    pitch_guidance,
+    rvc_version,
+    epoch,
+    step,
+    model_format="pth",
 ):
     f0 = 1 if str(pitch_guidance) == "True" else 0
     model_extract_script_path = os.path.join(
@@ -391,23 +441,115 @@ def run_model_extract_script(
         rvc_version,
         epoch,
         step,
+        model_format,
     ]
 
     subprocess.run(command)
     return f"Model {model_name} extracted successfully."
 
 
+# Model convert
+def run_model_convert_script(pth_path, output_path, dtype):
+    model_convert_script_path = os.path.join("rvc", "lib", "model_io.py")
+    command = [
+        "python",
+        model_convert_script_path,
+        pth_path,
+        output_path,
+        dtype,
+    ]
+    subprocess.run(command)
+    return f"Model {pth_path} converted successfully."
+
+
 # Model information
 def run_model_information_script(pth_path):
     print(model_information(pth_path))
 
 
+# Model catalog
+def run_model_catalog_script(query, roots, rvc_version, sampling_rate):
+    models = ModelCatalog().search(
+        query=query,
+        roots=roots.split(","),
+        version=rvc_version or None,
+        sr=sampling_rate or None,
+    )
+    for model in models:
+        print(
+            f"{model['name']}\t{model['version']}\t{model['sr']}\t"
+            f"f0={model['f0']}\tepoch={model['epoch']}\t{model['path']}"
+        )
+    return models
+
+
 # Model blender
-def run_model_blender_script(model_name, pth_path_1, pth_path_2, ratio):
-    message, model_blended = model_blender(model_name, pth_path_1, pth_path_2, ratio)
+def run_model_blender_script(
+    model_name,
+    pth_path_1,
+    pth_path_2,
+    ratio,
+    pth_paths="",
+    weights="",
+    group_weights="",
+):
+    if pth_paths:
+        paths = pth_paths.split(",")
+        shares = parse_weights(weights) if weights else None
+    else:
+        paths = [pth_path_1, pth_path_2]
+        shares = [float(ratio), 1 - float(ratio)]
+    message, model_blended = model_blender(
+        model_name, paths, shares, parse_group_weights(group_weights)
+    )
     return message, model_blended
 
 
+# TorchScript export
+def run_jit_export_script(pth_path):
+    jit_export_script_path = os.path.join("rvc", "infer", "synthesizer_jit.py")
+    command = [
+        "python",
+        jit_export_script_path,
+        pth_path,
+    ]
+    subprocess.run(command)
+    return f"TorchScript synthesizer for {pth_path} exported successfully."
+
+
+# Calibrate
+def run_calibrate_script(pth_path, input_path, memory_budget, f0method, repeats):
+    calibrate_script_path = os.path.join("rvc", "infer", "calibrate.py")
+    command = [
+        "python",
+        *map(
+            str,
+            [
+                calibrate_script_path,
+                pth_path,
+                input_path,
+                memory_budget,
+                f0method,
+                repeats,
+            ],
+        ),
+    ]
+    subprocess.run(command)
+    return f"Host profile for {pth_path} calibrated successfully."
+
+
+# ONNX export
+def run_onnx_export_script(pth_path):
+    onnx_export_script_path = os.path.join("rvc", "infer", "onnx_backend.py")
+    command = [
+        "python",
+        onnx_export_script_path,
+        pth_path,
+    ]
+    subprocess.run(command)
+    return f"ONNX models for {pth_path} exported successfully."
+
+
 # Tensorboard
 def run_tensorboard_script():
     tensorboard_script_path = os.path.join(
@@ -586,6 +728,85 @@ def parse_arguments():
         choices=["WAV", "MP3", "FLAC", "OGG", "M4A"],
         default="WAV",
     )
+    infer_parser.add_argument(
+        "--quantize",
+        type=str,
+        help="Dynamic int8 quantization of HuBERT's Linear layers for fp32 CPU "
+        "inference; the synthesizer is convolutional and is not quantized",
+        choices=["none", "hubert"],
+        default="none",
+    )
+    infer_parser.add_argument(
+        "--use_jit",
+        type=str,
+        help="Use the cached TorchScript synthesizer",
+        choices=["True", "False"],
+        default="False",
+    )
+    infer_parser.add_argument(
+        "--backend",
+        type=str,
+        help="Inference backend",
+        choices=["torch", "onnx"],
+        default="torch",
+    )
+    infer_parser.add_argument(
+        "--onnx_intra_threads",
+        type=str,
+        help="Threads each ONNX operator may use (0 = onnxruntime's default)",
+        default="0",
+    )
+    infer_parser.add_argument(
+        "--onnx_inter_threads",
+        type=str,
+        help="Threads running independent ONNX operators in parallel (0 = sequential)",
+        default="0",
+    )
+    infer_parser.add_argument(
+        "--pipelined",
+        type=str,
+        help="Overlap feature extraction, synthesis and post-processing of chunks",
+        choices=["True", "False"],
+        default="False",
+    )
+    infer_parser.add_argument(
+        "--long_form",
+        type=str,
+        help="Stream the input window by window so memory does not grow with its length",
+        choices=["True", "False"],
+        default="False",
+    )
+    infer_parser.add_argument(
+        "--long_form_window",
+        type=float,
+        help="Window length in seconds for --long_form",
+        default=30,
+    )
+    infer_parser.add_argument(
+        "--f0up_keys",
+        type=str,
+        help="Comma-separated keys (-4,-2,0,2) rendered in one run, one output per key",
+        default="",
+    )
+    infer_parser.add_argument(
+        "--crepe_batch_size",
+        type=str,
+        help="CREPE frames per batch (0 = from free memory)",
+        default="0",
+    )
+    infer_parser.add_argument(
+        "--crepe_decoder",
+        type=str,
+        help="CREPE pitch decoder; the argmax decoders skip Viterbi smoothing",
+        choices=["viterbi", "weighted_argmax", "argmax"],
+        default="viterbi",
+    )
+    infer_parser.add_argument(
+        "--crepe_silence_db",
+        type=str,
+        help="Skip CREPE frames this many dB below the peak, e.g. -60 (none = off)",
+        default="none",
+    )
 
     # Parser for 'batch_infer' mode
     batch_infer_parser = subparsers.add_parser(
@@ -697,6 +918,72 @@ def parse_arguments():
         choices=["WAV", "MP3", "FLAC", "OGG", "M4A"],
         default="WAV",
     )
+    batch_infer_parser.add_argument(
+        "--quantize",
+        type=str,
+        help="Dynamic int8 quantization of HuBERT's Linear layers for fp32 CPU "
+        "inference; the synthesizer is convolutional and is not quantized",
+        choices=["none", "hubert"],
+        default="none",
+    )
+    batch_infer_parser.add_argument(
+        "--use_jit",
+        type=str,
+        help="Use the cached TorchScript synthesizer",
+        choices=["True", "False"],
+        default="False",
+    )
+    batch_infer_parser.add_argument(
+        "--backend",
+        type=str,
+        help="Inference backend",
+        choices=["torch", "onnx"],
+        default="torch",
+    )
+    batch_infer_parser.add_argument(
+        "--onnx_intra_threads",
+        type=str,
+        help="Threads each ONNX operator may use (0 = onnxruntime's default)",
+        default="0",
+    )
+    batch_infer_parser.add_argument(
+        "--onnx_inter_threads",
+        type=str,
+        help="Threads running independent ONNX operators in parallel (0 = sequential)",
+        default="0",
+    )
+    batch_infer_parser.add_argument(
+        "--pipelined",
+        type=str,
+        help="Overlap feature extraction, synthesis and post-processing of chunks",
+        choices=["True", "False"],
+        default="False",
+    )
+    batch_infer_parser.add_argument(
+        "--f0_workers",
+        type=str,
+        help="Processes extracting F0 ahead of conversion (0 = auto)",
+        default="0",
+    )
+    batch_infer_parser.add_argument(
+        "--crepe_batch_size",
+        type=str,
+        help="CREPE frames per batch (0 = from free memory)",
+        default="0",
+    )
+    batch_infer_parser.add_argument(
+        "--crepe_decoder",
+        type=str,
+        help="CREPE pitch decoder; the argmax decoders skip Viterbi smoothing",
+        choices=["viterbi", "weighted_argmax", "argmax"],
+        default="viterbi",
+    )
+    batch_infer_parser.add_argument(
+        "--crepe_silence_db",
+        type=str,
+        help="Skip CREPE frames this many dB below the peak, e.g. -60 (none = off)",
+        default="none",
+    )
 
     # Parser for 'tts' mode
     tts_parser = subparsers.add_parser("tts", help="Run TTS")
@@ -815,6 +1102,35 @@ def parse_arguments():
         choices=["WAV", "MP3", "FLAC", "OGG", "M4A"],
         default="WAV",
     )
+    tts_parser.add_argument(
+        "--quantize",
+        type=str,
+        help="Dynamic int8 quantization of HuBERT's Linear layers for fp32 CPU "
+        "inference; the synthesizer is convolutional and is not quantized",
+        choices=["none", "hubert"],
+        default="none",
+    )
+    tts_parser.add_argument(
+        "--use_jit",
+        type=str,
+        help="Use the cached TorchScript synthesizer",
+        choices=["True", "False"],
+        default="False",
+    )
+    tts_parser.add_argument(
+        "--backend",
+        type=str,
+        help="Inference backend",
+        choices=["torch", "onnx"],
+        default="torch",
+    )
+    tts_parser.add_argument(
+        "--pipelined",
+        type=str,
+        help="Overlap feature extraction, synthesis and post-processing of chunks",
+        choices=["True", "False"],
+        default="False",
+    )
 
     # Parser for 'preprocess' mode
     preprocess_parser = subparsers.add_parser("preprocess", help="Run preprocessing")
@@ -983,6 +1299,13 @@ def parse_arguments():
         choices=[str(i) for i in range(1, 101)],
         default="50",
     )
+    train_parser.add_argument(
+        "--model_format",
+        type=str,
+        help="File format of the extracted voice models",
+        choices=["pth", "safetensors"],
+        default="pth",
+    )
 
     # Parser for 'index' mode
     index_parser = subparsers.add_parser("index", help="Generate index file")
@@ -998,6 +1321,19 @@ def parse_arguments():
         choices=["v1", "v2"],
         default="v2",
     )
+    index_parser.add_argument(
+        "--index_type",
+        type=str,
+        help="Faiss index layout",
+        choices=["ivf_flat", "hnsw", "ivf_pq", "ivf_sq8", "opq_ivf_pq"],
+        default="ivf_flat",
+    )
+    index_parser.add_argument(
+        "--index_params",
+        type=str,
+        help="Comma-separated index parameters, e.g. nprobe=8 or M=32,efSearch=64 or pq_m=64,nbits=8",
+        default="",
+    )
 
     # Parser for 'model_extract' mode
     model_extract_parser = subparsers.add_parser("model_extract", help="Extract model")
@@ -1041,6 +1377,37 @@ def parse_arguments():
         type=str,
         help="Steps of the model",
     )
+    model_extract_parser.add_argument(
+        "--model_format",
+        type=str,
+        help="File format of the extracted model",
+        choices=["pth", "safetensors"],
+        default="pth",
+    )
+
+    # Parser for 'model_convert' mode
+    model_convert_parser = subparsers.add_parser(
+        "model_convert",
+        help="Convert a .pth voice model to a memory-mappable .safetensors file",
+    )
+    model_convert_parser.add_argument(
+        "--pth_path",
+        type=str,
+        help="Path to the .pth file",
+    )
+    model_convert_parser.add_argument(
+        "--output_path",
+        type=str,
+        help="Output path (defaults to the .pth path with a .safetensors extension)",
+        default="",
+    )
+    model_convert_parser.add_argument(
+        "--dtype",
+        type=str,
+        help="Recast the weights; float32 lets fp32 CPU workers share the mapped file",
+        choices=["none", "float16", "float32"],
+        default="none",
+    )
 
     # Parser for 'model_information' mode
     model_information_parser = subparsers.add_parser(
@@ -1052,9 +1419,39 @@ def parse_arguments():
         help="Path to the .pth file",
     )
 
+    # Parser for 'model_catalog' mode
+    model_catalog_parser = subparsers.add_parser(
+        "model_catalog", help="List or search the voice models under the model roots"
+    )
+    model_catalog_parser.add_argument(
+        "--query",
+        type=str,
+        help="Text to find in the model name, path or info",
+        default="",
+    )
+    model_catalog_parser.add_argument(
+        "--roots",
+        type=str,
+        help="Comma-separated directories to scan (default: RVC_MODEL_ROOTS or logs)",
+        default=",".join(DEFAULT_ROOTS),
+    )
+    model_catalog_parser.add_argument(
+        "--rvc_version",
+        type=str,
+        help="Only models of this version",
+        choices=["", "v1", "v2"],
+        default="",
+    )
+    model_catalog_parser.add_argument(
+        "--sampling_rate",
+        type=str,
+        help="Only models of this sampling rate (40k or 40000)",
+        default="",
+    )
+
     # Parser for 'model_blender' mode
     model_blender_parser = subparsers.add_parser(
-        "model_blender", help="Fuse two models"
+        "model_blender", help="Fuse two or more models"
     )
     model_blender_parser.add_argument(
         "--model_name",
@@ -1078,6 +1475,91 @@ def parse_arguments():
         choices=[str(i / 10) for i in range(11)],
         default="0.5",
     )
+    model_blender_parser.add_argument(
+        "--pth_paths",
+        type=str,
+        help="Comma-separated models to blend (replaces --pth_path_1/--pth_path_2)",
+        default="",
+    )
+    model_blender_parser.add_argument(
+        "--weights",
+        type=str,
+        help="Comma-separated share of each --pth_paths model (equal by default)",
+        default="",
+    )
+    model_blender_parser.add_argument(
+        "--group_weights",
+        type=str,
+        help="Per layer group shares, e.g. 'dec=0.2,0.8;flow=1,0'",
+        default="",
+    )
+
+    # Parser for 'jit_export' mode
+    jit_export_parser = subparsers.add_parser(
+        "jit_export", help="Export a TorchScript synthesizer next to the .pth file"
+    )
+    jit_export_parser.add_argument(
+        "--pth_path",
+        type=str,
+        help="Path to the .pth file",
+    )
+
+    # Parser for 'onnx_export' mode
+    onnx_export_parser = subparsers.add_parser(
+        "onnx_export", help="Export the voice model and HuBERT to ONNX"
+    )
+    onnx_export_parser.add_argument(
+        "--pth_path",
+        type=str,
+        help="Path to the .pth file",
+    )
+
+    # Parser for 'calibrate' mode
+    calibrate_parser = subparsers.add_parser(
+        "calibrate",
+        help="Benchmark chunk geometries and thread counts on this host and save the fastest",
+    )
+    calibrate_parser.add_argument(
+        "--pth_path",
+        type=str,
+        help="Path to the .pth file",
+    )
+    calibrate_parser.add_argument(
+        "--input_path",
+        type=str,
+        help="Reference clip to convert",
+    )
+    calibrate_parser.add_argument(
+        "--memory_budget",
+        type=float,
+        help="Peak memory budget in MB (0 for no limit)",
+        default=0,
+    )
+    calibrate_parser.add_argument(
+        "--f0method",
+        type=str,
+        help="Value for f0method",
+        choices=[
+            "pm",
+            "harvest",
+            "dio",
+            "crepe",
+            "crepe-tiny",
+            "rmvpe",
+            "fcpe",
+            "hybrid[crepe+rmvpe]",
+            "hybrid[crepe+fcpe]",
+            "hybrid[rmvpe+fcpe]",
+            "hybrid[crepe+rmvpe+fcpe]",
+        ],
+        default="rmvpe",
+    )
+    calibrate_parser.add_argument(
+        "--repeats",
+        type=int,
+        help="Timed conversions per candidate (the fastest counts)",
+        default=2,
+    )
 
     # Parser for 'tensorboard' mode
     subparsers.add_parser("tensorboard", help="Run tensorboard")
@@ -1157,6 +1639,18 @@ def main():
                 str(args.clean_audio),
                 str(args.clean_strength),
                 str(args.export_format),
+                str(args.quantize),
+                str(args.use_jit),
+                str(args.backend),
+                str(args.pipelined),
+                str(args.long_form),
+                str(args.long_form_window),
+                str(args.crepe_batch_size),
+                str(args.crepe_decoder),
+                str(args.crepe_silence_db),
+                str(args.f0up_keys),
+                str(args.onnx_intra_threads),
+                str(args.onnx_inter_threads),
             )
         elif args.mode == "batch_infer":
             run_batch_infer_script(
@@ -1176,6 +1670,16 @@ def main():
                 str(args.clean_audio),
                 str(args.clean_strength),
                 str(args.export_format),
+                str(args.quantize),
+                str(args.use_jit),
+                str(args.backend),
+                str(args.f0_workers),
+                str(args.pipelined),
+                str(args.crepe_batch_size),
+                str(args.crepe_decoder),
+                str(args.crepe_silence_db),
+                str(args.onnx_intra_threads),
+                str(args.onnx_inter_threads),
             )
         elif args.mode == "tts":
             run_tts_script(
@@ -1197,6 +1701,10 @@ def main():
                 str(args.clean_audio),
                 str(args.clean_strength),
                 str(args.export_format),
+                str(args.quantize),
+                str(args.use_jit),
+                str(args.backend),
+                str(args.pipelined),
             )
         elif args.mode == "preprocess":
             run_preprocess_script(
@@ -1230,11 +1738,14 @@ def main():
                 str(args.d_pretrained_path),
                 str(args.overtraining_detector),
                 str(args.overtraining_threshold),
+                model_format=str(args.model_format),
             )
         elif args.mode == "index":
             run_index_script(
                 str(args.model_name),
                 str(args.rvc_version),
+                str(args.index_type),
+                str(args.index_params),
             )
         elif args.mode == "model_extract":
             run_model_extract_script(
@@ -1245,17 +1756,50 @@ def main():
                 str(args.rvc_version),
                 str(args.epoch),
                 str(args.step),
+                str(args.model_format),
+            )
+        elif args.mode == "model_convert":
+            run_model_convert_script(
+                str(args.pth_path),
+                str(args.output_path),
+                str(args.dtype),
             )
         elif args.mode == "model_information":
             run_model_information_script(
                 str(args.pth_path),
             )
+        elif args.mode == "model_catalog":
+            run_model_catalog_script(
+                str(args.query),
+                str(args.roots),
+                str(args.rvc_version),
+                str(args.sampling_rate),
+            )
         elif args.mode == "model_blender":
             run_model_blender_script(
                 str(args.model_name),
                 str(args.pth_path_1),
                 str(args.pth_path_2),
                 str(args.ratio),
+                str(args.pth_paths),
+                str(args.weights),
+                str(args.group_weights),
+            )
+        elif args.mode == "jit_export":
+            run_jit_export_script(
+                str(args.pth_path),
+            )
+        elif args.mode == "calibrate":
+            run_calibrate_script(
+                str(args.pth_path),
+                str(args.input_path),
+                str(args.memory_budget),
+                str(args.f0method),
+                str(args.repeats),
+            )
+        elif args.mode == "onnx_export":
+            run_onnx_export_script(
+                str(args.pth_path),
             )
         elif args.mode == "tensorboard":
             run_tensorboard_script()
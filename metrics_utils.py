@@ -0,0 +1,167 @@
+import os
+import time
+import logging
+from contextlib import contextmanager
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    make_asgi_app,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+# Celery prefork 워커처럼 여러 프로세스가 메트릭을 쓰는 경우 PROMETHEUS_MULTIPROC_DIR 를 설정하면
+# 프로세스별 값을 파일로 모아서 내보낸다 (prometheus_client import 전에 설정되어 있어야 함)
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# 다운로드/분리는 수 초~수 분, MinIO 요청은 ms 단위라 버킷을 따로 둔다
+STAGE_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+STAGE_SECONDS = Histogram(
+    "yass_stage_seconds",
+    "Latency of a processing stage (probe, download, separation, encode, upload, tts)",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+STAGE_FAILURES = Counter(
+    "yass_stage_failures_total", "Processing stages that raised", ["stage"]
+)
+TASK_RETRIES = Counter("yass_task_retries_total", "Celery task retries", ["task"])
+TASK_FAILURES = Counter(
+    "yass_task_failures_total", "Celery tasks that failed for good", ["task"]
+)
+TASK_SUCCESSES = Counter(
+    "yass_task_successes_total", "Celery tasks that succeeded", ["task"]
+)
+SEPARATOR_BUSY = Gauge(
+    "yass_separator_busy",
+    "Separator instances currently separating",
+    multiprocess_mode="livesum",
+)
+SEPARATOR_WAITING = Gauge(
+    "yass_separator_waiting",
+    "Tasks waiting for a separator instance",
+    multiprocess_mode="livesum",
+)
+SEPARATOR_INSTANCES = Gauge(
+    "yass_separator_instances",
+    "Separator instances loaded",
+    multiprocess_mode="livesum",
+)
+MINIO_SECONDS = Histogram(
+    "yass_minio_request_seconds",
+    "MinIO request latency",
+    ["operation"],
+    buckets=REQUEST_BUCKETS,
+)
+
+
+@contextmanager
+def observe_stage(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_FAILURES.labels(stage).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def observe_minio(operation: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        MINIO_SECONDS.labels(operation).observe(time.perf_counter() - start)
+
+
+class QueueDepthCollector:
+    """스크레이프 시점에 Redis 브로커의 큐 길이(LLEN)를 읽는다."""
+
+    def __init__(self, broker_url: str, queues):
+        import redis
+
+        self.client = redis.Redis.from_url(broker_url, socket_timeout=1)
+        self.queues = list(queues)
+
+    def describe(self):
+        # 등록 시점에 Redis 에 접속하지 않도록 비워 둔다
+        return []
+
+    def collect(self):
+        family = GaugeMetricFamily(
+            "yass_queue_depth", "Messages waiting in a Celery queue", labels=["queue"]
+        )
+        for queue in self.queues:
+            try:
+                family.add_metric([queue], self.client.llen(queue))
+            except Exception as e:
+                logger.warning(f"⚠️ [metrics] 큐 길이 조회 실패 ({queue}): {e}")
+        yield family
+
+
+def metrics_queues():
+    return [
+        q.strip()
+        for q in os.environ.get("METRICS_QUEUES", "celery").split(",")
+        if q.strip()
+    ]
+
+
+def build_registry(broker_url: str = None) -> CollectorRegistry:
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    if broker_url:
+        registry.register(QueueDepthCollector(broker_url, metrics_queues()))
+    return registry
+
+
+def metrics_asgi_app(broker_url: str = None):
+    return make_asgi_app(registry=build_registry(broker_url))
+
+
+def install_celery_metrics(celery_app):
+    """Celery 시그널에 메트릭을 연결하고 워커 메인 프로세스에서 exporter 를 띄운다."""
+    from celery.signals import (
+        task_failure,
+        task_retry,
+        task_success,
+        worker_process_shutdown,
+        worker_ready,
+    )
+
+    @task_retry.connect(weak=False)
+    def _on_retry(sender=None, **kwargs):
+        TASK_RETRIES.labels(sender.name if sender is not None else "unknown").inc()
+
+    @task_failure.connect(weak=False)
+    def _on_failure(sender=None, **kwargs):
+        TASK_FAILURES.labels(sender.name if sender is not None else "unknown").inc()
+
+    @task_success.connect(weak=False)
+    def _on_success(sender=None, **kwargs):
+        TASK_SUCCESSES.labels(sender.name if sender is not None else "unknown").inc()
+
+    @worker_process_shutdown.connect(weak=False)
+    def _on_child_exit(pid=None, **kwargs):
+        if MULTIPROC_DIR:
+            multiprocess.mark_process_dead(pid or os.getpid())
+
+    @worker_ready.connect(weak=False)
+    def _start_exporter(**kwargs):
+        port = int(os.environ.get("WORKER_METRICS_PORT", "9808"))
+        start_http_server(port, registry=build_registry(celery_app.conf.broker_url))
+        logger.info(f"📈 워커 메트릭 exporter 시작: :{port}/metrics")
@@ -2,10 +2,22 @@ import argparse
 import os
 import sys
 import json
+import platform
 from multiprocessing import cpu_count
 
 import torch
 
+HOST_PROFILE_PATH = os.environ.get(
+    "RVC_HOST_PROFILE", os.path.join("rvc", "configs", "host_profile.json")
+)
+
+# Where the probed device is remembered between processes; set to "" to disable
+DEVICE_CACHE_PATH = os.environ.get(
+    "RVC_DEVICE_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "rvc", "device_profile.json"),
+)
+DEVICE_FIELDS = ("device", "is_half", "gpu_name", "gpu_mem", "instead")
+
 version_config_list = [
     "v1/32000.json",
     "v1/40000.json",
@@ -31,12 +43,22 @@ class Config:
         self.device = "cuda:0"
         self.is_half = True
         self.use_jit = False
+        self.pipelined = False
+        # Processes sharing one Harvest F0 extraction (0 = one per CPU)
+        self.harvest_workers = 0
+        # CREPE frames per batch (0 = from free memory), its decoder and the
+        # level in dB below the peak under which frames are skipped (None = off)
+        self.crepe_batch_size = 0
+        self.crepe_decoder = "viterbi"
+        self.crepe_silence_db = None
         self.n_cpu = 0
         self.gpu_name = None
         self.json_config = self.load_config_json()
         self.gpu_mem = None
         self.instead = ""
+        self.preprocess_per = 3.7
         self.x_pad, self.x_query, self.x_center, self.x_max = self.device_config()
+        self.host_profile = self.load_host_profile()
 
     @staticmethod
     def load_config_json() -> dict:
@@ -64,18 +86,52 @@ class Config:
             return False
 
     def use_fp32_config(self):
+        # Overrides live in memory only; the JSON files and preprocess.py are
+        # never rewritten
         for config_file in version_config_list:
             self.json_config[config_file]["train"]["fp16_run"] = False
-            with open(f"rvc/configs/{config_file}", "r") as f:
-                strr = f.read().replace("true", "false")
-            with open(f"rvc/configs/{config_file}", "w") as f:
-                f.write(strr)
-        with open("rvc/train/preprocess/preprocess.py", "r") as f:
-            strr = f.read().replace("3.7", "3.0")
-        with open("rvc/train/preprocess/preprocess.py", "w") as f:
-            f.write(strr)
 
-    def device_config(self) -> tuple:
+    @staticmethod
+    def device_cache_key() -> str:
+        return "|".join(
+            [
+                torch.__version__,
+                os.environ.get("CUDA_VISIBLE_DEVICES", ""),
+                platform.node(),
+            ]
+        )
+
+    def load_device_cache(self) -> bool:
+        if not DEVICE_CACHE_PATH:
+            return False
+        try:
+            with open(DEVICE_CACHE_PATH, "r") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if cached.get("key") != self.device_cache_key():
+            return False
+        for field in DEVICE_FIELDS:
+            setattr(self, field, cached[field])
+        return True
+
+    def save_device_cache(self):
+        if not DEVICE_CACHE_PATH:
+            return
+        cached = {field: getattr(self, field) for field in DEVICE_FIELDS}
+        cached["key"] = self.device_cache_key()
+        try:
+            os.makedirs(os.path.dirname(DEVICE_CACHE_PATH), exist_ok=True)
+            tmp_path = f"{DEVICE_CACHE_PATH}.{os.getpid()}"
+            with open(tmp_path, "w") as f:
+                json.dump(cached, f)
+            # Atomic, so concurrent workers never read a half-written cache
+            os.replace(tmp_path, DEVICE_CACHE_PATH)
+        except OSError:
+            # Read-only home: probe again next time
+            pass
+
+    def probe_device(self):
         if torch.cuda.is_available():
             if self.has_xpu():
                 self.device = self.instead = "xpu:0"
@@ -91,7 +147,6 @@ class Config:
                 or "1080" in self.gpu_name
             ):
                 self.is_half = False
-                self.use_fp32_config()
             self.gpu_mem = int(
                 torch.cuda.get_device_properties(i_device).total_memory
                 / 1024
@@ -99,21 +154,52 @@ class Config:
                 / 1024
                 + 0.4
             )
-            if self.gpu_mem <= 4:
-                with open("rvc/train/preprocess/preprocess.py", "r") as f:
-                    strr = f.read().replace("3.7", "3.0")
-                with open("rvc/train/preprocess/preprocess.py", "w") as f:
-                    f.write(strr)
         elif self.has_mps():
-            print("No supported Nvidia GPU found")
             self.device = self.instead = "mps"
             self.is_half = False
-            self.use_fp32_config()
         else:
-            print("No supported Nvidia GPU found")
             self.device = self.instead = "cpu"
             self.is_half = False
+
+    def load_host_profile(self):
+        # Written by `main.py calibrate`; only applied on the device and
+        # precision it was measured with
+        if not os.path.exists(HOST_PROFILE_PATH):
+            return None
+        try:
+            with open(HOST_PROFILE_PATH, "r") as f:
+                profile = json.load(f)
+        except (OSError, ValueError) as error:
+            print(f"Ignoring host profile {HOST_PROFILE_PATH}: {error}")
+            return None
+        if (
+            profile.get("device") != self.device
+            or profile.get("gpu_name") != self.gpu_name
+            or profile.get("is_half") != self.is_half
+        ):
+            return None
+        self.x_pad, self.x_query, self.x_center, self.x_max = (
+            profile["x_pad"],
+            profile["x_query"],
+            profile["x_center"],
+            profile["x_max"],
+        )
+        if self.device == "cpu" and profile.get("n_threads"):
+            torch.set_num_threads(profile["n_threads"])
+        return profile
+
+    def device_config(self) -> tuple:
+        if not self.load_device_cache():
+            self.probe_device()
+            self.save_device_cache()
+        if not self.device.startswith(("cuda", "xpu")):
+            print("No supported Nvidia GPU found")
+        if not self.is_half:
             self.use_fp32_config()
+        # Segment length main.py has always passed to preprocessing; the
+        # 3.0 patch the old code wrote into preprocess.py for fp32 and small
+        # GPUs was overridden by that argument and never took effect
+        self.preprocess_per = 3.0 if self.is_half else 3.7
 
         if self.n_cpu == 0:
             self.n_cpu = cpu_count()
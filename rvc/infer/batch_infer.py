@@ -0,0 +1,277 @@
+import os
+import sys
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import cpu_count, get_context
+
+import numpy as np
+
+now_dir = os.getcwd()
+sys.path.append(now_dir)
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".flac")
+
+f0_vc = None
+
+
+def init_f0_worker(tgt_sr, vc_config, f0_method):
+    # Workers only need the padding constants VC reads from Config, so they get
+    # a plain namespace instead of building (and side-effecting) a Config.
+    global f0_vc
+    from pipeline import VC
+    from rvc.lib import f0_registry
+
+    f0_vc = VC(tgt_sr, vc_config)
+    # Load the F0 model at boot rather than inside the first file's timing
+    f0_registry.warm_up([f0_method], vc_config.device, vc_config.is_half)
+
+
+def extract_f0(
+    input_audio_path, f0_up_key, f0_method, filter_radius, hop_length, f0autotune
+):
+    from pipeline import cache_harvest_f0
+    from rvc.lib.utils import load_audio
+
+    start_time = time.perf_counter()
+    audio = load_audio(input_audio_path, 16000)
+    audio_max = np.abs(audio).max() / 0.95
+    if audio_max > 1:
+        audio /= audio_max
+    pitch, pitchf = f0_vc.compute_f0(
+        input_audio_path,
+        audio,
+        int(f0_up_key),
+        f0_method,
+        filter_radius,
+        hop_length,
+        f0autotune,
+    )
+    # Every file is seen once, so Harvest's per-path cache would only grow
+    cache_harvest_f0.cache_clear()
+    return pitch, pitchf, time.perf_counter() - start_time
+
+
+def list_audio_files(input_folder):
+    return sorted(
+        f
+        for f in os.listdir(input_folder)
+        if f.endswith(AUDIO_EXTENSIONS) and "_output" not in f
+    )
+
+
+def print_report(rows, wall_time):
+    print(
+        f"{'file':<32} {'audio s':>8} {'f0 s':>7} {'wait s':>7} {'conv s':>7} {'RTF':>6}"
+    )
+    for row in rows:
+        print(
+            f"{row['file'][:32]:<32} {row['duration']:>8.1f} {row['f0']:>7.2f} "
+            f"{row['wait']:>7.2f} {row['convert']:>7.2f} {row['rtf']:>6.3f}"
+        )
+    total_audio = sum(row["duration"] for row in rows)
+    if total_audio:
+        print(
+            f"Converted {len(rows)} files, {total_audio:.1f} s of audio in {wall_time:.1f} s "
+            f"(aggregate RTF {wall_time / total_audio:.3f})."
+        )
+
+
+def batch_infer(
+    f0up_key,
+    filter_radius,
+    index_rate,
+    hop_length,
+    f0method,
+    input_folder,
+    output_folder,
+    pth_path,
+    index_path,
+    split_audio,
+    f0autotune,
+    rms_mix_rate,
+    protect,
+    clean_audio,
+    clean_strength,
+    export_format,
+    quantize="none",
+    use_jit=False,
+    backend_name="torch",
+    f0_workers=0,
+    pipelined=False,
+    crepe_batch_size=0,
+    crepe_decoder="viterbi",
+    crepe_silence_db=None,
+    onnx_intra_threads=0,
+    onnx_inter_threads=0,
+):
+    import infer
+    from pipeline import cache_harvest_f0
+
+    wall_start = time.perf_counter()
+    infer.filter_radius = filter_radius
+    infer.config.use_jit = use_jit
+    infer.config.pipelined = pipelined
+    infer.config.crepe_batch_size = crepe_batch_size
+    infer.config.crepe_decoder = crepe_decoder
+    infer.config.crepe_silence_db = crepe_silence_db
+    infer.get_vc(
+        pth_path, 0, quantize, backend_name, onnx_intra_threads, onnx_inter_threads
+    )
+    if_f0 = infer.cpt.get("f0", 1)
+
+    audio_files = list_audio_files(input_folder)
+    print(f"Detected {len(audio_files)} audio files for inference.")
+    os.makedirs(output_folder, exist_ok=True)
+
+    # Split audio converts each segment separately, so a whole-file F0 would not
+    # line up; those runs compute F0 inline.
+    use_pool = if_f0 == 1 and split_audio != "True" and audio_files
+    pool = None
+    if use_pool:
+        f0_workers = f0_workers or max(1, min(4, cpu_count() // 2))
+        vc_config = types.SimpleNamespace(
+            x_pad=infer.config.x_pad,
+            x_query=infer.config.x_query,
+            x_center=infer.config.x_center,
+            x_max=infer.config.x_max,
+            is_half=False,
+            device="cpu",
+            # The pool already runs one file per worker
+            harvest_workers=1,
+            crepe_batch_size=crepe_batch_size,
+            crepe_decoder=crepe_decoder,
+            crepe_silence_db=crepe_silence_db,
+        )
+        pool = ProcessPoolExecutor(
+            max_workers=f0_workers,
+            mp_context=get_context("spawn"),
+            initializer=init_f0_worker,
+            initargs=(infer.tgt_sr, vc_config, f0method),
+        )
+
+    def submit(audio_file):
+        return pool.submit(
+            extract_f0,
+            os.path.join(input_folder, audio_file),
+            f0up_key,
+            f0method,
+            filter_radius,
+            hop_length,
+            f0autotune,
+        )
+
+    # Keep F0 at most one file per worker ahead so pitch arrays do not pile up
+    lookahead = (f0_workers + 1) if pool else 0
+    pending = {i: submit(f) for i, f in enumerate(audio_files[:lookahead])}
+
+    rows = []
+    try:
+        for i, audio_file in enumerate(audio_files):
+            input_path = os.path.join(input_folder, audio_file)
+            output_name = os.path.splitext(audio_file)[0]
+            output_path = os.path.join(
+                output_folder, f"{output_name}_output.{export_format.lower()}"
+            )
+
+            wait_start = time.perf_counter()
+            precomputed_f0, f0_time = None, 0.0
+            if i in pending:
+                try:
+                    pitch, pitchf, f0_time = pending.pop(i).result()
+                    precomputed_f0 = (pitch, pitchf)
+                except Exception as error:
+                    # vc_single computes F0 itself when none is passed
+                    print(
+                        f"F0 worker failed for {input_path} ({error}), computing inline"
+                    )
+            if pool and i + lookahead < len(audio_files):
+                try:
+                    pending[i + lookahead] = submit(audio_files[i + lookahead])
+                except BrokenProcessPool:
+                    # A worker died; the remaining files compute F0 inline
+                    pool.shutdown(cancel_futures=True)
+                    pool = None
+            wait_time = time.perf_counter() - wait_start
+
+            print(f"Inferring {input_path}...")
+            convert_start = time.perf_counter()
+            result = infer.vc_single(
+                sid=0,
+                input_audio_path=input_path,
+                f0_up_key=f0up_key,
+                f0_file=None,
+                f0_method=f0method,
+                file_index=index_path,
+                index_rate=index_rate,
+                rms_mix_rate=rms_mix_rate,
+                protect=protect,
+                hop_length=hop_length,
+                output_path=output_path,
+                split_audio=split_audio,
+                f0autotune=f0autotune,
+                precomputed_f0=precomputed_f0,
+                clean_strength=clean_strength if clean_audio == "True" else None,
+                export_format=export_format,
+            )
+            cache_harvest_f0.cache_clear()
+            if not isinstance(result, tuple):
+                print(f"Voice conversion failed for {input_path}")
+                continue
+            tgt_sr, audio_opt = result
+            convert_time = time.perf_counter() - convert_start
+
+            duration = len(audio_opt) / tgt_sr
+            rows.append(
+                {
+                    "file": audio_file,
+                    "duration": duration,
+                    "f0": f0_time,
+                    "wait": wait_time,
+                    "convert": convert_time,
+                    "rtf": (wait_time + convert_time) / max(duration, 1e-9),
+                }
+            )
+            print(f"Output file: '{output_path}'")
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    print_report(rows, time.perf_counter() - wall_start)
+    return rows
+
+
+if __name__ == "__main__":
+    batch_infer(
+        f0up_key=sys.argv[1],
+        filter_radius=int(sys.argv[2]),
+        index_rate=float(sys.argv[3]),
+        hop_length=sys.argv[4],
+        f0method=sys.argv[5],
+        input_folder=sys.argv[6],
+        output_folder=sys.argv[7],
+        pth_path=sys.argv[8],
+        index_path=sys.argv[9],
+        split_audio=sys.argv[10],
+        f0autotune=sys.argv[11],
+        rms_mix_rate=float(sys.argv[12]),
+        protect=float(sys.argv[13]),
+        clean_audio=sys.argv[14],
+        clean_strength=float(sys.argv[15]),
+        export_format=sys.argv[16],
+        quantize=sys.argv[17] if len(sys.argv) > 17 else "none",
+        use_jit=len(sys.argv) > 18 and sys.argv[18] == "True",
+        backend_name=sys.argv[19] if len(sys.argv) > 19 else "torch",
+        f0_workers=int(sys.argv[20]) if len(sys.argv) > 20 else 0,
+        pipelined=len(sys.argv) > 21 and sys.argv[21] == "True",
+        crepe_batch_size=int(sys.argv[22]) if len(sys.argv) > 22 else 0,
+        crepe_decoder=sys.argv[23] if len(sys.argv) > 23 else "viterbi",
+        crepe_silence_db=(
+            float(sys.argv[24])
+            if len(sys.argv) > 24 and sys.argv[24] != "none"
+            else None
+        ),
+        onnx_intra_threads=int(sys.argv[25]) if len(sys.argv) > 25 else 0,
+        onnx_inter_threads=int(sys.argv[26]) if len(sys.argv) > 26 else 0,
+    )
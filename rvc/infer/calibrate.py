@@ -0,0 +1,176 @@
+import os
+import sys
+import json
+import time
+import resource
+import threading
+
+import torch
+import soundfile as sf
+
+now_dir = os.getcwd()
+sys.path.append(now_dir)
+
+import infer
+from pipeline import VC
+from rvc.configs.config import HOST_PROFILE_PATH
+
+# (x_pad, x_query, x_center, x_max) in seconds; the first three are the
+# presets Config.device_config picks from
+GEOMETRIES = [
+    (1, 5, 30, 32),
+    (1, 6, 38, 41),
+    (3, 10, 60, 65),
+    (2, 8, 45, 48),
+    (3, 10, 80, 85),
+]
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # No /proc (macOS): fall back to the lifetime high-water mark
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class PeakMemory:
+    """Peak host RSS (sampled) or peak CUDA allocation while the block runs, in MB."""
+
+    def __init__(self, device):
+        self.cuda = device.startswith("cuda")
+        self.peak = 0
+
+    def _sample(self):
+        while not self.done.wait(0.005):
+            self.peak = max(self.peak, rss_bytes())
+
+    def __enter__(self):
+        if self.cuda:
+            torch.cuda.synchronize()
+            torch.cuda.reset_peak_memory_stats()
+        else:
+            self.peak = rss_bytes()
+            self.done = threading.Event()
+            self.thread = threading.Thread(target=self._sample, daemon=True)
+            self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.cuda:
+            torch.cuda.synchronize()
+            self.peak = torch.cuda.max_memory_allocated()
+        else:
+            self.done.set()
+            self.thread.join()
+            self.peak = max(self.peak, rss_bytes())
+
+    @property
+    def mb(self):
+        return self.peak / 2**20
+
+
+def thread_candidates(device, n_cpu):
+    if not device.startswith("cpu"):
+        return [torch.get_num_threads()]
+    return sorted({max(1, n_cpu // 4), max(1, n_cpu // 2), n_cpu})
+
+
+def run_candidate(input_path, f0method, geometry, repeats):
+    config = infer.config
+    config.x_pad, config.x_query, config.x_center, config.x_max = geometry
+    infer.vc = VC(infer.tgt_sr, config)
+    kwargs = dict(
+        sid=0,
+        input_audio_path=input_path,
+        f0_up_key=0,
+        f0_method=f0method,
+        file_index="",
+        index_rate=0,
+        rms_mix_rate=1,
+        protect=0.33,
+        hop_length=128,
+    )
+    # Warm-up: loads F0 models and lets cudnn pick kernels for these shapes.
+    # vc_single prints the error and returns None when a conversion fails
+    # (out of memory, for instance); such a geometry is not a candidate
+    if not isinstance(infer.vc_single(**kwargs), tuple):
+        return None
+    timings = []
+    with PeakMemory(config.device) as memory:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = infer.vc_single(**kwargs)
+            timings.append(time.perf_counter() - start)
+            if not isinstance(result, tuple):
+                return None
+    return min(timings), memory.mb
+
+
+def calibrate(pth_path, input_path, memory_budget_mb, f0method, repeats, output_path):
+    infer.get_vc(pth_path, 0)
+    config = infer.config
+    duration = sf.info(input_path).duration
+    results = []
+    for n_threads in thread_candidates(config.device, config.n_cpu):
+        torch.set_num_threads(n_threads)
+        for geometry in GEOMETRIES:
+            row = {
+                "x_pad": geometry[0],
+                "x_query": geometry[1],
+                "x_center": geometry[2],
+                "x_max": geometry[3],
+                "n_threads": n_threads,
+            }
+            measured = run_candidate(input_path, f0method, geometry, repeats)
+            if measured is None:
+                results.append({**row, "error": "conversion failed"})
+                print(f"geometry {geometry} threads {n_threads:>3}: conversion failed")
+                continue
+            seconds, peak_mb = measured
+            results.append({**row, "rtf": seconds / duration, "peak_mb": peak_mb})
+            print(
+                f"geometry {geometry} threads {n_threads:>3}: "
+                f"RTF {results[-1]['rtf']:.3f}, peak {peak_mb:.0f} MB"
+            )
+
+    fitting = [
+        r
+        for r in results
+        if "error" not in r
+        and (not memory_budget_mb or r["peak_mb"] <= memory_budget_mb)
+    ]
+    if not fitting:
+        print(f"No setting fits in {memory_budget_mb} MB; the profile was not written.")
+        return None
+    best = min(fitting, key=lambda r: r["rtf"])
+    profile = {
+        "device": config.device,
+        "gpu_name": config.gpu_name,
+        "is_half": config.is_half,
+        **best,
+        "memory_budget_mb": memory_budget_mb,
+        "reference_clip": os.path.basename(input_path),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "candidates": results,
+    }
+    with open(output_path, "w") as f:
+        json.dump(profile, f, indent=2)
+    print(
+        f"Fastest setting within budget: x_pad {best['x_pad']}, x_query {best['x_query']}, "
+        f"x_center {best['x_center']}, x_max {best['x_max']}, {best['n_threads']} threads "
+        f"(RTF {best['rtf']:.3f}, peak {best['peak_mb']:.0f} MB). Saved to {output_path}"
+    )
+    return profile
+
+
+if __name__ == "__main__":
+    calibrate(
+        pth_path=sys.argv[1],
+        input_path=sys.argv[2],
+        memory_budget_mb=float(sys.argv[3]) if len(sys.argv) > 3 else 0,
+        f0method=sys.argv[4] if len(sys.argv) > 4 else "rmvpe",
+        repeats=int(sys.argv[5]) if len(sys.argv) > 5 else 2,
+        output_path=sys.argv[6] if len(sys.argv) > 6 else HOST_PROFILE_PATH,
+    )
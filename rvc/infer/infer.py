@@ -1,17 +1,35 @@
 import os
 import sys
 import time
+import subprocess
 import torch
-import logging
 
 import numpy as np
-import soundfile as sf
-from pipeline import VC
-from scipy.io import wavfile
-import noisereduce as nr
+from scipy import signal
+
+now_dir = os.getcwd()
+sys.path.append(now_dir)
+
+from pipeline import VC, ah, bh, input_audio_path2wav
+from synthesizer_jit import (
+    export_jit_synthesizer,
+    jit_cache_path,
+    load_jit_synthesizer,
+)
+from onnx_backend import (
+    OnnxHubert,
+    OnnxSynthesizer,
+    export_hubert,
+    export_synthesizer,
+    onnx_hubert_path,
+    onnx_model_path,
+)
+from postprocess import PeakGuard, StreamEncoder, run_postprocess
 from rvc.lib.utils import load_audio
-from rvc.lib.tools.split_audio import process_audio, merge_audio
-from fairseq import checkpoint_utils
+from rvc.lib import f0_registry
+from rvc.lib.hubert import convert, converted_path, load_hubert as load_hubert_weights
+from rvc.lib.model_io import is_safetensors, load_voice_model
+from rvc.train.slicer import Slicer
 from rvc.lib.infer_pack.models import (
     SynthesizerTrnMs256NSFsid,
     SynthesizerTrnMs256NSFsid_nono,
@@ -20,51 +38,113 @@ from rvc.lib.infer_pack.models import (
 )
 from rvc.configs.config import Config
 
-logging.getLogger("fairseq").setLevel(logging.WARNING)
-
 config = Config()
 hubert_model = None
+hubert_quantized = False
+quantize_mode = "none"
+backend = "torch"
+# (intra-op, inter-op) threads of the ONNX sessions; 0 = onnxruntime's default
+onnx_threads = (0, 0)
+filter_radius = 3
 
+QUANTIZE_MODES = ("none", "hubert")
+BACKENDS = ("torch", "onnx")
 
-def load_hubert():
-    global hubert_model
-    models, _, _ = checkpoint_utils.load_model_ensemble_and_task(
-        ["hubert_base.pt"],
-        suffix="",
+
+def quantize_dynamic_int8(model):
+    # Dynamic quantization only covers nn.Linear (conv layers have no dynamic
+    # int8 kernels), and the quantized kernels only exist for CPU. That makes
+    # it worthwhile for HuBERT's transformer; the synthesizer is convolutional
+    # and stays in floating point.
+    if config.device != "cpu" or config.is_half:
+        print("Dynamic int8 quantization requires fp32 CPU inference, skipping.")
+        return model
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
     )
-    hubert_model = models[0]
-    hubert_model = hubert_model.to(config.device)
-    if config.is_half:
-        hubert_model = hubert_model.half()
+
+
+def load_hubert(quantize=False):
+    global hubert_model, hubert_quantized
+    # The converted weights are memory-mapped and need no fairseq; they are
+    # written from hubert_base.pt the first time
+    path = converted_path("hubert_base.pt")
+    if not os.path.exists(path):
+        convert("hubert_base.pt", path)
+    hubert_model = load_hubert_weights(path, config.device, config.is_half)
+    if quantize:
+        hubert_model = quantize_dynamic_int8(hubert_model)
+    hubert_quantized = quantize
+
+
+def load_onnx_hubert(version):
+    global hubert_model
+    path = onnx_hubert_path(version)
+    if not os.path.exists(path):
+        load_hubert()
+        export_hubert(hubert_model, path, version)
+    hubert_model = OnnxHubert(path, version, *onnx_threads)
+
+
+def ensure_hubert():
+    if backend == "onnx":
+        if (
+            getattr(hubert_model, "version", None) != version
+            or getattr(hubert_model, "threads", None) != onnx_threads
+        ):
+            load_onnx_hubert(version)
     else:
-        hubert_model = hubert_model.float()
-    hubert_model.eval()
+        quantize_hubert = quantize_mode == "hubert"
+        if (
+            not hubert_model
+            or isinstance(hubert_model, OnnxHubert)
+            or hubert_quantized != quantize_hubert
+        ):
+            load_hubert(quantize_hubert)
 
 
-def remove_audio_noise(input_audio_path, reduction_strength=0.7):
-    try:
-        rate, data = wavfile.read(input_audio_path)
-        reduced_noise = nr.reduce_noise(
-            y=data,
-            sr=rate,
-            prop_decrease=reduction_strength,
-        )
-        return reduced_noise
-    except Exception as error:
-        print(f"Error cleaning audio: {error}")
-        return None
+def split_segments(audio, sr=16000):
+    # Cut at silences of 300 ms or more and keep at most 500 ms of silence
+    slicer = Slicer(sr=sr, threshold=-40, min_length=5000, max_sil_kept=500)
+    ranges = slicer.slice_ranges(audio) or [(0, len(audio))]
+    return [(int(start), audio[start:end]) for start, end in ranges]
+
+
+def read_audio_windows(input_audio_path, window, context, sr=16000):
+    """
+    Decode input_audio_path through an ffmpeg pipe and yield
+    (start, offset, audio, last): the window of `window` samples starting at
+    `start`, with up to `context` samples either side, beginning at `offset`.
+    Only one window plus its context is held in memory.
+    """
+    command = ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", input_audio_path]
+    command += ["-f", "f32le", "-ac", "1", "-ar", str(sr), "pipe:1"]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE)
 
+    def read(n):
+        return np.frombuffer(process.stdout.read(n * 4), dtype=np.float32)
 
-def convert_audio_format(input_path, output_path, output_format):
     try:
-        if output_format != "WAV":
-            print(f"Converting audio to {export_format} format...")
-            audio, sample_rate = sf.read(input_path)
-            sf.write(output_path, audio, sample_rate, format=output_format.lower())
-            os.remove(input_path)
-        return output_path
-    except Exception as error:
-        print(f"Failed to convert audio to {output_format} format: {error}")
+        buffer = read(window + context)
+        eof = len(buffer) < window + context
+        start = offset = 0
+        while True:
+            needed = start + window + context - offset
+            if not eof and len(buffer) < needed:
+                more = read(needed - len(buffer))
+                eof = len(more) < needed - len(buffer)
+                buffer = np.concatenate([buffer, more])
+            last = eof and offset + len(buffer) <= start + window
+            yield start, offset, buffer[:needed], last
+            if last:
+                return
+            start += window
+            buffer = buffer[start - context - offset :]
+            offset = start - context
+    finally:
+        process.stdout.close()
+        process.kill()
+        process.wait()
 
 
 def vc_single(
@@ -82,6 +162,9 @@ def vc_single(
     output_path=None,
     split_audio=False,
     f0autotune=False,
+    precomputed_f0=None,
+    clean_strength=None,
+    export_format="WAV",
 ):
     global tgt_sr, net_g, vc, hubert_model, version
 
@@ -93,8 +176,7 @@ def vc_single(
         if audio_max > 1:
             audio /= audio_max
 
-        if not hubert_model:
-            load_hubert()
+        ensure_hubert()
         if_f0 = cpt.get("f0", 1)
 
         file_index = (
@@ -107,51 +189,37 @@ def vc_single(
         )
         if tgt_sr != resample_sr >= 16000:
             tgt_sr = resample_sr
+        audio_sr, post_mix_rate, post_resample_sr = tgt_sr, rms_mix_rate, resample_sr
         if split_audio == "True":
-            result, new_dir_path = process_audio(input_audio_path)
-            if result == "Error":
-                return "Error with Split Audio", None
-            dir_path = (
-                new_dir_path.strip(" ").strip('"').strip("\n").strip('"').strip(" ")
-            )
-            if dir_path != "":
-                paths = [
-                    os.path.join(root, name)
-                    for root, _, files in os.walk(dir_path, topdown=False)
-                    for name in files
-                    if name.endswith(".wav") and root == dir_path
-                ]
-            try:
-                for path in paths:
-                    vc_single(
-                        sid,
-                        path,
-                        f0_up_key,
-                        None,
-                        f0_method,
-                        file_index,
-                        index_rate,
-                        resample_sr,
-                        rms_mix_rate,
-                        protect,
-                        hop_length,
-                        path,
-                        False,
-                        f0autotune,
-                    )
-            except Exception as error:
-                print(error)
-                return f"Error {error}"
-            print("Finished processing segmented audio, now merging audio...")
-            merge_timestamps_file = os.path.join(
-                os.path.dirname(new_dir_path),
-                f"{os.path.basename(input_audio_path).split('.')[0]}_timestamps.txt",
+            segments = split_segments(audio)
+            print(f"Converting {len(segments)} segments of {input_audio_path}...")
+            converted = vc.pipeline_segments(
+                hubert_model,
+                net_g,
+                sid,
+                segments,
+                input_audio_path,
+                f0_up_key,
+                f0_method,
+                file_index,
+                index_rate,
+                if_f0,
+                filter_radius,
+                version,
+                protect,
+                hop_length,
+                f0autotune,
             )
-            tgt_sr, audio_opt = merge_audio(merge_timestamps_file)
-            os.remove(merge_timestamps_file)
+            # Stitch at the segments' own offsets; the silence between them stays silent
+            audio_opt = np.zeros(round(len(audio) * tgt_sr / 16000), dtype=np.float32)
+            for offset, segment_opt in converted:
+                start = round(offset * tgt_sr / 16000)
+                segment_opt = segment_opt[: len(audio_opt) - start]
+                audio_opt[start : start + len(segment_opt)] = segment_opt
+            source = signal.filtfilt(bh, ah, audio)
 
         else:
-            audio_opt = vc.pipeline(
+            audio_opt, source = vc.pipeline(
                 hubert_model,
                 net_g,
                 sid,
@@ -171,18 +239,266 @@ def vc_single(
                 hop_length,
                 f0autotune,
                 f0_file=f0_file,
+                precomputed_f0=precomputed_f0,
+                raw_output=True,
+                staged_post=vc.pipelined,
             )
-        if output_path is not None:
-            sf.write(output_path, audio_opt, tgt_sr, format="WAV")
+            if vc.pipelined:
+                # Mixed and resampled by the pipeline's post stage already
+                audio_sr = (
+                    resample_sr
+                    if resample_sr >= 16000 and resample_sr != tgt_sr
+                    else tgt_sr
+                )
+                source, post_mix_rate, post_resample_sr = None, 1, 0
+        sample_rate, audio_opt, _ = run_postprocess(
+            audio_opt,
+            audio_sr,
+            source=source,
+            rms_mix_rate=post_mix_rate,
+            resample_sr=post_resample_sr,
+            clean_strength=clean_strength,
+            output_path=output_path,
+            export_format=export_format,
+        )
 
-        return (tgt_sr, audio_opt)
+        return (sample_rate, audio_opt)
 
     except Exception as error:
         print(error)
 
 
-def get_vc(weight_root, sid):
-    global n_spk, tgt_sr, net_g, vc, cpt, version
+def multi_key_path(output_path, f0_up_key):
+    """out.wav -> out_key+2.wav"""
+    root, ext = os.path.splitext(output_path)
+    return f"{root}_key{f0_up_key:+d}{ext}"
+
+
+def vc_multi_key(
+    sid=0,
+    input_audio_path=None,
+    f0_up_keys=(0,),
+    f0_method=None,
+    file_index=None,
+    index_rate=None,
+    resample_sr=0,
+    rms_mix_rate=None,
+    protect=None,
+    hop_length=None,
+    output_path=None,
+    f0autotune=False,
+    clean_strength=None,
+    export_format="WAV",
+):
+    """
+    vc_single at every key in f0_up_keys, computing F0, HuBERT features and
+    index retrieval once and running only the synthesizer and
+    post-processing per key. Each key is written to multi_key_path(output_path,
+    key); returns {key: (sample_rate, int16 audio)}.
+    """
+    global tgt_sr
+
+    f0_up_keys = [int(key) for key in f0_up_keys]
+    try:
+        audio = load_audio(input_audio_path, 16000)
+        audio_max = np.abs(audio).max() / 0.95
+
+        if audio_max > 1:
+            audio /= audio_max
+
+        ensure_hubert()
+        if_f0 = cpt.get("f0", 1)
+
+        file_index = (
+            file_index.strip(" ")
+            .strip('"')
+            .strip("\n")
+            .strip('"')
+            .strip(" ")
+            .replace("trained", "added")
+        )
+        if tgt_sr != resample_sr >= 16000:
+            tgt_sr = resample_sr
+        converted, source = vc.pipeline_multi_key(
+            hubert_model,
+            net_g,
+            sid,
+            audio,
+            input_audio_path,
+            f0_up_keys,
+            f0_method,
+            file_index,
+            index_rate,
+            if_f0,
+            filter_radius,
+            version,
+            protect,
+            hop_length,
+            f0autotune,
+        )
+        results = {}
+        for key, audio_opt in converted.items():
+            sample_rate, audio_opt, _ = run_postprocess(
+                audio_opt,
+                tgt_sr,
+                source=source,
+                rms_mix_rate=rms_mix_rate,
+                resample_sr=resample_sr,
+                clean_strength=clean_strength,
+                output_path=multi_key_path(output_path, key),
+                export_format=export_format,
+            )
+            results[key] = (sample_rate, audio_opt)
+        return results
+
+    except Exception as error:
+        print(error)
+
+
+def vc_long_form(
+    sid=0,
+    input_audio_path=None,
+    f0_up_key=None,
+    f0_method=None,
+    file_index=None,
+    index_rate=None,
+    resample_sr=0,
+    rms_mix_rate=None,
+    protect=None,
+    hop_length=None,
+    output_path=None,
+    f0autotune=False,
+    clean_strength=None,
+    export_format="WAV",
+    window_seconds=30,
+    context_seconds=2,
+    fade_seconds=0.1,
+):
+    """
+    Convert input_audio_path window by window and append each converted
+    window to output_path, so peak memory depends on the window length and
+    not on the track length. Every window is converted with context_seconds
+    of audio either side (F0, features and post-processing all see it) and
+    consecutive windows are crossfaded over 2 * fade_seconds.
+    """
+    f0_up_key = int(f0_up_key)
+    ensure_hubert()
+    if_f0 = cpt.get("f0", 1)
+    file_index = (
+        file_index.strip(" ")
+        .strip('"')
+        .strip("\n")
+        .strip('"')
+        .strip(" ")
+        .replace("trained", "added")
+    )
+    sr = 16000
+    window, context, fade = (
+        int(window_seconds * sr),
+        int(context_seconds * sr),
+        int(fade_seconds * sr),
+    )
+    out_sr = resample_sr if resample_sr >= 16000 and resample_sr != tgt_sr else tgt_sr
+
+    def position(x):
+        return round(x * out_sr / sr)
+
+    start_time = time.time()
+    guard = PeakGuard(position(fade))
+    tail = np.zeros(0, dtype=np.float32)
+    duration = 0
+    with StreamEncoder(output_path, out_sr, export_format) as encoder:
+        windows = read_audio_windows(input_audio_path, window, context, sr)
+        for i, (start, offset, audio, last) in enumerate(windows):
+            # Harvest caches F0 by path, so every window needs its own key
+            window_key = f"{input_audio_path}#{i}"
+            audio_opt, source = vc.pipeline(
+                hubert_model,
+                net_g,
+                sid,
+                audio,
+                window_key,
+                f0_up_key,
+                f0_method,
+                file_index,
+                index_rate,
+                if_f0,
+                filter_radius,
+                tgt_sr,
+                resample_sr,
+                rms_mix_rate,
+                version,
+                protect,
+                hop_length,
+                f0autotune,
+                raw_output=True,
+            )
+            input_audio_path2wav.pop(window_key, None)
+            _, audio_opt, _ = run_postprocess(
+                audio_opt,
+                tgt_sr,
+                source=source,
+                rms_mix_rate=rms_mix_rate,
+                resample_sr=resample_sr,
+                clean_strength=clean_strength,
+                normalize=False,
+                verbose=False,
+            )
+
+            # Keep [start - fade, start + window + fade) and drop the rest of
+            # the context; the first 2 * fade overlap the previous tail
+            keep_from = position(start - fade) - position(offset) if start else 0
+            if last:
+                piece = audio_opt[keep_from:]
+            else:
+                keep_to = position(start + window + fade) - position(offset)
+                piece = audio_opt[keep_from:keep_to]
+                if len(piece) < keep_to - keep_from:
+                    piece = np.pad(piece, (0, keep_to - keep_from - len(piece)))
+            n = min(len(tail), len(piece))
+            if n:
+                ramp = np.linspace(0, 1, n, dtype=np.float32)
+                piece[:n] = tail[:n] * (1 - ramp) + piece[:n] * ramp
+            if not last:
+                tail_length = position(start + window + fade) - position(
+                    start + window - fade
+                )
+                piece, tail = piece[:-tail_length], piece[-tail_length:].copy()
+            encoder.write(guard(piece))
+            duration += len(piece)
+            print(
+                f"Converted {min(start + window, offset + len(audio)) / sr:.0f} s "
+                f"of {input_audio_path}"
+            )
+
+    elapsed = time.time() - start_time
+    print(
+        f"Long-form conversion of {duration / out_sr:.1f} s finished in {elapsed:.1f} s "
+        f"(RTF {elapsed / max(duration / out_sr, 1e-9):.3f})."
+    )
+    return out_sr, output_path
+
+
+def get_vc(
+    weight_root,
+    sid,
+    quantize="none",
+    backend_name="torch",
+    onnx_intra_threads=0,
+    onnx_inter_threads=0,
+):
+    global n_spk, tgt_sr, net_g, vc, cpt, version, quantize_mode, backend
+    global onnx_threads
+    if quantize not in QUANTIZE_MODES:
+        raise ValueError(f"quantize must be one of {QUANTIZE_MODES}, got {quantize}")
+    if backend_name not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, got {backend_name}")
+    if backend_name == "onnx" and quantize != "none":
+        print("Dynamic quantization is not applied to the ONNX backend.")
+        quantize = "none"
+    quantize_mode = quantize
+    backend = backend_name
+    onnx_threads = (onnx_intra_threads, onnx_inter_threads)
     if sid == "" or sid == []:
         global hubert_model
         if hubert_model is not None:
@@ -213,85 +529,167 @@ def get_vc(weight_root, sid):
                 torch.cuda.empty_cache()
             cpt = None
     person = weight_root
-    cpt = torch.load(person, map_location="cpu")
+    cpt = load_voice_model(person)
     tgt_sr = cpt["config"][-1]
     cpt["config"][-3] = cpt["weight"]["emb_g.weight"].shape[0]
     if_f0 = cpt.get("f0", 1)
 
     version = cpt.get("version", "v1")
-    if version == "v1":
-        if if_f0 == 1:
-            net_g = SynthesizerTrnMs256NSFsid(*cpt["config"], is_half=config.is_half)
-        else:
-            net_g = SynthesizerTrnMs256NSFsid_nono(*cpt["config"])
-    elif version == "v2":
-        if if_f0 == 1:
-            net_g = SynthesizerTrnMs768NSFsid(*cpt["config"], is_half=config.is_half)
+    net_g = None
+    if backend == "onnx":
+        onnx_path = onnx_model_path(person)
+        if os.path.exists(onnx_path):
+            net_g = OnnxSynthesizer(onnx_path, *onnx_threads)
+    elif config.use_jit:
+        jit_path = jit_cache_path(person, config.device, config.is_half)
+        net_g = load_jit_synthesizer(jit_path, config.device)
+    if net_g is None:
+        if version == "v1":
+            if if_f0 == 1:
+                net_g = SynthesizerTrnMs256NSFsid(
+                    *cpt["config"], is_half=config.is_half
+                )
+            else:
+                net_g = SynthesizerTrnMs256NSFsid_nono(*cpt["config"])
+        elif version == "v2":
+            if if_f0 == 1:
+                net_g = SynthesizerTrnMs768NSFsid(
+                    *cpt["config"], is_half=config.is_half
+                )
+            else:
+                net_g = SynthesizerTrnMs768NSFsid_nono(*cpt["config"])
+        del net_g.enc_q
+        # Mapped safetensors weights that are already in the runtime dtype
+        # become the parameters, so CPU workers on a host share one copy
+        runtime_dtype = torch.float16 if config.is_half else torch.float32
+        shared = (
+            is_safetensors(person)
+            and config.device == "cpu"
+            and all(w.dtype == runtime_dtype for w in cpt["weight"].values())
+        )
+        print(net_g.load_state_dict(cpt["weight"], strict=False, assign=shared))
+        net_g.eval().to(config.device)
+        if config.is_half:
+            net_g = net_g.half()
         else:
-            net_g = SynthesizerTrnMs768NSFsid_nono(*cpt["config"])
-    del net_g.enc_q
-    print(net_g.load_state_dict(cpt["weight"], strict=False))
-    net_g.eval().to(config.device)
-    if config.is_half:
-        net_g = net_g.half()
-    else:
-        net_g = net_g.float()
+            net_g = net_g.float()
+        if backend == "onnx":
+            export_synthesizer(net_g, onnx_path, if_f0, version)
+            net_g = OnnxSynthesizer(onnx_path, *onnx_threads)
+        elif config.use_jit:
+            net_g = (
+                export_jit_synthesizer(
+                    net_g, jit_path, if_f0, version, config.device, config.is_half
+                )
+                or net_g
+            )
     vc = VC(tgt_sr, config)
+    f0_registry.warm_up_from_env(config.device, config.is_half)
     n_spk = cpt["config"][-3]
 
 
-f0up_key = sys.argv[1]
-filter_radius = sys.argv[2]
-index_rate = float(sys.argv[3])
-hop_length = sys.argv[4]
-f0method = sys.argv[5]
-audio_input_path = sys.argv[6]
-audio_output_path = sys.argv[7]
-model_path = sys.argv[8]
-index_path = sys.argv[9]
-split_audio = sys.argv[10]
-f0autotune = sys.argv[11]
-rms_mix_rate = float(sys.argv[12])
-protect = float(sys.argv[13])
-clean_audio = sys.argv[14]
-clean_strength = float(sys.argv[15])
-export_format = sys.argv[16]
-
-get_vc(model_path, 0)
-
-try:
-    start_time = time.time()
-    vc_single(
-        sid=0,
-        input_audio_path=audio_input_path,
-        f0_up_key=f0up_key,
-        f0_file=None,
-        f0_method=f0method,
-        file_index=index_path,
-        index_rate=index_rate,
-        rms_mix_rate=rms_mix_rate,
-        protect=protect,
-        hop_length=hop_length,
-        output_path=audio_output_path,
-        split_audio=split_audio,
-        f0autotune=f0autotune,
-    )
-
-    if clean_audio == "True":
-        cleaned_audio = remove_audio_noise(audio_output_path, clean_strength)
-        if cleaned_audio is not None:
-            sf.write(audio_output_path, cleaned_audio, tgt_sr, format="WAV")
+if __name__ == "__main__":
+    f0up_key = sys.argv[1]
+    filter_radius = int(sys.argv[2])
+    index_rate = float(sys.argv[3])
+    hop_length = sys.argv[4]
+    f0method = sys.argv[5]
+    audio_input_path = sys.argv[6]
+    audio_output_path = sys.argv[7]
+    model_path = sys.argv[8]
+    index_path = sys.argv[9]
+    split_audio = sys.argv[10]
+    f0autotune = sys.argv[11]
+    rms_mix_rate = float(sys.argv[12])
+    protect = float(sys.argv[13])
+    clean_audio = sys.argv[14]
+    clean_strength = float(sys.argv[15])
+    export_format = sys.argv[16]
+    quantize = sys.argv[17] if len(sys.argv) > 17 else "none"
+    config.use_jit = len(sys.argv) > 18 and sys.argv[18] == "True"
+    backend_name = sys.argv[19] if len(sys.argv) > 19 else "torch"
+    config.pipelined = len(sys.argv) > 20 and sys.argv[20] == "True"
+    long_form = len(sys.argv) > 21 and sys.argv[21] == "True"
+    long_form_window = float(sys.argv[22]) if len(sys.argv) > 22 else 30
+    config.crepe_batch_size = int(sys.argv[23]) if len(sys.argv) > 23 else 0
+    config.crepe_decoder = sys.argv[24] if len(sys.argv) > 24 else "viterbi"
+    if len(sys.argv) > 25 and sys.argv[25] != "none":
+        config.crepe_silence_db = float(sys.argv[25])
+    f0up_keys = sys.argv[26] if len(sys.argv) > 26 else ""
+    onnx_intra_threads = int(sys.argv[27]) if len(sys.argv) > 27 else 0
+    onnx_inter_threads = int(sys.argv[28]) if len(sys.argv) > 28 else 0
 
-    output_path_format = audio_output_path.replace(".wav", f".{export_format.lower()}")
-    audio_output_path = convert_audio_format(
-        audio_output_path, output_path_format, export_format
+    get_vc(
+        model_path,
+        0,
+        quantize,
+        backend_name,
+        onnx_intra_threads,
+        onnx_inter_threads,
     )
 
-    end_time = time.time()
-    elapsed_time = end_time - start_time
-    print(
-        f"Conversion completed. Output file: '{audio_output_path}' in {elapsed_time:.2f} seconds."
-    )
+    try:
+        start_time = time.time()
+        audio_output_path = audio_output_path.replace(
+            ".wav", f".{export_format.lower()}"
+        )
+        if f0up_keys:
+            vc_multi_key(
+                sid=0,
+                input_audio_path=audio_input_path,
+                f0_up_keys=f0up_keys.split(","),
+                f0_method=f0method,
+                file_index=index_path,
+                index_rate=index_rate,
+                rms_mix_rate=rms_mix_rate,
+                protect=protect,
+                hop_length=hop_length,
+                output_path=audio_output_path,
+                f0autotune=f0autotune,
+                clean_strength=clean_strength if clean_audio == "True" else None,
+                export_format=export_format,
+            )
+        elif long_form:
+            vc_long_form(
+                sid=0,
+                input_audio_path=audio_input_path,
+                f0_up_key=f0up_key,
+                f0_method=f0method,
+                file_index=index_path,
+                index_rate=index_rate,
+                rms_mix_rate=rms_mix_rate,
+                protect=protect,
+                hop_length=hop_length,
+                output_path=audio_output_path,
+                f0autotune=f0autotune,
+                clean_strength=clean_strength if clean_audio == "True" else None,
+                export_format=export_format,
+                window_seconds=long_form_window,
+            )
+        else:
+            vc_single(
+                sid=0,
+                input_audio_path=audio_input_path,
+                f0_up_key=f0up_key,
+                f0_file=None,
+                f0_method=f0method,
+                file_index=index_path,
+                index_rate=index_rate,
+                rms_mix_rate=rms_mix_rate,
+                protect=protect,
+                hop_length=hop_length,
+                output_path=audio_output_path,
+                split_audio=split_audio,
+                f0autotune=f0autotune,
+                clean_strength=clean_strength if clean_audio == "True" else None,
+                export_format=export_format,
+            )
+
+        end_time = time.time()
+        elapsed_time = end_time - start_time
+        print(
+            f"Conversion completed. Output file: '{audio_output_path}' in {elapsed_time:.2f} seconds."
+        )
 
-except Exception as error:
-    print(f"Voice conversion failed: {error}")
+    except Exception as error:
+        print(f"Voice conversion failed: {error}")
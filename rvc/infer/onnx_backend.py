@@ -0,0 +1,168 @@
+import os
+import sys
+import inspect
+
+import numpy as np
+import torch
+
+from synthesizer_jit import SynthesizerInfer, example_inputs, file_sha256
+
+HUBERT_OUTPUT_LAYERS = {"v1": 9, "v2": 12}
+SYNTHESIZER_INPUTS = {
+    5: ["phone", "phone_lengths", "pitch", "pitchf", "sid"],
+    3: ["phone", "phone_lengths", "sid"],
+}
+
+
+class HubertFeatures(torch.nn.Module):
+    """The part of HuBERT that VC.vc uses, as a single traceable graph."""
+
+    def __init__(self, hubert_model, version):
+        super().__init__()
+        self.hubert_model = hubert_model
+        self.version = version
+
+    def forward(self, source):
+        padding_mask = torch.zeros_like(source, dtype=torch.bool)
+        logits = self.hubert_model.extract_features(
+            source=source,
+            padding_mask=padding_mask,
+            output_layer=HUBERT_OUTPUT_LAYERS[self.version],
+        )
+        if self.version == "v1":
+            return self.hubert_model.final_proj(logits[0])
+        return logits[0]
+
+
+def onnx_model_path(pth_path):
+    model_hash = file_sha256(pth_path)[:16]
+    name = os.path.splitext(os.path.basename(pth_path))[0]
+    return os.path.join(
+        os.path.dirname(os.path.abspath(pth_path)), f"{name}.{model_hash}.onnx"
+    )
+
+
+def onnx_hubert_path(version, hubert_path="hubert_base.pt"):
+    return f"{os.path.splitext(hubert_path)[0]}.{version}.onnx"
+
+
+def _export(module, inputs, path, input_names, output_names, dynamic_axes):
+    export_kwargs = {}
+    # Newer torch defaults to the dynamo exporter, which does not handle the
+    # fairseq model; the TorchScript-based exporter does.
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        export_kwargs["dynamo"] = False
+    with torch.no_grad():
+        torch.onnx.export(
+            module,
+            inputs,
+            path,
+            input_names=input_names,
+            output_names=output_names,
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+            do_constant_folding=True,
+            **export_kwargs,
+        )
+    print(f"Exported {path}")
+
+
+def export_synthesizer(net_g, path, if_f0, version):
+    inputs = example_inputs(200, if_f0, version, "cpu", False)
+    input_names = SYNTHESIZER_INPUTS[len(inputs)]
+    if if_f0:
+        dynamic_axes = {
+            "phone": {1: "frames"},
+            "pitch": {1: "frames"},
+            "pitchf": {1: "frames"},
+        }
+    else:
+        dynamic_axes = {"phone": {1: "frames"}}
+    dynamic_axes["audio"] = {2: "samples"}
+    _export(
+        SynthesizerInfer(net_g.float().cpu(), if_f0).eval(),
+        inputs,
+        path,
+        input_names,
+        ["audio"],
+        dynamic_axes,
+    )
+
+
+def export_hubert(hubert_model, path, version):
+    _export(
+        HubertFeatures(hubert_model.float().cpu(), version).eval(),
+        (torch.randn(1, 16000),),
+        path,
+        ["source"],
+        ["feats"],
+        {"source": {1: "samples"}, "feats": {1: "frames"}},
+    )
+
+
+def create_session(path, intra_op_threads=0, inter_op_threads=0):
+    """
+    A CPU session for path. intra_op_threads splits each operator across
+    threads and inter_op_threads runs independent operators concurrently
+    (ORT's parallel executor); 0 leaves onnxruntime's default.
+    """
+    try:
+        import onnxruntime as ort
+    except ImportError as error:
+        raise ImportError(
+            "The ONNX backend needs onnxruntime: pip install onnxruntime"
+        ) from error
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    if intra_op_threads:
+        options.intra_op_num_threads = intra_op_threads
+    if inter_op_threads:
+        options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+        options.inter_op_num_threads = inter_op_threads
+    return ort.InferenceSession(
+        path, sess_options=options, providers=["CPUExecutionProvider"]
+    )
+
+
+class OnnxHubert:
+    backend = "onnx"
+
+    def __init__(self, path, version, intra_op_threads=0, inter_op_threads=0):
+        self.session = create_session(path, intra_op_threads, inter_op_threads)
+        self.version = version
+        self.threads = (intra_op_threads, inter_op_threads)
+
+    def features(self, source):
+        (feats,) = self.session.run(["feats"], {"source": source.float().cpu().numpy()})
+        return torch.from_numpy(feats)
+
+
+class OnnxSynthesizer:
+    backend = "onnx"
+
+    def __init__(self, path, intra_op_threads=0, inter_op_threads=0):
+        self.session = create_session(path, intra_op_threads, inter_op_threads)
+        # The exporter drops inputs the graph does not use, so feed by name
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def infer_numpy(self, *args):
+        feeds = {
+            name: value.cpu().numpy()
+            for name, value in zip(SYNTHESIZER_INPUTS[len(args)], args)
+            if name in self.input_names
+        }
+        feeds["phone"] = feeds["phone"].astype(np.float32)
+        if "pitchf" in feeds:
+            feeds["pitchf"] = feeds["pitchf"].astype(np.float32)
+        (audio,) = self.session.run(["audio"], feeds)
+        return audio
+
+
+if __name__ == "__main__":
+    import infer
+
+    pth_path = sys.argv[1]
+    infer.get_vc(pth_path, 0, backend_name="onnx")
+    infer.load_onnx_hubert(infer.version)
+    print(f"ONNX models ready for {pth_path}")
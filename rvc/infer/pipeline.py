@@ -1,20 +1,24 @@
-import numpy as np, parselmouth, torch, pdb, sys, os
+import numpy as np, torch, sys, os
 from time import time as ttime
 import torch.nn.functional as F
-import torchcrepe
 from torch import Tensor
-import scipy.signal as signal
-import pyworld, os, faiss, librosa, torchcrepe
 from scipy import signal
 from functools import lru_cache
 import random
-import gc
 import re
+import queue
+import threading
+
+from postprocess import mix_rms, resample, to_int16
 
 now_dir = os.getcwd()
 sys.path.append(now_dir)
 
-from rvc.lib.FCPEF0Predictor import FCPEF0Predictor
+from rvc.lib import f0_registry
+
+# parselmouth, pyworld, torchcrepe, faiss and the F0 model wrappers are
+# imported where they are used, so a run only pays for the F0 method and
+# retrieval options it actually selects
 
 bh, ah = signal.butter(N=5, Wn=48, btype="high", fs=16000)
 
@@ -22,40 +26,126 @@ input_audio_path2wav = {}
 
 
 @lru_cache
-def cache_harvest_f0(input_audio_path, fs, f0max, f0min, frame_period):
+def cache_harvest_f0(input_audio_path, fs, f0max, f0min, frame_period, workers=1):
+    from rvc.lib.harvest import segmented_harvest
+
     audio = input_audio_path2wav[input_audio_path]
-    f0, t = pyworld.harvest(
-        audio,
-        fs=fs,
-        f0_ceil=f0max,
-        f0_floor=f0min,
-        frame_period=frame_period,
+    return segmented_harvest(audio, fs, f0min, f0max, frame_period, workers)
+
+
+def interp_f0(source, p_len):
+    """
+    The CREPE path's np.nan_to_num(np.interp(...)) resampling of source to
+    p_len frames, on source's device: unvoiced frames (< 0.001 Hz), and the
+    positions interpolated against them, become 0.
+    """
+    n = source.shape[0]
+    source = torch.where(source < 0.001, torch.full_like(source, float("nan")), source)
+    positions = (torch.arange(p_len, dtype=torch.float64) * n / p_len).clamp(max=n - 1)
+    lower = positions.floor().long()
+    weight = (positions - lower).to(source.device, source.dtype)
+    lower = lower.to(source.device)
+    upper = (lower + 1).clamp(max=n - 1)
+    # np.interp returns a sample point's own value, even next to a NaN
+    f0 = torch.where(
+        weight == 0, source[lower], torch.lerp(source[lower], source[upper], weight)
     )
-    f0 = pyworld.stonemask(audio, f0, t, fs)
-    return f0
+    return torch.nan_to_num(f0, nan=0.0)
+
+
+def set_index_search_params(index, file_index):
+    # extract_index.py encodes the query-time parameters in the file name
+    # (e.g. added_IVF256_Flat_nprobe_8_v2.index, added_HNSW32_Flat_efSearch_64_v2.index)
+    params = re.findall(r"(nprobe|efSearch)_(\d+)", os.path.basename(file_index))
+    if params:
+        import faiss
+
+        faiss.ParameterSpace().set_index_parameters(
+            index, ",".join(f"{name}={value}" for name, value in params)
+        )
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+        self.wall = 0.0
+
+    def __str__(self):
+        wall = max(self.wall, 1e-9)
+        return (
+            f"Stage {self.name}: {self.items} chunks, busy {self.busy / wall:.0%}, "
+            f"waiting for input {self.starved / wall:.0%}, "
+            f"blocked on output {self.blocked / wall:.0%}"
+        )
+
 
+_STAGE_DONE = object()
 
-def change_rms(data1, sr1, data2, sr2, rate):
-    # print(data1.max(),data2.max())
-    rms1 = librosa.feature.rms(y=data1, frame_length=sr1 // 2 * 2, hop_length=sr1 // 2)
-    rms2 = librosa.feature.rms(y=data2, frame_length=sr2 // 2 * 2, hop_length=sr2 // 2)
 
-    rms1 = torch.from_numpy(rms1)
-    rms1 = F.interpolate(
-        rms1.unsqueeze(0), size=data2.shape[0], mode="linear"
-    ).squeeze()
+def run_stages(items, stages, queue_size):
+    """Run items through (name, fn) stages, one thread per stage, bounded queues between them."""
+    queues = [queue.Queue(queue_size) for _ in range(len(stages) + 1)]
+    stats = [StageStats(name) for name, _ in stages]
+    errors = []
 
-    rms2 = torch.from_numpy(rms2)
-    rms2 = F.interpolate(
-        rms2.unsqueeze(0), size=data2.shape[0], mode="linear"
-    ).squeeze()
-    rms2 = torch.max(rms2, torch.zeros_like(rms2) + 1e-6)
+    def feed():
+        # items may be a generator doing work of its own (e.g. F0 extraction)
+        try:
+            for item in items:
+                if errors:
+                    break
+                queues[0].put(item)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            queues[0].put(_STAGE_DONE)
 
-    data2 *= (
-        torch.pow(rms1, torch.tensor(1 - rate))
-        * torch.pow(rms2, torch.tensor(rate - 1))
-    ).numpy()
-    return data2
+    def work(i, fn):
+        q_in, q_out, stage = queues[i], queues[i + 1], stats[i]
+        while True:
+            t0 = ttime()
+            item = q_in.get()
+            t1 = ttime()
+            stage.starved += t1 - t0
+            if item is _STAGE_DONE:
+                q_out.put(_STAGE_DONE)
+                return
+            if errors:
+                # Keep draining so upstream stages never block on a full queue
+                continue
+            try:
+                result = fn(item)
+            except Exception as error:
+                errors.append(error)
+                continue
+            t2 = ttime()
+            stage.busy += t2 - t1
+            stage.items += 1
+            q_out.put(result)
+            stage.blocked += ttime() - t2
+
+    start = ttime()
+    threads = [threading.Thread(target=feed, daemon=True)] + [
+        threading.Thread(target=work, args=(i, fn), daemon=True)
+        for i, (_, fn) in enumerate(stages)
+    ]
+    for thread in threads:
+        thread.start()
+    results = []
+    while (item := queues[-1].get()) is not _STAGE_DONE:
+        results.append(item)
+    for thread in threads:
+        thread.join()
+    wall = ttime() - start
+    for stage in stats:
+        stage.wall = wall
+    if errors:
+        raise errors[0]
+    return results, stats
 
 
 class VC(object):
@@ -76,6 +166,17 @@ class VC(object):
         self.t_center = self.sr * self.x_center
         self.t_max = self.sr * self.x_max
         self.device = config.device
+        self.pipelined = getattr(config, "pipelined", False)
+        self.harvest_workers = getattr(config, "harvest_workers", 0)
+        self.crepe_batch_size = getattr(config, "crepe_batch_size", 0)
+        self.crepe_decoder = getattr(config, "crepe_decoder", "viterbi")
+        crepe_silence_db = getattr(config, "crepe_silence_db", None)
+        self.crepe_silence_threshold = (
+            0.0 if crepe_silence_db is None else 10 ** (crepe_silence_db / 20)
+        )
+        self.stage_queue_size = 2
+        self.stage_stats = []
+        self.index_cache = None
         self.ref_freqs = [
             65.41,
             82.41,
@@ -140,27 +241,20 @@ class VC(object):
         if audio.ndim == 2 and audio.shape[0] > 1:
             audio = torch.mean(audio, dim=0, keepdim=True).detach()
         audio = audio.detach()
-        pitch: Tensor = torchcrepe.predict(
+        # x is peak-normalized, so the silence threshold is relative to the peak
+        pitch: Tensor = f0_registry.crepe_infer(
             audio,
-            self.sr,
             hop_length,
             f0_min,
             f0_max,
             model,
-            batch_size=hop_length * 2,
             device=torch_device,
-            pad=True,
+            batch_size=self.crepe_batch_size,
+            decoder=self.crepe_decoder,
+            silence_threshold=self.crepe_silence_threshold,
         )
         p_len = p_len or x.shape[0] // hop_length
-        source = np.array(pitch.squeeze(0).cpu().float().numpy())
-        source[source < 0.001] = np.nan
-        target = np.interp(
-            np.arange(0, len(source) * p_len, len(source)) / p_len,
-            np.arange(0, len(source)),
-            source,
-        )
-        f0 = np.nan_to_num(target)
-        return f0
+        return interp_f0(pitch[0].float(), p_len).cpu().numpy()
 
     def get_f0_official_crepe_computation(
         self,
@@ -169,17 +263,18 @@ class VC(object):
         f0_max,
         model="full",
     ):
-        batch_size = 512
+        import torchcrepe
+
         audio = torch.tensor(np.copy(x))[None].float()
-        f0, pd = torchcrepe.predict(
+        f0, pd = f0_registry.crepe_infer(
             audio,
-            self.sr,
             self.window,
             f0_min,
             f0_max,
             model,
-            batch_size=batch_size,
             device=self.device,
+            batch_size=self.crepe_batch_size,
+            decoder=self.crepe_decoder,
             return_periodicity=True,
         )
         pd = torchcrepe.filter.median(pd, 3)
@@ -211,27 +306,12 @@ class VC(object):
                     x, f0_min, f0_max, p_len, int(hop_length)
                 )
             elif method == "rmvpe":
-                if hasattr(self, "model_rmvpe") == False:
-                    from rvc.lib.rmvpe import RMVPE
-
-                    self.model_rmvpe = RMVPE(
-                        "rmvpe.pt", is_half=self.is_half, device=self.device
-                    )
-                f0 = self.model_rmvpe.infer_from_audio(x, thred=0.03)
+                model_rmvpe = f0_registry.rmvpe(self.device, self.is_half)
+                f0 = model_rmvpe.infer_from_audio(x, thred=0.03)
                 f0 = f0[1:]
             elif method == "fcpe":
-                self.model_fcpe = FCPEF0Predictor(
-                    "fcpe.pt",
-                    f0_min=int(f0_min),
-                    f0_max=int(f0_max),
-                    dtype=torch.float32,
-                    device=self.device,
-                    sampling_rate=self.sr,
-                    threshold=0.03,
-                )
-                f0 = self.model_fcpe.compute_f0(x, p_len=p_len)
-                del self.model_fcpe
-                gc.collect()
+                model_fcpe = f0_registry.fcpe(self.device, self.sr, f0_min, f0_max)
+                f0 = model_fcpe.compute_f0(x, p_len=p_len)
             f0_computation_stack.append(f0)
 
         print(f"Calculating hybrid median f0 from the stack of {str(methods)}")
@@ -259,9 +339,9 @@ class VC(object):
         time_step = self.window / self.sr * 1000
         f0_min = 50
         f0_max = 1100
-        f0_mel_min = 1127 * np.log(1 + f0_min / 700)
-        f0_mel_max = 1127 * np.log(1 + f0_max / 700)
         if f0_method == "pm":
+            import parselmouth
+
             f0 = (
                 parselmouth.Sound(x, self.sr)
                 .to_pitch_ac(
@@ -279,10 +359,15 @@ class VC(object):
                 )
         elif f0_method == "harvest":
             input_audio_path2wav[input_audio_path] = x.astype(np.double)
-            f0 = cache_harvest_f0(input_audio_path, self.sr, f0_max, f0_min, 10)
+            f0 = cache_harvest_f0(
+                input_audio_path, self.sr, f0_max, f0_min, 10, self.harvest_workers
+            )
+            input_audio_path2wav.pop(input_audio_path, None)
             if int(filter_radius) > 2:
                 f0 = signal.medfilt(f0, 3)
         elif f0_method == "dio":
+            import pyworld
+
             f0, t = pyworld.dio(
                 x.astype(np.double),
                 fs=self.sr,
@@ -301,26 +386,11 @@ class VC(object):
                 x, f0_min, f0_max, p_len, int(hop_length), "tiny"
             )
         elif f0_method == "rmvpe":
-            if hasattr(self, "model_rmvpe") == False:
-                from rvc.lib.rmvpe import RMVPE
-
-                self.model_rmvpe = RMVPE(
-                    "rmvpe.pt", is_half=self.is_half, device=self.device
-                )
-            f0 = self.model_rmvpe.infer_from_audio(x, thred=0.03)
+            model_rmvpe = f0_registry.rmvpe(self.device, self.is_half)
+            f0 = model_rmvpe.infer_from_audio(x, thred=0.03)
         elif f0_method == "fcpe":
-            self.model_fcpe = FCPEF0Predictor(
-                "fcpe.pt",
-                f0_min=int(f0_min),
-                f0_max=int(f0_max),
-                dtype=torch.float32,
-                device=self.device,
-                sampling_rate=self.sr,
-                threshold=0.03,
-            )
-            f0 = self.model_fcpe.compute_f0(x, p_len=p_len)
-            del self.model_fcpe
-            gc.collect()
+            model_fcpe = f0_registry.fcpe(self.device, self.sr, f0_min, f0_max)
+            f0 = model_fcpe.compute_f0(x, p_len=p_len)
         elif "hybrid" in f0_method:
             input_audio_path2wav[input_audio_path] = x.astype(np.double)
             f0 = self.get_f0_hybrid_computation(
@@ -331,11 +401,22 @@ class VC(object):
                 p_len,
                 hop_length,
             )
+            input_audio_path2wav.pop(input_audio_path, None)
 
         if f0autotune == "True":
             f0 = self.autotune_f0(f0)
 
-        f0 *= pow(2, f0_up_key / 12)
+        return self.transpose_f0(f0, f0_up_key, inp_f0)
+
+    def transpose_f0(self, f0, f0_up_key, inp_f0=None):
+        """
+        Shift f0 by f0_up_key semitones, splice in inp_f0 and quantize it to
+        the synthesizer's 256 mel bins. Returns (f0_coarse, f0bak); f0 itself
+        is left untouched, so one extraction can be transposed to many keys.
+        """
+        f0_mel_min = 1127 * np.log(1 + 50 / 700)
+        f0_mel_max = 1127 * np.log(1 + 1100 / 700)
+        f0 = f0 * pow(2, f0_up_key / 12)
         tf0 = self.sr // self.window
         if inp_f0 is not None:
             delta_t = np.round(
@@ -359,11 +440,35 @@ class VC(object):
 
         return f0_coarse, f0bak
 
-    def vc(
+    def compute_f0(
+        self,
+        input_audio_path,
+        audio,
+        f0_up_key,
+        f0_method,
+        filter_radius,
+        hop_length,
+        f0autotune,
+    ):
+        # Same filtering and padding as pipeline(), so the result can be passed
+        # back in as precomputed_f0 from another process.
+        audio = signal.filtfilt(bh, ah, audio)
+        audio_pad = np.pad(audio, (self.t_pad, self.t_pad), mode="reflect")
+        p_len = audio_pad.shape[0] // self.window
+        return self.get_f0(
+            input_audio_path,
+            audio_pad,
+            p_len,
+            f0_up_key,
+            f0_method,
+            filter_radius,
+            hop_length,
+            f0autotune,
+        )
+
+    def vc_features(
         self,
         model,
-        net_g,
-        sid,
         audio0,
         pitch,
         pitchf,
@@ -389,10 +494,12 @@ class VC(object):
             "padding_mask": padding_mask,
             "output_layer": 9 if version == "v1" else 12,
         }
-        t0 = ttime()
-        with torch.no_grad():
-            logits = model.extract_features(**inputs)
-            feats = model.final_proj(logits[0]) if version == "v1" else logits[0]
+        if getattr(model, "backend", "torch") == "onnx":
+            feats = model.features(feats).to(self.device)
+        else:
+            with torch.no_grad():
+                logits = model.extract_features(**inputs)
+                feats = model.final_proj(logits[0]) if version == "v1" else logits[0]
         if protect < 0.5 and pitch != None and pitchf != None:
             feats0 = feats.clone()
         if (
@@ -421,7 +528,6 @@ class VC(object):
             feats0 = F.interpolate(feats0.permute(0, 2, 1), scale_factor=2).permute(
                 0, 2, 1
             )
-        t1 = ttime()
         p_len = audio0.shape[0] // self.window
         if feats.shape[1] < p_len:
             p_len = feats.shape[1]
@@ -437,8 +543,18 @@ class VC(object):
             feats = feats * pitchff + feats0 * (1 - pitchff)
             feats = feats.to(feats0.dtype)
         p_len = torch.tensor([p_len], device=self.device).long()
+        del padding_mask
+        return feats, p_len, pitch, pitchf
+
+    def vc_synthesize(self, net_g, sid, feats, p_len, pitch, pitchf):
         with torch.no_grad():
-            if pitch != None and pitchf != None:
+            if getattr(net_g, "backend", "torch") == "onnx":
+                # ONNX Runtime returns numpy directly, no tensor round trip needed
+                if pitch != None and pitchf != None:
+                    audio1 = net_g.infer_numpy(feats, p_len, pitch, pitchf, sid)[0, 0]
+                else:
+                    audio1 = net_g.infer_numpy(feats, p_len, sid)[0, 0]
+            elif pitch != None and pitchf != None:
                 audio1 = (
                     (net_g.infer(feats, p_len, pitch, pitchf, sid)[0][0, 0])
                     .data.cpu()
@@ -449,43 +565,140 @@ class VC(object):
                 audio1 = (
                     (net_g.infer(feats, p_len, sid)[0][0, 0]).data.cpu().float().numpy()
                 )
-        del feats, p_len, padding_mask
+        del feats, p_len
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
-        t2 = ttime()
         return audio1
 
-    def pipeline(
+    def vc(
+        self,
+        model,
+        net_g,
+        sid,
+        audio0,
+        pitch,
+        pitchf,
+        index,
+        big_npy,
+        index_rate,
+        version,
+        protect,
+    ):
+        feats, p_len, pitch, pitchf = self.vc_features(
+            model,
+            audio0,
+            pitch,
+            pitchf,
+            index,
+            big_npy,
+            index_rate,
+            version,
+            protect,
+        )
+        return self.vc_synthesize(net_g, sid, feats, p_len, pitch, pitchf)
+
+    def pipeline_staged(
         self,
         model,
         net_g,
         sid,
         audio,
+        audio_pad,
+        chunks,
+        pitch,
+        pitchf,
+        index,
+        big_npy,
+        index_rate,
+        version,
+        protect,
+        tgt_sr,
+        resample_sr,
+        rms_mix_rate,
+    ):
+        # HuBERT + retrieval, synthesis and post-processing run on their own
+        # threads, so chunk k's features overlap chunk k-1's synthesis and
+        # chunk k-2's post-processing. RMS mixing and resampling are applied per
+        # chunk here, which differs from the whole-signal version only within
+        # half a second of chunk boundaries.
+        def features(chunk):
+            start, end, f0_start, f0_end = chunk
+            return start, self.vc_features(
+                model,
+                audio_pad[start:end],
+                pitch[:, f0_start:f0_end] if pitch is not None else None,
+                pitchf[:, f0_start:f0_end] if pitchf is not None else None,
+                index,
+                big_npy,
+                index_rate,
+                version,
+                protect,
+            )
+
+        def synthesize(item):
+            start, (feats, p_len, chunk_pitch, chunk_pitchf) = item
+            return start, self.vc_synthesize(
+                net_g, sid, feats, p_len, chunk_pitch, chunk_pitchf
+            )
+
+        def post(item):
+            start, audio1 = item
+            audio1 = audio1[self.t_pad_tgt : -self.t_pad_tgt]
+            if rms_mix_rate != 1:
+                source = audio[start : start + len(audio1) * self.sr // tgt_sr]
+                audio1 = mix_rms(source, 16000, audio1, tgt_sr, rms_mix_rate)
+            if resample_sr >= 16000 and tgt_sr != resample_sr:
+                audio1 = resample(audio1, tgt_sr, resample_sr)
+            return audio1
+
+        results, self.stage_stats = run_stages(
+            chunks,
+            [("features", features), ("synthesis", synthesize), ("post", post)],
+            self.stage_queue_size,
+        )
+        for stats in self.stage_stats:
+            print(stats)
+        return np.concatenate(results)
+
+    def load_index(self, file_index, index_rate):
+        if file_index == "" or not os.path.exists(file_index) or index_rate == 0:
+            return None, None
+        # Long-form windows, split segments and batch files reuse the same
+        # index, so keep the last one loaded instead of reading it every call
+        try:
+            key = (file_index, os.path.getmtime(file_index))
+            if self.index_cache is None or self.index_cache[0] != key:
+                import faiss
+
+                self.index_cache = None
+                index = faiss.read_index(file_index)
+                set_index_search_params(index, file_index)
+                # PQ/SQ8 indexes return decoded (approximate) vectors here
+                big_npy = index.reconstruct_n(0, index.ntotal)
+                self.index_cache = (key, index, big_npy)
+            return self.index_cache[1:]
+        except Exception as error:
+            print(error)
+            return None, None
+
+    def prepare_chunks(
+        self,
+        audio,
         input_audio_path,
         f0_up_key,
         f0_method,
-        file_index,
-        index_rate,
         if_f0,
         filter_radius,
-        tgt_sr,
-        resample_sr,
-        rms_mix_rate,
-        version,
-        protect,
         hop_length,
         f0autotune,
-        f0_file=None,
+        inp_f0=None,
+        precomputed_f0=None,
     ):
-        if file_index != "" and os.path.exists(file_index) == True and index_rate != 0:
-            try:
-                index = faiss.read_index(file_index)
-                big_npy = index.reconstruct_n(0, index.ntotal)
-            except Exception as error:
-                print(error)
-                index = big_npy = None
-        else:
-            index = big_npy = None
+        """
+        High-pass and pad audio, extract F0 and pick the chunk boundaries.
+        Returns (audio, audio_pad, pitch, pitchf, chunks), where every chunk is
+        (input start, input end, f0 start, f0 end) into audio_pad and pitch.
+        """
         audio = signal.filtfilt(bh, ah, audio)
         audio_pad = np.pad(audio, (self.window // 2, self.window // 2), mode="reflect")
         opt_ts = []
@@ -503,11 +716,252 @@ class VC(object):
                     )[0][0]
                 )
         s = 0
-        audio_opt = []
         t = None
-        t1 = ttime()
         audio_pad = np.pad(audio, (self.t_pad, self.t_pad), mode="reflect")
         p_len = audio_pad.shape[0] // self.window
+        pitch, pitchf = None, None
+        if if_f0 == 1:
+            if precomputed_f0 is not None:
+                pitch, pitchf = precomputed_f0
+            else:
+                pitch, pitchf = self.get_f0(
+                    input_audio_path,
+                    audio_pad,
+                    p_len,
+                    f0_up_key,
+                    f0_method,
+                    filter_radius,
+                    hop_length,
+                    f0autotune,
+                    inp_f0,
+                )
+            pitch, pitchf = self.pitch_tensors(pitch, pitchf, p_len)
+        # (input start, input end, f0 start, f0 end) for each chunk of audio_pad
+        chunks = []
+        for t in opt_ts:
+            t = t // self.window * self.window
+            chunks.append(
+                (
+                    s,
+                    t + self.t_pad2 + self.window,
+                    s // self.window,
+                    (t + self.t_pad2) // self.window,
+                )
+            )
+            s = t
+        chunks.append((t, None, t // self.window if t is not None else None, None))
+        return audio, audio_pad, pitch, pitchf, chunks
+
+    def pitch_tensors(self, pitch, pitchf, p_len):
+        pitch = pitch[:p_len]
+        pitchf = pitchf[:p_len]
+        if self.device == "mps":
+            pitchf = pitchf.astype(np.float32)
+        pitch = torch.tensor(pitch, device=self.device).unsqueeze(0).long()
+        pitchf = torch.tensor(pitchf, device=self.device).unsqueeze(0).float()
+        return pitch, pitchf
+
+    def pipeline_multi_key(
+        self,
+        model,
+        net_g,
+        sid,
+        audio,
+        input_audio_path,
+        f0_up_keys,
+        f0_method,
+        file_index,
+        index_rate,
+        if_f0,
+        filter_radius,
+        version,
+        protect,
+        hop_length,
+        f0autotune,
+    ):
+        """
+        Convert audio at every key in f0_up_keys, sharing all work upstream
+        of the synthesizer: chunking and F0 extraction run once and F0 is
+        transposed per key, and each chunk's HuBERT features and index
+        retrieval are computed once and synthesized at every key. Returns
+        ({key: float audio at the model rate}, high-passed 16 kHz input), the
+        per-key equivalent of pipeline(raw_output=True).
+        """
+        index, big_npy = self.load_index(file_index, index_rate)
+        sid = torch.tensor(sid, device=self.device).unsqueeze(0).long()
+        keys = list(dict.fromkeys(f0_up_keys))
+        audio, audio_pad, _, _, chunks = self.prepare_chunks(
+            audio,
+            input_audio_path,
+            0,
+            f0_method,
+            0,
+            filter_radius,
+            hop_length,
+            f0autotune,
+        )
+        pitches = {key: (None, None) for key in keys}
+        if if_f0 == 1:
+            p_len = audio_pad.shape[0] // self.window
+            _, f0 = self.get_f0(
+                input_audio_path,
+                audio_pad,
+                p_len,
+                0,
+                f0_method,
+                filter_radius,
+                hop_length,
+                f0autotune,
+            )
+            for key in keys:
+                pitches[key] = self.pitch_tensors(*self.transpose_f0(f0, key), p_len)
+
+        outputs = {key: [] for key in keys}
+        for start, end, f0_start, f0_end in chunks:
+            # Transposing keeps voiced frames voiced, so the protect mask
+            # vc_features derives from pitchf is the same at every key
+            pitch, pitchf = pitches[keys[0]]
+            feats, p_len, pitch, _ = self.vc_features(
+                model,
+                audio_pad[start:end],
+                pitch[:, f0_start:f0_end] if pitch is not None else None,
+                pitchf[:, f0_start:f0_end] if pitchf is not None else None,
+                index,
+                big_npy,
+                index_rate,
+                version,
+                protect,
+            )
+            for key in keys:
+                if pitch is None and key != keys[0]:
+                    # Without F0 the key changes nothing
+                    outputs[key].append(outputs[keys[0]][-1])
+                    continue
+                key_pitch, key_pitchf = pitches[key]
+                if key_pitch is not None:
+                    frames = pitch.shape[1]
+                    key_pitch = key_pitch[:, f0_start:f0_end][:, :frames]
+                    key_pitchf = key_pitchf[:, f0_start:f0_end][:, :frames]
+                audio1 = self.vc_synthesize(
+                    net_g, sid, feats, p_len, key_pitch, key_pitchf
+                )
+                outputs[key].append(audio1[self.t_pad_tgt : -self.t_pad_tgt])
+        return {key: np.concatenate(parts) for key, parts in outputs.items()}, audio
+
+    def pipeline_segments(
+        self,
+        model,
+        net_g,
+        sid,
+        segments,
+        input_audio_path,
+        f0_up_key,
+        f0_method,
+        file_index,
+        index_rate,
+        if_f0,
+        filter_radius,
+        version,
+        protect,
+        hop_length,
+        f0autotune,
+    ):
+        """
+        Convert the (offset, audio) segments of one input. F0 and chunking run
+        on the feeding thread and feature extraction and synthesis on their
+        own, so different segments are in different stages at the same time.
+        Returns [(offset, float audio at the model rate)] in segment order.
+        """
+        index, big_npy = self.load_index(file_index, index_rate)
+        sid = torch.tensor(sid, device=self.device).unsqueeze(0).long()
+
+        def prepare():
+            for i, (_, audio) in enumerate(segments):
+                # Harvest caches F0 by path, so every segment needs its own key
+                segment_key = f"{input_audio_path}#{i}"
+                _, audio_pad, pitch, pitchf, chunks = self.prepare_chunks(
+                    audio,
+                    segment_key,
+                    f0_up_key,
+                    f0_method,
+                    if_f0,
+                    filter_radius,
+                    hop_length,
+                    f0autotune,
+                )
+                input_audio_path2wav.pop(segment_key, None)
+                for chunk in chunks:
+                    yield i, audio_pad, pitch, pitchf, chunk
+
+        def features(item):
+            i, audio_pad, pitch, pitchf, (start, end, f0_start, f0_end) = item
+            return i, self.vc_features(
+                model,
+                audio_pad[start:end],
+                pitch[:, f0_start:f0_end] if pitch is not None else None,
+                pitchf[:, f0_start:f0_end] if pitchf is not None else None,
+                index,
+                big_npy,
+                index_rate,
+                version,
+                protect,
+            )
+
+        def synthesize(item):
+            i, (feats, p_len, chunk_pitch, chunk_pitchf) = item
+            audio1 = self.vc_synthesize(
+                net_g, sid, feats, p_len, chunk_pitch, chunk_pitchf
+            )
+            return i, audio1[self.t_pad_tgt : -self.t_pad_tgt]
+
+        results, self.stage_stats = run_stages(
+            prepare(),
+            [("features", features), ("synthesis", synthesize)],
+            self.stage_queue_size,
+        )
+        for stats in self.stage_stats:
+            print(stats)
+        converted = [[] for _ in segments]
+        for i, audio1 in results:
+            converted[i].append(audio1)
+        return [
+            (offset, np.concatenate(parts))
+            for (offset, _), parts in zip(segments, converted)
+        ]
+
+    def pipeline(
+        self,
+        model,
+        net_g,
+        sid,
+        audio,
+        input_audio_path,
+        f0_up_key,
+        f0_method,
+        file_index,
+        index_rate,
+        if_f0,
+        filter_radius,
+        tgt_sr,
+        resample_sr,
+        rms_mix_rate,
+        version,
+        protect,
+        hop_length,
+        f0autotune,
+        f0_file=None,
+        precomputed_f0=None,
+        raw_output=False,
+        staged_post=False,
+    ):
+        # raw_output returns (float output at tgt_sr, high-passed 16 kHz input)
+        # and leaves RMS mixing, resampling and int16 conversion to
+        # postprocess.run_postprocess. With staged_post as well, RMS mixing and
+        # resampling stay here (in the post stage when the chunks are
+        # pipelined) and the output is at the resampled rate
+        if raw_output and not staged_post:
+            rms_mix_rate, resample_sr = 1, 0
+        index, big_npy = self.load_index(file_index, index_rate)
         inp_f0 = None
         if hasattr(f0_file, "name") == True:
             try:
@@ -520,53 +974,49 @@ class VC(object):
             except Exception as error:
                 print(error)
         sid = torch.tensor(sid, device=self.device).unsqueeze(0).long()
-        pitch, pitchf = None, None
-        if if_f0 == 1:
-            pitch, pitchf = self.get_f0(
-                input_audio_path,
+        audio, audio_pad, pitch, pitchf, chunks = self.prepare_chunks(
+            audio,
+            input_audio_path,
+            f0_up_key,
+            f0_method,
+            if_f0,
+            filter_radius,
+            hop_length,
+            f0autotune,
+            inp_f0,
+            precomputed_f0,
+        )
+        audio_opt = []
+
+        if self.pipelined and len(chunks) > 1:
+            audio_opt = self.pipeline_staged(
+                model,
+                net_g,
+                sid,
+                audio,
                 audio_pad,
-                p_len,
-                f0_up_key,
-                f0_method,
-                filter_radius,
-                hop_length,
-                f0autotune,
-                inp_f0,
+                chunks,
+                pitch,
+                pitchf,
+                index,
+                big_npy,
+                index_rate,
+                version,
+                protect,
+                tgt_sr,
+                resample_sr,
+                rms_mix_rate,
             )
-            pitch = pitch[:p_len]
-            pitchf = pitchf[:p_len]
-            if self.device == "mps":
-                pitchf = pitchf.astype(np.float32)
-            pitch = torch.tensor(pitch, device=self.device).unsqueeze(0).long()
-            pitchf = torch.tensor(pitchf, device=self.device).unsqueeze(0).float()
-        t2 = ttime()
-        for t in opt_ts:
-            t = t // self.window * self.window
-            if if_f0 == 1:
-                audio_opt.append(
-                    self.vc(
-                        model,
-                        net_g,
-                        sid,
-                        audio_pad[s : t + self.t_pad2 + self.window],
-                        pitch[:, s // self.window : (t + self.t_pad2) // self.window],
-                        pitchf[:, s // self.window : (t + self.t_pad2) // self.window],
-                        index,
-                        big_npy,
-                        index_rate,
-                        version,
-                        protect,
-                    )[self.t_pad_tgt : -self.t_pad_tgt]
-                )
-            else:
+        else:
+            for start, end, f0_start, f0_end in chunks:
                 audio_opt.append(
                     self.vc(
                         model,
                         net_g,
                         sid,
-                        audio_pad[s : t + self.t_pad2 + self.window],
-                        None,
-                        None,
+                        audio_pad[start:end],
+                        pitch[:, f0_start:f0_end] if if_f0 == 1 else None,
+                        pitchf[:, f0_start:f0_end] if if_f0 == 1 else None,
                         index,
                         big_npy,
                         index_rate,
@@ -574,52 +1024,14 @@ class VC(object):
                         protect,
                     )[self.t_pad_tgt : -self.t_pad_tgt]
                 )
-            s = t
-        if if_f0 == 1:
-            audio_opt.append(
-                self.vc(
-                    model,
-                    net_g,
-                    sid,
-                    audio_pad[t:],
-                    pitch[:, t // self.window :] if t is not None else pitch,
-                    pitchf[:, t // self.window :] if t is not None else pitchf,
-                    index,
-                    big_npy,
-                    index_rate,
-                    version,
-                    protect,
-                )[self.t_pad_tgt : -self.t_pad_tgt]
-            )
-        else:
-            audio_opt.append(
-                self.vc(
-                    model,
-                    net_g,
-                    sid,
-                    audio_pad[t:],
-                    None,
-                    None,
-                    index,
-                    big_npy,
-                    index_rate,
-                    version,
-                    protect,
-                )[self.t_pad_tgt : -self.t_pad_tgt]
-            )
-        audio_opt = np.concatenate(audio_opt)
-        if rms_mix_rate != 1:
-            audio_opt = change_rms(audio, 16000, audio_opt, tgt_sr, rms_mix_rate)
-        if resample_sr >= 16000 and tgt_sr != resample_sr:
-            audio_opt = librosa.resample(
-                audio_opt, orig_sr=tgt_sr, target_sr=resample_sr
-            )
-        audio_max = np.abs(audio_opt).max() / 0.99
-        max_int16 = 32768
-        if audio_max > 1:
-            max_int16 /= audio_max
-        audio_opt = (audio_opt * max_int16).astype(np.int16)
+            audio_opt = np.concatenate(audio_opt)
+            if rms_mix_rate != 1:
+                audio_opt = mix_rms(audio, 16000, audio_opt, tgt_sr, rms_mix_rate)
+            if resample_sr >= 16000 and tgt_sr != resample_sr:
+                audio_opt = resample(audio_opt, tgt_sr, resample_sr)
         del pitch, pitchf, sid
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
-        return audio_opt
+        if raw_output:
+            return audio_opt, audio
+        return to_int16(audio_opt)
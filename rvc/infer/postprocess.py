@@ -0,0 +1,239 @@
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+import soundfile as sf
+
+# Formats libsndfile cannot write are piped through ffmpeg
+FFMPEG_CODECS = {"M4A": ["-c:a", "aac", "-b:a", "192k"]}
+RMS_BLOCK = 1 << 20
+
+
+def _interpolate(envelope, size, start, end):
+    # Same sample positions as F.interpolate(mode="linear", align_corners=False),
+    # evaluated for output samples [start, end) only
+    positions = (np.arange(start, end, dtype=np.float64) + 0.5) * (
+        len(envelope) / size
+    ) - 0.5
+    return np.interp(positions, np.arange(len(envelope)), envelope).astype(np.float32)
+
+
+def frame_rms(y, frame_length, hop_length, block=RMS_BLOCK):
+    """
+    librosa.feature.rms(y=y, frame_length=..., hop_length=...)[0] (centred,
+    zero padded) from per-hop sums of squares, so the frames are never
+    materialised. frame_length must be a multiple of hop_length.
+    """
+    k = frame_length // hop_length
+    pad = frame_length // 2
+    n_frames = 1 + (len(y) + 2 * pad - frame_length) // hop_length
+    n_hops = n_frames + k - 1
+    sums = np.empty(n_hops)
+    step = max(1, block // hop_length)
+    for first in range(0, n_hops, step):
+        last = min(first + step, n_hops)
+        # Hops [first, last) of the padded signal, as a range of y
+        lo, hi = first * hop_length - pad, last * hop_length - pad
+        part = np.zeros((last - first) * hop_length, dtype=np.float32)
+        src_lo, src_hi = max(lo, 0), min(hi, len(y))
+        if src_hi > src_lo:
+            part[src_lo - lo : src_hi - lo] = y[src_lo:src_hi]
+        sums[first:last] = np.square(part).reshape(-1, hop_length).sum(axis=1)
+    power = np.convolve(sums, np.ones(k), mode="valid") / frame_length
+    return np.sqrt(np.maximum(power, 0)).astype(np.float32)
+
+
+def mix_rms(source, source_sr, audio, sr, rate, block=RMS_BLOCK):
+    """Blend audio's loudness envelope towards source's, in place and block by block."""
+    rms1 = frame_rms(source, source_sr // 2 * 2, source_sr // 2)
+    rms2 = frame_rms(audio, sr // 2 * 2, sr // 2)
+    for start in range(0, len(audio), block):
+        end = min(start + block, len(audio))
+        gain = np.power(_interpolate(rms1, len(audio), start, end), 1 - rate)
+        gain *= np.power(
+            np.maximum(_interpolate(rms2, len(audio), start, end), 1e-6), rate - 1
+        )
+        audio[start:end] *= gain
+    return audio
+
+
+def resample(audio, orig_sr, target_sr):
+    # librosa is only needed when the output rate differs from the model's
+    import librosa
+
+    return librosa.resample(audio, orig_sr=orig_sr, target_sr=target_sr)
+
+
+def to_int16(audio):
+    # Scale down only when the peak would clip, as the pipeline always has
+    audio_max = np.abs(audio).max() / 0.99
+    max_int16 = 32768
+    if audio_max > 1:
+        max_int16 /= audio_max
+    audio *= max_int16
+    return audio.astype(np.int16)
+
+
+class PeakGuard:
+    """
+    Streaming counterpart of to_int16 for output that is written block by
+    block: the gain only ever drops, ramped over `ramp` samples, so a late
+    peak cannot clip and earlier blocks never need rewriting.
+    """
+
+    def __init__(self, ramp):
+        self.ramp = ramp
+        self.gain = 1.0
+
+    def __call__(self, audio):
+        peak = np.abs(audio).max() * self.gain if len(audio) else 0.0
+        if peak > 0.99:
+            target = self.gain * 0.99 / peak
+            gains = np.full(len(audio), target, dtype=np.float32)
+            n = min(self.ramp, len(audio))
+            gains[:n] = np.linspace(self.gain, target, n)
+            audio *= gains
+            self.gain = target
+        else:
+            audio *= self.gain
+        return (np.clip(audio, -1, 32767 / 32768) * 32768).astype(np.int16)
+
+
+class StreamEncoder:
+    """Appends int16 blocks to output_path in export_format."""
+
+    def __init__(self, output_path, sr, export_format):
+        export_format = export_format.upper()
+        self.file = self.process = None
+        if export_format in FFMPEG_CODECS:
+            command = ["ffmpeg", "-y", "-loglevel", "error"]
+            command += ["-f", "s16le", "-ar", str(sr), "-ac", "1", "-i", "pipe:0"]
+            command += FFMPEG_CODECS[export_format] + [output_path]
+            self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        else:
+            self.file = sf.SoundFile(
+                output_path, "w", samplerate=sr, channels=1, format=export_format
+            )
+
+    def write(self, audio):
+        if self.process is not None:
+            self.process.stdin.write(audio.tobytes())
+        else:
+            self.file.write(audio)
+
+    def close(self):
+        if self.process is not None:
+            self.process.stdin.close()
+            if self.process.wait() != 0:
+                raise RuntimeError(f"ffmpeg exited with code {self.process.returncode}")
+        else:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def encode(audio, sr, output_path, export_format):
+    with StreamEncoder(output_path, sr, export_format) as encoder:
+        encoder.write(audio)
+    return output_path
+
+
+class StageReport:
+    def __init__(self, name, seconds, peak_bytes):
+        self.name = name
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+
+    def __str__(self):
+        text = f"Post-process {self.name}: {self.seconds * 1000:.0f} ms"
+        if self.peak_bytes is not None:
+            text += f", peak {self.peak_bytes / 2**20:.1f} MiB"
+        return text
+
+
+def run_postprocess(
+    audio,
+    sr,
+    source=None,
+    source_sr=16000,
+    rms_mix_rate=1,
+    resample_sr=0,
+    clean_strength=None,
+    output_path=None,
+    export_format="WAV",
+    normalize=True,
+    verbose=True,
+    profile=False,
+):
+    """
+    Take raw float synthesizer output through RMS mixing, resampling, noise
+    reduction, peak normalization and encoding, each applied once to the
+    in-memory array. Returns (sr, int16 audio, [StageReport]); with
+    normalize=False it stops before int16 conversion and returns float audio.
+    Stages are always timed; profile=True also measures each stage's peak
+    memory with tracemalloc, which slows every allocation while it runs.
+    """
+    stages = []
+    if source is not None and rms_mix_rate != 1:
+        stages.append(
+            ("rms_mix", lambda x: mix_rms(source, source_sr, x, sr, rms_mix_rate))
+        )
+    out_sr = resample_sr if resample_sr >= 16000 and resample_sr != sr else sr
+    if out_sr != sr:
+        stages.append(("resample", lambda x: resample(x, sr, out_sr)))
+    if clean_strength is not None:
+        import noisereduce as nr
+
+        stages.append(
+            (
+                "denoise",
+                lambda x: nr.reduce_noise(
+                    y=x, sr=out_sr, prop_decrease=clean_strength
+                ).astype(np.float32, copy=False),
+            )
+        )
+    if normalize:
+        stages.append(("normalize", to_int16))
+    if normalize and output_path is not None:
+
+        def encode_stage(x):
+            encode(x, out_sr, output_path, export_format)
+            return x
+
+        stages.append(("encode", encode_stage))
+
+    if audio.dtype == np.int16:
+        audio = audio.astype(np.float32) / 32768
+    else:
+        audio = audio.astype(np.float32, copy=False)
+
+    # tracemalloc sees numpy's buffers, so its peak is the extra memory a stage
+    # needed on top of what was already allocated when it started
+    tracing = tracemalloc.is_tracing()
+    if profile and not tracing:
+        tracemalloc.start()
+    reports = []
+    try:
+        for name, fn in stages:
+            if profile:
+                tracemalloc.reset_peak()
+                base, _ = tracemalloc.get_traced_memory()
+            start = time.perf_counter()
+            audio = fn(audio)
+            elapsed = time.perf_counter() - start
+            peak_bytes = None
+            if profile:
+                peak_bytes = tracemalloc.get_traced_memory()[1] - base
+            reports.append(StageReport(name, elapsed, peak_bytes))
+    finally:
+        if profile and not tracing:
+            tracemalloc.stop()
+    if verbose:
+        for report in reports:
+            print(report)
+    return out_sr, audio, reports
@@ -0,0 +1,251 @@
+import os
+import re
+import time
+import threading
+
+import numpy as np
+import torch
+
+# One instance of each F0 estimator per (method, device, precision, options)
+# and process, shared by every VC instance, extraction worker and thread in
+# it. Models are loaded on first use, or up front by warm_up().
+MODEL_METHODS = ("rmvpe", "fcpe", "crepe", "crepe-tiny")
+WARMUP_ENV = "RVC_F0_WARMUP"
+
+_models = {}
+_load_seconds = {}
+_warmed = set()
+_lock = threading.RLock()
+# torchcrepe keeps the model it runs in attributes of torchcrepe.infer, so
+# concurrent predictions with different capacities must not interleave
+_crepe_lock = threading.Lock()
+
+CREPE_DECODERS = ("viterbi", "weighted_argmax", "argmax")
+CREPE_WINDOW = 1024
+# Peak activation memory per frame in an inference batch (the first
+# convolution, its batch norm and pooling dominate), with some headroom
+CREPE_FRAME_BYTES = {"full": 4 << 20, "tiny": 1 << 19}
+CREPE_MAX_BATCH = 4096
+
+
+def _load_rmvpe(device, is_half):
+    from rvc.lib.rmvpe import RMVPE
+
+    return RMVPE("rmvpe.pt", is_half=is_half, device=device)
+
+
+def _load_fcpe(device, is_half, sr, f0_min, f0_max, threshold):
+    from rvc.lib.FCPEF0Predictor import FCPEF0Predictor
+
+    return FCPEF0Predictor(
+        "fcpe.pt",
+        f0_min=int(f0_min),
+        f0_max=int(f0_max),
+        dtype=torch.float32,
+        device=device,
+        sampling_rate=sr,
+        threshold=threshold,
+    )
+
+
+def _load_crepe(device, is_half, capacity):
+    import torchcrepe
+
+    torchcrepe.load.model(device, capacity)
+    return torchcrepe.infer.model
+
+
+LOADERS = {"rmvpe": _load_rmvpe, "fcpe": _load_fcpe, "crepe": _load_crepe}
+
+
+def get(name, device, is_half=False, **options):
+    """The process-wide estimator for these arguments, loading it on first use."""
+    key = (name, str(device), bool(is_half), tuple(sorted(options.items())))
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                start = time.perf_counter()
+                model = LOADERS[name](str(device), bool(is_half), **options)
+                _load_seconds[key] = time.perf_counter() - start
+                _models[key] = model
+    return model
+
+
+def rmvpe(device, is_half=False):
+    return get("rmvpe", device, is_half)
+
+
+def fcpe(device, sr=16000, f0_min=50, f0_max=1100, threshold=0.03):
+    return get(
+        "fcpe",
+        device,
+        sr=sr,
+        f0_min=int(f0_min),
+        f0_max=int(f0_max),
+        threshold=threshold,
+    )
+
+
+def crepe_predict(audio, sr, hop_length, f0_min, f0_max, model="full", **kwargs):
+    """torchcrepe.predict with the registry's model for this capacity and device."""
+    import torchcrepe
+
+    device = kwargs.get("device", "cpu")
+    network = get("crepe", device, capacity=model)
+    with _crepe_lock:
+        torchcrepe.infer.model = network
+        torchcrepe.infer.capacity = model
+        return torchcrepe.predict(
+            audio, sr, hop_length, f0_min, f0_max, model, **kwargs
+        )
+
+
+def available_memory(device):
+    """Free bytes on device: CUDA free memory, else the host's MemAvailable."""
+    if str(device).startswith("cuda"):
+        return torch.cuda.mem_get_info(torch.device(device))[0]
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return 1 << 30
+
+
+def crepe_batch_size(device, model="full", fraction=0.25):
+    """CREPE frames per batch that fit in fraction of the device's free memory."""
+    frames = int(available_memory(device) * fraction) // CREPE_FRAME_BYTES[model]
+    return max(64, min(CREPE_MAX_BATCH, frames))
+
+
+def crepe_infer(
+    audio,
+    hop_length,
+    f0_min,
+    f0_max,
+    model="full",
+    device="cpu",
+    batch_size=0,
+    decoder="viterbi",
+    silence_threshold=0.0,
+    return_periodicity=False,
+):
+    """
+    torchcrepe.predict(..., pad=True) for 16 kHz audio, framed and batched
+    here instead: batch_size frames per network call (0 picks it from free
+    memory), frames whose RMS is at most silence_threshold skipped with pitch
+    and periodicity 0, and decoder one of CREPE_DECODERS, applied per batch
+    as torchcrepe does. Returns (1, frames) tensors on device.
+    """
+    import torchcrepe
+
+    network = get("crepe", device, capacity=model)
+    batch_size = batch_size or crepe_batch_size(device, model)
+    decode = getattr(torchcrepe.decode, decoder)
+    audio = torch.as_tensor(audio, dtype=torch.float32).reshape(-1).to(device)
+    padded = torch.nn.functional.pad(audio, (CREPE_WINDOW // 2, CREPE_WINDOW // 2))
+    # A view: frames are only copied a batch at a time
+    frames = padded.unfold(0, CREPE_WINDOW, hop_length)
+    pitch = torch.zeros(frames.shape[0], device=device)
+    periodicity = torch.zeros(frames.shape[0], device=device)
+    with torch.no_grad():
+        for start in range(0, frames.shape[0], batch_size):
+            batch = frames[start : start + batch_size]
+            index = torch.arange(start, start + batch.shape[0], device=device)
+            if silence_threshold > 0:
+                voiced = batch.square().mean(dim=1).sqrt() > silence_threshold
+                batch, index = batch[voiced], index[voiced]
+                if index.numel() == 0:
+                    continue
+            batch = batch - batch.mean(dim=1, keepdim=True)
+            batch = batch / batch.std(dim=1, keepdim=True).clamp(min=1e-10)
+            probabilities = network(batch, embed=False)
+            probabilities = probabilities.reshape(1, -1, torchcrepe.PITCH_BINS)
+            result = torchcrepe.postprocess(
+                probabilities.transpose(1, 2),
+                f0_min,
+                f0_max,
+                decode,
+                return_periodicity=return_periodicity,
+            )
+            if return_periodicity:
+                result, batch_periodicity = result
+                periodicity[index] = batch_periodicity[0].to(periodicity.dtype)
+            pitch[index] = result[0].to(pitch.dtype)
+    if return_periodicity:
+        return pitch[None], periodicity[None]
+    return pitch[None]
+
+
+def model_methods(f0_method):
+    """The model-based estimators f0_method uses ("hybrid[rmvpe+pm]" -> ["rmvpe"])."""
+    match = re.search(r"hybrid\[(.+)\]", f0_method)
+    methods = match.group(1).split("+") if match else [f0_method]
+    return [m.strip() for m in methods if m.strip() in MODEL_METHODS]
+
+
+def loaded():
+    """{(name, device, is_half, options): load seconds} for every model loaded so far."""
+    return dict(_load_seconds)
+
+
+def warm_up(methods, device, is_half=False, sr=16000, seconds=1.0, verbose=True):
+    """
+    Load each model-based estimator in methods and run it once on silence, so
+    the first real request pays neither the load nor first-call kernel
+    selection. Methods already warmed in this process are skipped. Returns
+    {method: {"load_s": ..., "first_run_s": ...}}.
+    """
+    silence = np.zeros(int(sr * seconds), dtype=np.float32)
+    report = {}
+    for method in dict.fromkeys(m for f in methods for m in model_methods(f)):
+        if (method, str(device), bool(is_half)) in _warmed:
+            continue
+        start = time.perf_counter()
+        if method == "rmvpe":
+            model = rmvpe(device, is_half)
+            loaded_at = time.perf_counter()
+            model.infer_from_audio(silence, thred=0.03)
+        elif method == "fcpe":
+            model = fcpe(device, sr)
+            loaded_at = time.perf_counter()
+            model.compute_f0(silence, p_len=len(silence) // 160)
+        else:
+            capacity = "tiny" if method == "crepe-tiny" else "full"
+            get("crepe", device, capacity=capacity)
+            loaded_at = time.perf_counter()
+            crepe_predict(
+                torch.from_numpy(silence)[None],
+                sr,
+                160,
+                50,
+                1100,
+                capacity,
+                batch_size=512,
+                device=device,
+                pad=True,
+            )
+        if str(device).startswith("cuda"):
+            torch.cuda.synchronize()
+        done = time.perf_counter()
+        _warmed.add((method, str(device), bool(is_half)))
+        report[method] = {"load_s": loaded_at - start, "first_run_s": done - loaded_at}
+        if verbose:
+            print(
+                f"F0 warm-up {method} on {device}: load {loaded_at - start:.2f} s, "
+                f"first run {done - loaded_at:.2f} s"
+            )
+    return report
+
+
+def warm_up_from_env(device, is_half=False):
+    """warm_up() for the comma-separated methods in RVC_F0_WARMUP, if it is set."""
+    methods = [m for m in os.environ.get(WARMUP_ENV, "").split(",") if m.strip()]
+    return warm_up(methods, device, is_half) if methods else {}
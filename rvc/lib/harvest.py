@@ -0,0 +1,150 @@
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# pyworld.harvest runs on one core. Long signals are cut into segments at the
+# quietest hop near each boundary, every segment is analysed with a margin of
+# context on both sides in a process pool, and only its own frames are kept,
+# so the merged contour lines up frame for frame with a single pass.
+MIN_SEGMENT_SECONDS = 5.0
+MARGIN_SECONDS = 1.0
+SEARCH_SECONDS = 1.0
+
+_pool = None
+_pool_workers = 0
+
+
+def harvest(x, fs, f0_min, f0_max, frame_period):
+    """pyworld.harvest refined by pyworld.stonemask, over the whole of x."""
+    import pyworld
+
+    x = np.ascontiguousarray(x, dtype=np.double)
+    f0, t = pyworld.harvest(
+        x, fs=fs, f0_ceil=f0_max, f0_floor=f0_min, frame_period=frame_period
+    )
+    return pyworld.stonemask(x, f0, t, fs)
+
+
+def frame_count(n_samples, fs, frame_period):
+    """Frames harvest returns for n_samples (WORLD's GetSamplesForHarvest)."""
+    return int(1000.0 * n_samples / fs / frame_period) + 1
+
+
+def segment_frames(x, hop, n_frames, segment_hops, search_hops):
+    """
+    [(first, end), ...] frame ranges covering n_frames, each about segment_hops
+    long and starting at the lowest-energy hop within search_hops of its
+    nominal start.
+    """
+    n_hops = len(x) // hop
+    energy = np.square(x[: n_hops * hop], dtype=np.float64).reshape(-1, hop).sum(1)
+    cuts = [0]
+    while cuts[-1] + segment_hops + segment_hops // 2 < n_hops:
+        lo = cuts[-1] + segment_hops - search_hops
+        hi = min(n_hops, cuts[-1] + segment_hops + search_hops)
+        cuts.append(lo + int(np.argmin(energy[lo:hi])))
+    return list(zip(cuts, cuts[1:] + [n_frames]))
+
+
+def _harvest_segment(x, fs, f0_min, f0_max, frame_period, offset, first, count):
+    # x starts at frame offset of the full signal; frames [first, first +
+    # count) of the full signal are returned
+    f0 = harvest(x, fs, f0_min, f0_max, frame_period)
+    return f0[first - offset : first - offset + count]
+
+
+def get_pool(workers):
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown()
+        # The caller has usually started torch, CUDA and thread pools by now,
+        # and forking such a process can deadlock. Forkserver workers are
+        # forked from a clean server instead. Like spawn, they import the
+        # calling script under its __main__ guard when the pool starts
+        # (Python versions that honour the __main__ preload do it once in the
+        # server); the pool then lives as long as the process
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(["__main__", __name__])
+        else:
+            context = multiprocessing.get_context("spawn")
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        _pool_workers = workers
+    return _pool
+
+
+def segmented_harvest(
+    x,
+    fs,
+    f0_min,
+    f0_max,
+    frame_period=10,
+    workers=0,
+    segment_seconds=None,
+    margin_seconds=MARGIN_SECONDS,
+):
+    """
+    harvest() split across workers processes (0 = one per CPU). Segments are
+    segment_seconds long, by default the signal divided evenly between the
+    workers but at least MIN_SEGMENT_SECONDS; short signals, a single worker
+    or a frame period that is not a whole number of samples run in one pass,
+    as do daemonic processes (Celery's prefork workers), which cannot fork.
+    """
+    x = np.asarray(x, dtype=np.double)
+    workers = workers or multiprocessing.cpu_count()
+    hop = fs * frame_period / 1000
+    duration = len(x) / fs
+    if (
+        workers <= 1
+        or multiprocessing.current_process().daemon
+        or hop != int(hop)
+        or duration < 2 * max(MIN_SEGMENT_SECONDS, segment_seconds or 0)
+    ):
+        return harvest(x, fs, f0_min, f0_max, frame_period)
+
+    hop = int(hop)
+    hops_per_second = fs / hop
+    segment_seconds = segment_seconds or max(MIN_SEGMENT_SECONDS, duration / workers)
+    segment_hops = int(segment_seconds * hops_per_second)
+    search_hops = min(int(SEARCH_SECONDS * hops_per_second), segment_hops // 4)
+    margin_hops = max(1, math.ceil(margin_seconds * hops_per_second))
+    n_frames = frame_count(len(x), fs, frame_period)
+
+    pool = get_pool(workers)
+    futures = []
+    for first, end in segment_frames(x, hop, n_frames, segment_hops, search_hops):
+        offset = max(0, first - margin_hops)
+        stop = min(len(x), (end + margin_hops) * hop)
+        futures.append(
+            pool.submit(
+                _harvest_segment,
+                x[offset * hop : stop],
+                fs,
+                f0_min,
+                f0_max,
+                frame_period,
+                offset,
+                first,
+                end - first,
+            )
+        )
+    return np.concatenate([future.result() for future in futures])
+
+
+def compare(reference, candidate):
+    """
+    Agreement of two F0 contours: the share of frames voiced in only one of
+    them, and the largest and 99th percentile difference in cents over frames
+    voiced in both.
+    """
+    voiced = (reference > 0) & (candidate > 0)
+    cents = 1200 * np.abs(np.log2(candidate[voiced] / reference[voiced]))
+    return {
+        "frames": len(reference),
+        "voicing_mismatch": float(np.mean((reference > 0) != (candidate > 0))),
+        "max_cents": float(cents.max()) if cents.size else 0.0,
+        "p99_cents": float(np.percentile(cents, 99)) if cents.size else 0.0,
+    }
@@ -0,0 +1,250 @@
+import os
+import sys
+import json
+
+import torch
+import torch.nn.functional as F
+from torch import nn
+
+# HuBERT Base as fairseq builds it for hubert_base.pt: a 7-layer conv feature
+# extractor, a convolutional position embedding and 12 post-norm transformer
+# layers. Only the inference path RVC uses (output layer 9 or 12, plus
+# final_proj for v1 models) is implemented; masking, dropout and the
+# pre-training heads are left out.
+CONV_LAYERS = [(512, 10, 5)] + [(512, 3, 2)] * 4 + [(512, 2, 2)] * 2
+DEFAULT_CONFIG = {
+    "embed_dim": 768,
+    "ffn_dim": 3072,
+    "num_heads": 12,
+    "num_layers": 12,
+    "final_dim": 256,
+    "pos_conv_kernel": 128,
+    "pos_conv_groups": 16,
+    "normalize": False,
+}
+FORMAT_VERSION = "1"
+
+
+def converted_path(hubert_path="hubert_base.pt"):
+    return f"{os.path.splitext(hubert_path)[0]}.safetensors"
+
+
+class FeatureExtractor(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.conv_layers = nn.ModuleList()
+        in_channels = 1
+        for channels, kernel, stride in CONV_LAYERS:
+            self.conv_layers.append(
+                nn.Conv1d(in_channels, channels, kernel, stride=stride, bias=False)
+            )
+            in_channels = channels
+        self.group_norm = nn.GroupNorm(512, 512)
+
+    def forward(self, x):
+        x = self.conv_layers[0](x.unsqueeze(1))
+        # fairseq's Fp32GroupNorm: normalize in fp32 even for half models
+        x = F.group_norm(
+            x.float(),
+            self.group_norm.num_groups,
+            self.group_norm.weight.float(),
+            self.group_norm.bias.float(),
+            self.group_norm.eps,
+        ).type_as(x)
+        x = F.gelu(x)
+        for conv in self.conv_layers[1:]:
+            x = F.gelu(conv(x))
+        return x
+
+
+class SelfAttention(nn.Module):
+    def __init__(self, embed_dim, num_heads):
+        super().__init__()
+        self.num_heads = num_heads
+        self.k_proj = nn.Linear(embed_dim, embed_dim)
+        self.v_proj = nn.Linear(embed_dim, embed_dim)
+        self.q_proj = nn.Linear(embed_dim, embed_dim)
+        self.out_proj = nn.Linear(embed_dim, embed_dim)
+
+    def forward(self, x):
+        batch, length, dim = x.shape
+        shape = (batch, length, self.num_heads, dim // self.num_heads)
+        q = self.q_proj(x).view(shape).transpose(1, 2)
+        k = self.k_proj(x).view(shape).transpose(1, 2)
+        v = self.v_proj(x).view(shape).transpose(1, 2)
+        x = F.scaled_dot_product_attention(q, k, v)
+        return self.out_proj(x.transpose(1, 2).reshape(batch, length, dim))
+
+
+class EncoderLayer(nn.Module):
+    def __init__(self, embed_dim, ffn_dim, num_heads):
+        super().__init__()
+        self.self_attn = SelfAttention(embed_dim, num_heads)
+        self.self_attn_layer_norm = nn.LayerNorm(embed_dim)
+        self.fc1 = nn.Linear(embed_dim, ffn_dim)
+        self.fc2 = nn.Linear(ffn_dim, embed_dim)
+        self.final_layer_norm = nn.LayerNorm(embed_dim)
+
+    def forward(self, x):
+        x = self.self_attn_layer_norm(x + self.self_attn(x))
+        # fairseq evaluates the feed-forward GELU in fp32
+        hidden = F.gelu(self.fc1(x).float()).type_as(x)
+        return self.final_layer_norm(x + self.fc2(hidden))
+
+
+class HubertFeatureExtractor(nn.Module):
+    """
+    Drop-in for the fairseq HubertModel in inference: extract_features and
+    final_proj take and return the same tensors, so VC.vc, the ONNX exporter
+    and dynamic quantization work on either.
+    """
+
+    def __init__(self, config=None, num_layers=None):
+        super().__init__()
+        config = {**DEFAULT_CONFIG, **(config or {})}
+        embed_dim = config["embed_dim"]
+        self.config = config
+        self.normalize = config["normalize"]
+        self.feature_extractor = FeatureExtractor()
+        self.layer_norm = nn.LayerNorm(512)
+        self.post_extract_proj = nn.Linear(512, embed_dim)
+        self.pos_conv = nn.Conv1d(
+            embed_dim,
+            embed_dim,
+            config["pos_conv_kernel"],
+            padding=config["pos_conv_kernel"] // 2,
+            groups=config["pos_conv_groups"],
+        )
+        self.encoder_layer_norm = nn.LayerNorm(embed_dim)
+        self.layers = nn.ModuleList(
+            EncoderLayer(embed_dim, config["ffn_dim"], config["num_heads"])
+            for _ in range(num_layers or config["num_layers"])
+        )
+        self.final_proj = nn.Linear(embed_dim, config["final_dim"])
+
+    def extract_features(self, source, padding_mask=None, output_layer=None):
+        # padding_mask is accepted for signature compatibility; RVC always
+        # passes an all-False mask, which fairseq treats as no padding
+        if output_layer is not None and output_layer > len(self.layers):
+            raise ValueError(
+                f"Output layer {output_layer} requested, but only "
+                f"{len(self.layers)} layers were loaded"
+            )
+        x = self.feature_extractor(source).transpose(1, 2)
+        x = self.post_extract_proj(self.layer_norm(x))
+        x_conv = self.pos_conv(x.transpose(1, 2))
+        # SamePad: an even kernel yields one frame too many
+        if self.pos_conv.kernel_size[0] % 2 == 0:
+            x_conv = x_conv[:, :, :-1]
+        x = self.encoder_layer_norm(x + F.gelu(x_conv.transpose(1, 2)))
+        for layer in self.layers[:output_layer]:
+            x = layer(x)
+        return x, None
+
+
+def fairseq_state_dict(checkpoint):
+    """Rename a fairseq HuBERT state dict to this module's keys, folding weight norm."""
+    renamed = {}
+    for key, value in checkpoint.items():
+        if key.startswith("feature_extractor.conv_layers."):
+            index, sub, name = key.split(".")[2:5]
+            if sub == "0":
+                renamed[f"feature_extractor.conv_layers.{index}.{name}"] = value
+            else:
+                renamed[f"feature_extractor.group_norm.{name}"] = value
+        elif key.startswith("encoder.layers."):
+            renamed[key[len("encoder.") :]] = value
+        elif key.startswith("encoder.layer_norm."):
+            renamed["encoder_" + key[len("encoder.") :]] = value
+        elif key.startswith(("layer_norm.", "post_extract_proj.", "final_proj.")):
+            renamed[key] = value
+        elif key == "encoder.pos_conv.0.bias":
+            renamed["pos_conv.bias"] = value
+
+    # weight_norm(dim=2) on the position conv, saved as g/v by older torch
+    # and as parametrizations by newer; the product is all inference needs
+    g = checkpoint.get(
+        "encoder.pos_conv.0.weight_g",
+        checkpoint.get("encoder.pos_conv.0.parametrizations.weight.original0"),
+    )
+    v = checkpoint.get(
+        "encoder.pos_conv.0.weight_v",
+        checkpoint.get("encoder.pos_conv.0.parametrizations.weight.original1"),
+    )
+    if g is not None:
+        norm = v.float().pow(2).sum(dim=(0, 1), keepdim=True).sqrt()
+        renamed["pos_conv.weight"] = (g.float() * v.float() / norm).to(v.dtype)
+    else:
+        renamed["pos_conv.weight"] = checkpoint["encoder.pos_conv.0.weight"]
+    return renamed
+
+
+def checkpoint_normalize(checkpoint):
+    # Whether the model expects layer-normalized waveforms: task.normalize in
+    # hydra-era checkpoints (cfg), a plain attribute in older ones (args)
+    cfg = checkpoint.get("cfg")
+    if cfg is not None and cfg.get("task") is not None:
+        return bool(cfg["task"].get("normalize", False))
+    return bool(getattr(checkpoint.get("args"), "normalize", False))
+
+
+def convert(hubert_path="hubert_base.pt", output_path=None):
+    """
+    Write the weights extract_features needs from a fairseq checkpoint to a
+    safetensors file. The checkpoint is only unpickled here, once.
+    """
+    from safetensors.torch import save_file
+
+    output_path = output_path or converted_path(hubert_path)
+    checkpoint = torch.load(hubert_path, map_location="cpu", weights_only=False)
+    state_dict = fairseq_state_dict(checkpoint["model"])
+    config = {
+        **DEFAULT_CONFIG,
+        "num_layers": 1
+        + max(int(k.split(".")[1]) for k in state_dict if k.startswith("layers.")),
+        "final_dim": state_dict["final_proj.weight"].shape[0],
+        "normalize": checkpoint_normalize(checkpoint),
+    }
+    # Dtypes are kept as saved; load_hubert casts to the runtime precision
+    # Feature extraction runs several processes that may all convert at once
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    save_file(
+        {k: v.contiguous() for k, v in state_dict.items()},
+        tmp_path,
+        metadata={
+            "format": "rvc-hubert",
+            "version": FORMAT_VERSION,
+            "config": json.dumps(config),
+        },
+    )
+    os.replace(tmp_path, output_path)
+    print(f"Converted {hubert_path} to {output_path}")
+    return output_path
+
+
+def load_hubert(path, device="cpu", is_half=False, num_layers=None):
+    """
+    Build the extractor from a converted file. The file is memory-mapped and
+    only the first num_layers transformer layers are read (all when None).
+    """
+    from rvc.lib.model_io import map_safetensors
+
+    metadata, tensors = map_safetensors(path)
+    if metadata.get("format") != "rvc-hubert":
+        raise ValueError(f"{path} is not a converted HuBERT model")
+    config = json.loads(metadata["config"])
+    num_layers = min(num_layers or config["num_layers"], config["num_layers"])
+    with torch.device("meta"):
+        model = HubertFeatureExtractor(config, num_layers)
+    keep = set(model.state_dict())
+    state_dict = {k: v for k, v in tensors.items() if k in keep}
+    model.load_state_dict(state_dict, assign=True)
+    model = model.half() if is_half else model.float()
+    return model.to(device).eval()
+
+
+if __name__ == "__main__":
+    convert(
+        hubert_path=sys.argv[1] if len(sys.argv) > 1 else "hubert_base.pt",
+        output_path=sys.argv[2] if len(sys.argv) > 2 else None,
+    )
@@ -0,0 +1,146 @@
+import os
+import re
+import json
+
+from rvc.lib.model_io import is_safetensors, read_metadata
+
+# Metadata of every voice model under the model roots, cached on disk and
+# revalidated per file by (mtime, size), so listing a directory of models
+# costs a stat per file instead of a torch.load per file.
+CATALOG_PATH = os.environ.get(
+    "RVC_MODEL_CATALOG", os.path.join("logs", "model_catalog.json")
+)
+# Directories searched for voice models (os.pathsep-separated); the API
+# only lists models under these
+DEFAULT_ROOTS = os.environ.get("RVC_MODEL_ROOTS", "logs").split(os.pathsep)
+MODEL_EXTENSIONS = (".pth", ".safetensors")
+FIELDS = (
+    "epoch",
+    "step",
+    "sr",
+    "f0",
+    "version",
+    "creation_date",
+    "model_hash",
+    "info",
+)
+# Training checkpoints (G_/D_) and preprocessing outputs (0_gt_wavs,
+# 1_16k_wavs, 2a_f0, 3_feature768, ...) are never voice models
+TRAINING_CHECKPOINT = re.compile(r"^[GD]_\d+\.pth$")
+DATASET_DIR = re.compile(r"^\d[a-z]?[_-]")
+
+
+def read_model_metadata(path):
+    """The catalog fields of one voice model, without reading its weights."""
+    if is_safetensors(path):
+        metadata = read_metadata(path)
+    else:
+        import torch
+
+        try:
+            # Zip-format checkpoints are mapped, so only the pickle is read
+            cpt = torch.load(path, map_location="cpu", mmap=True)
+        except RuntimeError:
+            # Legacy (pre-zip) serialization cannot be mapped
+            cpt = torch.load(path, map_location="cpu")
+        metadata = {k: v for k, v in cpt.items() if k != "weight"}
+    if "config" not in metadata:
+        raise ValueError(f"{path} is not a voice model")
+    entry = {field: metadata.get(field) for field in FIELDS}
+    entry["tgt_sr"] = metadata["config"][-1]
+    return entry
+
+
+class ModelCatalog:
+    def __init__(self, path=CATALOG_PATH):
+        self.path = path
+        self.dirty = False
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, indent=2, default=str)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def get(self, path):
+        """The entry for path, re-read only if the file changed since it was cached."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        entry = self.entries.get(path)
+        if (
+            entry is not None
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        ):
+            return entry
+        entry = {
+            "name": os.path.splitext(os.path.basename(path))[0],
+            "path": path,
+            "format": "safetensors" if is_safetensors(path) else "pth",
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+        }
+        try:
+            entry.update(read_model_metadata(path))
+        except Exception as error:
+            # Cached too, so a broken or foreign file is not re-read every time
+            entry["error"] = str(error)
+        self.entries[path] = entry
+        self.dirty = True
+        return entry
+
+    def scan(self, roots):
+        for root in roots:
+            for directory, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if not DATASET_DIR.match(d)]
+                for filename in filenames:
+                    if filename.lower().endswith(
+                        MODEL_EXTENSIONS
+                    ) and not TRAINING_CHECKPOINT.match(filename):
+                        yield os.path.join(directory, filename)
+
+    def refresh(self, roots=DEFAULT_ROOTS):
+        """Bring the catalog up to date with the model files under roots."""
+        roots = [os.path.abspath(root) for root in roots]
+        seen = set()
+        for path in self.scan(roots):
+            try:
+                seen.add(self.get(path)["path"])
+            except FileNotFoundError:
+                continue
+        for path in list(self.entries):
+            if path not in seen and any(
+                path.startswith(root + os.sep) for root in roots
+            ):
+                del self.entries[path]
+                self.dirty = True
+        self.save()
+        return [self.entries[path] for path in sorted(seen)]
+
+    def search(self, query="", roots=DEFAULT_ROOTS, version=None, sr=None, f0=None):
+        """Voice models under roots whose name, path or info contains query."""
+        query = query.lower()
+        results = []
+        for entry in self.refresh(roots):
+            if "error" in entry:
+                continue
+            text = f"{entry['name']} {entry['path']} {entry.get('info') or ''}"
+            if query and query not in text.lower():
+                continue
+            if version and entry["version"] != version:
+                continue
+            if sr and str(sr) not in (str(entry["sr"]), str(entry["tgt_sr"])):
+                continue
+            if f0 is not None and int(entry["f0"] or 0) != int(f0):
+                continue
+            results.append(entry)
+        return results
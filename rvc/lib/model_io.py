@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+import math
+import struct
+
+import torch
+
+# Voice models are either pickled .pth checkpoints or safetensors files with
+# the same fields: the weights as tensors, everything else ("config", "f0",
+# "version", "sr", ...) JSON-encoded in the header metadata.
+SAFETENSORS_EXT = ".safetensors"
+MODEL_FORMATS = ("pth", "safetensors")
+FORMAT_TAG = "rvc-voice"
+SAFETENSORS_DTYPES = {
+    torch.float16: "F16",
+    torch.bfloat16: "BF16",
+    torch.float32: "F32",
+    torch.float64: "F64",
+    torch.int32: "I32",
+    torch.int64: "I64",
+}
+MAPPED_DTYPES = {
+    **{name: dtype for dtype, name in SAFETENSORS_DTYPES.items()},
+    "BOOL": torch.bool,
+    "U8": torch.uint8,
+    "I8": torch.int8,
+    "I16": torch.int16,
+}
+
+
+def is_safetensors(path):
+    return str(path).lower().endswith(SAFETENSORS_EXT)
+
+
+def model_path_for_format(path, model_format):
+    """path with the extension model_format writes (.pth or .safetensors)."""
+    root, ext = os.path.splitext(path)
+    if ext.lower() not in (".pth", SAFETENSORS_EXT):
+        root = path
+    return root + (SAFETENSORS_EXT if model_format == "safetensors" else ".pth")
+
+
+def save_voice_model(opt, path):
+    """Write a voice model dict ({"weight": {...}, "config": [...], ...}) by extension."""
+    if not is_safetensors(path):
+        torch.save(opt, path)
+        return path
+
+    from safetensors.torch import save_file
+
+    metadata = encode_metadata(opt)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    save_file(
+        {key: value.contiguous() for key, value in opt["weight"].items()},
+        tmp_path,
+        metadata=metadata,
+    )
+    os.replace(tmp_path, path)
+    return path
+
+
+def encode_metadata(opt):
+    metadata = {"format": FORMAT_TAG}
+    for key, value in opt.items():
+        if key != "weight":
+            metadata[key] = json.dumps(value)
+    return metadata
+
+
+def decode_metadata(metadata, path):
+    metadata = metadata or {}
+    if metadata.get("format") != FORMAT_TAG:
+        raise ValueError(f"{path} is not an RVC voice model")
+    return {k: json.loads(v) for k, v in metadata.items() if k != "format"}
+
+
+def read_header(path):
+    """A safetensors file's JSON header and the offset its tensor data starts at."""
+    with open(path, "rb") as f:
+        (length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length))
+    return header, 8 + length
+
+
+def map_safetensors(path):
+    """
+    (metadata, {key: tensor}) for a safetensors file, every tensor a view of
+    one private read-only mapping of it built from the header offsets. Pages
+    stay file-backed, so processes mapping the same file share them through
+    the page cache; writing to a tensor copies only the pages it touches.
+    safe_open().get_tensor() is not used as it may copy into private memory.
+    """
+    header, data_start = read_header(path)
+    metadata = header.pop("__metadata__", None) or {}
+    storage = torch.UntypedStorage.from_file(
+        path, shared=False, nbytes=os.path.getsize(path)
+    )
+    data = torch.empty(0, dtype=torch.uint8).set_(storage)
+    tensors = {}
+    for key, info in header.items():
+        dtype = MAPPED_DTYPES[info["dtype"]]
+        start, end = info["data_offsets"]
+        raw = data[data_start + start : data_start + end]
+        if (data_start + start) % torch.empty((), dtype=dtype).element_size():
+            # A misaligned tensor cannot be viewed in place
+            raw = raw.clone()
+        tensors[key] = raw.view(dtype).view(info["shape"])
+    return metadata, tensors
+
+
+def read_metadata(path):
+    """The non-weight fields of a safetensors voice model, from its header only."""
+    return decode_metadata(read_header(path)[0].get("__metadata__"), path)
+
+
+def stream_voice_model(path, specs, produce, opt):
+    """
+    Write a safetensors voice model one tensor at a time. specs maps each key
+    to (dtype, shape), which fixes the header up front; produce(key) then
+    returns that tensor, so only one is held in memory while writing.
+    """
+    header = {"__metadata__": encode_metadata(opt)}
+    offset = 0
+    for key, (dtype, shape) in specs.items():
+        nbytes = math.prod(shape) * torch.empty((), dtype=dtype).element_size()
+        header[key] = {
+            "dtype": SAFETENSORS_DTYPES[dtype],
+            "shape": list(shape),
+            "data_offsets": [offset, offset + nbytes],
+        }
+        offset += nbytes
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+    # Tensor data starts 8-byte aligned, as safetensors itself writes it
+    header_bytes += b" " * (-len(header_bytes) % 8)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(struct.pack("<Q", len(header_bytes)))
+            f.write(header_bytes)
+            for key, (dtype, shape) in specs.items():
+                tensor = produce(key)
+                if tensor.dtype != dtype or tuple(tensor.shape) != tuple(shape):
+                    raise ValueError(
+                        f"{key}: expected {dtype} {tuple(shape)}, "
+                        f"got {tensor.dtype} {tuple(tensor.shape)}"
+                    )
+                f.write(tensor.contiguous().reshape(-1).view(torch.uint8).numpy())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+class MappedVoiceModel:
+    """
+    A voice model opened for reading one tensor at a time: the metadata and
+    every tensor's shape are known on opening, before any weight is read.
+    .pth files saved in the zip format are mapped too (torch.load(mmap=True));
+    legacy ones are loaded whole.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if is_safetensors(path):
+            metadata, self._weights = map_safetensors(path)
+            self.metadata = decode_metadata(metadata, path)
+            self.shapes = {
+                key: tuple(value.shape) for key, value in self._weights.items()
+            }
+            return
+
+        try:
+            cpt = torch.load(path, map_location="cpu", mmap=True)
+        except RuntimeError:
+            cpt = torch.load(path, map_location="cpu")
+        if "weight" in cpt:
+            self._weights = cpt.pop("weight")
+        else:
+            # A training checkpoint: its generator weights, minus the
+            # posterior encoder inference never uses
+            model = cpt.pop("model")
+            self._weights = {k: v for k, v in model.items() if "enc_q" not in k}
+        self.metadata = cpt
+        self.shapes = {key: tuple(value.shape) for key, value in self._weights.items()}
+
+    def get(self, key):
+        return self._weights[key]
+
+
+def load_voice_model(path):
+    """
+    The dict torch.load returns for a .pth model. For .safetensors the
+    weights are views of a read-only file mapping rather than private
+    copies, so processes serving the same voice share them through the page
+    cache until they are cast or moved to another device.
+    """
+    if not is_safetensors(path):
+        return torch.load(path, map_location="cpu")
+
+    metadata, weight = map_safetensors(path)
+    cpt = decode_metadata(metadata, path)
+    cpt["weight"] = weight
+    return cpt
+
+
+def convert_model(pth_path, output_path=None, dtype=None):
+    """
+    Rewrite a .pth voice model as safetensors. dtype ("float16"/"float32")
+    recasts the weights; float32 lets fp32 CPU workers use the mapping as is.
+    """
+    output_path = output_path or model_path_for_format(pth_path, "safetensors")
+    cpt = torch.load(pth_path, map_location="cpu")
+    if "weight" not in cpt or "config" not in cpt:
+        raise ValueError(f"{pth_path} is not an extracted voice model")
+    if dtype:
+        cpt["weight"] = {
+            key: value.to(getattr(torch, dtype)) if value.is_floating_point() else value
+            for key, value in cpt["weight"].items()
+        }
+    save_voice_model(dict(cpt), output_path)
+    print(f"Converted {pth_path} to {output_path}")
+    return output_path
+
+
+if __name__ == "__main__":
+    convert_model(
+        pth_path=sys.argv[1],
+        output_path=sys.argv[2] if len(sys.argv) > 2 and sys.argv[2] else None,
+        dtype=sys.argv[3] if len(sys.argv) > 3 and sys.argv[3] != "none" else None,
+    )
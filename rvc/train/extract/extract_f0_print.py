@@ -2,7 +2,6 @@ import os
 import sys
 import numpy as np
 import pyworld
-import torchcrepe
 import torch
 import parselmouth
 import tqdm
@@ -13,6 +12,8 @@ sys.path.append(current_directory)
 
 
 from rvc.lib.utils import load_audio
+from rvc.lib import f0_registry
+from rvc.lib.harvest import segmented_harvest
 
 
 exp_dir = sys.argv[1]
@@ -33,6 +34,7 @@ class FeatureInput:
     def __init__(self, sample_rate=16000, hop_size=160):
         self.fs = sample_rate
         self.hop = hop_size
+        self.harvest_workers = 1
 
         self.f0_method_dict = self.get_f0_method_dict()
 
@@ -63,7 +65,7 @@ class FeatureInput:
         audio = audio.detach()
 
         if method == "crepe":
-            pitch = torchcrepe.predict(
+            pitch = f0_registry.crepe_predict(
                 audio,
                 self.fs,
                 hop_length,
@@ -110,14 +112,14 @@ class FeatureInput:
         )
 
     def get_harvest(self, x):
-        f0_spectral = pyworld.harvest(
+        return segmented_harvest(
             x.astype(np.double),
-            fs=self.fs,
-            f0_ceil=self.f0_max,
-            f0_floor=self.f0_min,
+            self.fs,
+            self.f0_min,
+            self.f0_max,
             frame_period=1000 * self.hop / self.fs,
+            workers=self.harvest_workers,
         )
-        return pyworld.stonemask(x.astype(np.double), *f0_spectral, self.fs)
 
     def get_dio(self, x):
         f0_spectral = pyworld.dio(
@@ -130,11 +132,8 @@ class FeatureInput:
         return pyworld.stonemask(x.astype(np.double), *f0_spectral, self.fs)
 
     def get_rmvpe(self, x):
-        if not hasattr(self, "model_rmvpe"):
-            from rvc.lib.rmvpe import RMVPE
-
-            self.model_rmvpe = RMVPE("rmvpe.pt", is_half=False, device="cpu")
-        return self.model_rmvpe.infer_from_audio(x, thred=0.03)
+        model_rmvpe = f0_registry.rmvpe("cpu")
+        return model_rmvpe.infer_from_audio(x, thred=0.03)
 
     def get_f0_method_dict(self):
         return {
@@ -226,6 +225,11 @@ if __name__ == "__main__":
 
     processes = []
     print("Using f0 method: " + f0_method)
+    if f0_method == "rmvpe":
+        # Loaded once here and inherited by every forked worker
+        f0_registry.warm_up([f0_method], "cpu")
+    # With fewer files than processes, the idle cores split each file's Harvest
+    feature_input.harvest_workers = max(1, num_processes // max(1, len(paths)))
     for i in range(num_processes):
         p = Process(
             target=feature_input.process_paths,
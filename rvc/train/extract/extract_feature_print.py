@@ -3,13 +3,13 @@ import sys
 import tqdm
 import torch
 import torch.nn.functional as F
-import fairseq
 import soundfile as sf
 import numpy as np
 
-import logging
+now_dir = os.getcwd()
+sys.path.append(now_dir)
 
-logging.getLogger("fairseq").setLevel(logging.WARNING)
+from rvc.lib.hubert import convert, converted_path, load_hubert
 
 device = sys.argv[1]
 n_parts = int(sys.argv[2])
@@ -22,16 +22,7 @@ else:
     os.environ["CUDA_VISIBLE_DEVICES"] = str(i_gpu)
     version, is_half = sys.argv[6], bool(sys.argv[7])
 
-
-def forward_dml(ctx, x, scale):
-    ctx.scale = scale
-    res = x.clone().detach()
-    return res
-
-
-fairseq.modules.grad_multiply.GradMultiply.forward = forward_dml
-
-model_path = "hubert_base.pt"
+model_path = converted_path("hubert_base.pt")
 
 wav_path = f"{exp_dir}/1_16k_wavs"
 out_path = f"{exp_dir}/3_feature256" if version == "v1" else f"{exp_dir}/3_feature768"
@@ -52,15 +43,15 @@ def read_wave(wav_path, normalize=False):
 
 
 print("Starting feature extraction...")
-models, saved_cfg, task = fairseq.checkpoint_utils.load_model_ensemble_and_task(
-    [model_path],
-    suffix="",
+if not os.path.exists(model_path):
+    convert("hubert_base.pt", model_path)
+# v1 features come from layer 9, so the last three layers are never read
+model = load_hubert(
+    model_path,
+    device,
+    is_half=device not in ["mps", "cpu"],
+    num_layers=9 if version == "v1" else 12,
 )
-model = models[0]
-model = model.to(device)
-if device not in ["mps", "cpu"]:
-    model = model.half()
-model.eval()
 
 todo = sorted(os.listdir(wav_path))[i_part::n_parts]
 n = max(1, len(todo) // 10)
@@ -81,7 +72,7 @@ else:
                     if os.path.exists(out_file_path):
                         continue
 
-                    feats = read_wave(wav_file_path, normalize=saved_cfg.task.normalize)
+                    feats = read_wave(wav_file_path, normalize=model.normalize)
                     padding_mask = torch.BoolTensor(feats.shape).fill_(False)
                     inputs = {
                         "source": feats.to(device),
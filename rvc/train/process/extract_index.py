@@ -5,84 +5,149 @@ import numpy as np
 from sklearn.cluster import MiniBatchKMeans
 from multiprocessing import cpu_count
 
-exp_dir = sys.argv[1]
-version = sys.argv[2]
-
-try:
-    if version == "v1":
-        feature_dir = os.path.join(exp_dir, "3_feature256")
-    elif version == "v2":
-        feature_dir = os.path.join(exp_dir, "3_feature768")
-
-    npys = []
-    listdir_res = sorted(os.listdir(feature_dir))
-
-    for name in listdir_res:
-        file_path = os.path.join(feature_dir, name)
-        phone = np.load(file_path)
-        npys.append(phone)
-
-    big_npy = np.concatenate(npys, axis=0)
-
-    big_npy_idx = np.arange(big_npy.shape[0])
-    np.random.shuffle(big_npy_idx)
-    big_npy = big_npy[big_npy_idx]
-
-    if big_npy.shape[0] > 2e5:
-        big_npy = (
-            MiniBatchKMeans(
-                n_clusters=10000,
-                verbose=True,
-                batch_size=256 * cpu_count(),
-                compute_labels=False,
-                init="random",
-            )
-            .fit(big_npy)
-            .cluster_centers_
-        )
+INDEX_TYPES = ("ivf_flat", "hnsw", "ivf_pq", "ivf_sq8", "opq_ivf_pq")
+
+DEFAULT_INDEX_PARAMS = {
+    "nprobe": 1,
+    "M": 32,
+    "efConstruction": 40,
+    "efSearch": 64,
+    "pq_m": 64,
+    "nbits": 8,
+}
+
+
+def parse_index_params(params):
+    # "nprobe=8,pq_m=32" -> {"nprobe": 8, "pq_m": 32}, on top of the defaults
+    parsed = dict(DEFAULT_INDEX_PARAMS)
+    for item in filter(None, (params or "").split(",")):
+        key, value = item.split("=")
+        if key.strip() not in DEFAULT_INDEX_PARAMS:
+            raise ValueError(f"Unknown index parameter '{key}'")
+        parsed[key.strip()] = int(value)
+    return parsed
+
+
+def index_factory_string(index_type, n_ivf, params):
+    if index_type == "ivf_flat":
+        return f"IVF{n_ivf},Flat"
+    if index_type == "hnsw":
+        return f"HNSW{params['M']},Flat"
+    if index_type == "ivf_pq":
+        return f"IVF{n_ivf},PQ{params['pq_m']}x{params['nbits']}"
+    if index_type == "ivf_sq8":
+        return f"IVF{n_ivf},SQ8"
+    if index_type == "opq_ivf_pq":
+        return f"OPQ{params['pq_m']},IVF{n_ivf},PQ{params['pq_m']}x{params['nbits']}"
+    raise ValueError(
+        f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}"
+    )
 
-    np.save(os.path.join(exp_dir, "total_fea.npy"), big_npy)
 
-    n_ivf = min(int(16 * np.sqrt(big_npy.shape[0])), big_npy.shape[0] // 39)
+def query_params(index_type, params):
+    # Retrieval asks for k=8 neighbours, so HNSW must explore at least that many
+    if index_type == "hnsw":
+        return {"efSearch": max(params["efSearch"], 8)}
+    return {"nprobe": params["nprobe"]}
 
-    # index_trained
-    index_trained = faiss.index_factory(
-        256 if version == "v1" else 768, f"IVF{n_ivf},Flat"
-    )
-    index_ivf_trained = faiss.extract_index_ivf(index_trained)
-    index_ivf_trained.nprobe = 1
-    index_trained.train(big_npy)
 
-    index_filename_trained = (
-        f"trained_IVF{n_ivf}_Flat_nprobe_{index_ivf_trained.nprobe}_{version}.index"
+def build_index(big_npy, dim, index_type, n_ivf, params, add=True):
+    index = faiss.index_factory(dim, index_factory_string(index_type, n_ivf, params))
+    if index_type == "hnsw":
+        index.hnsw.efConstruction = params["efConstruction"]
+    index.train(big_npy)
+    faiss.ParameterSpace().set_index_parameters(
+        index, ",".join(f"{k}={v}" for k, v in query_params(index_type, params).items())
     )
-    index_filepath_trained = os.path.join(exp_dir, index_filename_trained)
-
-    faiss.write_index(index_trained, index_filepath_trained)
+    if add:
+        batch_size_add = 8192
+        for i in range(0, big_npy.shape[0], batch_size_add):
+            index.add(big_npy[i : i + batch_size_add])
+    return index
+
+
+def index_file_name(prefix, index_type, n_ivf, params, version):
+    # e.g. added_IVF256_Flat_nprobe_1_v2.index; VC.pipeline reads the query
+    # parameters back from this name
+    factory = index_factory_string(index_type, n_ivf, params).replace(",", "_")
+    query = "_".join(f"{k}_{v}" for k, v in query_params(index_type, params).items())
+    return f"{prefix}_{factory}_{query}_{version}.index"
+
+
+if __name__ == "__main__":
+    exp_dir = sys.argv[1]
+    version = sys.argv[2]
+    index_type = sys.argv[3] if len(sys.argv) > 3 else "ivf_flat"
+    index_params = parse_index_params(sys.argv[4] if len(sys.argv) > 4 else "")
+
+    try:
+        if version == "v1":
+            feature_dir = os.path.join(exp_dir, "3_feature256")
+        elif version == "v2":
+            feature_dir = os.path.join(exp_dir, "3_feature768")
+
+        npys = []
+        listdir_res = sorted(os.listdir(feature_dir))
+
+        for name in listdir_res:
+            file_path = os.path.join(feature_dir, name)
+            phone = np.load(file_path)
+            npys.append(phone)
+
+        big_npy = np.concatenate(npys, axis=0)
+
+        big_npy_idx = np.arange(big_npy.shape[0])
+        np.random.shuffle(big_npy_idx)
+        big_npy = big_npy[big_npy_idx]
+
+        if big_npy.shape[0] > 2e5:
+            big_npy = (
+                MiniBatchKMeans(
+                    n_clusters=10000,
+                    verbose=True,
+                    batch_size=256 * cpu_count(),
+                    compute_labels=False,
+                    init="random",
+                )
+                .fit(big_npy)
+                .cluster_centers_
+            )
 
-    # index_added
-    index_added = faiss.index_factory(
-        256 if version == "v1" else 768, f"IVF{n_ivf},Flat"
-    )
-    index_ivf_added = faiss.extract_index_ivf(index_added)
-    index_ivf_added.nprobe = 1
-    index_added.train(big_npy)
+        np.save(os.path.join(exp_dir, "total_fea.npy"), big_npy)
 
-    index_filename_added = (
-        f"added_IVF{n_ivf}_Flat_nprobe_{index_ivf_added.nprobe}_{version}.index"
-    )
-    index_filepath_added = os.path.join(exp_dir, index_filename_added)
+        n_ivf = min(int(16 * np.sqrt(big_npy.shape[0])), big_npy.shape[0] // 39)
+        dim = 256 if version == "v1" else 768
 
-    batch_size_add = 8192
-    for i in range(0, big_npy.shape[0], batch_size_add):
-        index_added.add(big_npy[i : i + batch_size_add])
+        if index_type in ("ivf_pq", "opq_ivf_pq") and big_npy.shape[0] < 39 * (
+            1 << index_params["nbits"]
+        ):
+            print(
+                f"Only {big_npy.shape[0]} vectors to train {index_params['nbits']}-bit PQ codebooks, "
+                "expect poor recall; a flat or SQ8 index is a better fit for this dataset."
+            )
 
-    faiss.write_index(index_added, index_filepath_added)
-    print(f"Saved index file '{index_filepath_added}'")
+        # index_trained
+        index_trained = build_index(
+            big_npy, dim, index_type, n_ivf, index_params, add=False
+        )
+        index_filepath_trained = os.path.join(
+            exp_dir,
+            index_file_name("trained", index_type, n_ivf, index_params, version),
+        )
+        faiss.write_index(index_trained, index_filepath_trained)
 
-except Exception as error:
-    print(f"Failed to train index: {error}")
-    if "one array to concatenate" in str(error):
-        print(
-            "If you are running this code in a virtual environment, make sure you have enough GPU available to generate the Index file."
+        # index_added
+        index_added = build_index(big_npy, dim, index_type, n_ivf, index_params)
+        index_filepath_added = os.path.join(
+            exp_dir,
+            index_file_name("added", index_type, n_ivf, index_params, version),
         )
+        faiss.write_index(index_added, index_filepath_added)
+        print(f"Saved index file '{index_filepath_added}'")
+
+    except Exception as error:
+        print(f"Failed to train index: {error}")
+        if "one array to concatenate" in str(error):
+            print(
+                "If you are running this code in a virtual environment, make sure you have enough GPU available to generate the Index file."
+            )
@@ -1,9 +1,9 @@
-import os
-import torch
 import hashlib
 import datetime
 from collections import OrderedDict
 
+from rvc.lib.model_io import model_path_for_format, save_voice_model
+
 
 def replace_keys_in_dict(d, old_key_part, new_key_part):
     if isinstance(d, OrderedDict):
@@ -18,13 +18,12 @@ def replace_keys_in_dict(d, old_key_part, new_key_part):
     return updated_dict
 
 
-def extract_model(ckpt, sr, if_f0, name, model_dir, epoch, step, version, hps):
+def extract_model(
+    ckpt, sr, if_f0, name, model_dir, epoch, step, version, hps, model_format="pth"
+):
     try:
+        model_dir = model_path_for_format(model_dir, model_format)
         print(f"Saved model '{model_dir}' (epoch {epoch} and step {step})")
-        pth_file = f"{name}_{epoch}e_{step}s.pth"
-        pth_file_old_version_path = os.path.join(
-            model_dir, f"{pth_file}_old_version.pth"
-        )
         opt = OrderedDict(
             weight={
                 key: value.half() for key, value in ckpt.items() if "enc_q" not in key
@@ -62,21 +61,17 @@ def extract_model(ckpt, sr, if_f0, name, model_dir, epoch, step, version, hps):
         model_hash = hashlib.sha256(hash_input.encode()).hexdigest()
         opt["model_hash"] = model_hash
 
-        torch.save(opt, model_dir)
-
-        model = torch.load(model_dir, map_location=torch.device("cpu"))
-        torch.save(
+        # Saved under the pre-parametrization weight_norm names, as before
+        save_voice_model(
             replace_keys_in_dict(
                 replace_keys_in_dict(
-                    model, ".parametrizations.weight.original1", ".weight_v"
+                    opt, ".parametrizations.weight.original1", ".weight_v"
                 ),
                 ".parametrizations.weight.original0",
                 ".weight_g",
             ),
-            pth_file_old_version_path,
+            model_dir,
         )
-        os.remove(model_dir)
-        os.rename(pth_file_old_version_path, model_dir)
 
     except Exception as error:
         print(error)
@@ -1,9 +1,15 @@
 import os
+import sys
 import torch
 import hashlib
 import datetime
 from collections import OrderedDict
 
+now_dir = os.getcwd()
+sys.path.append(now_dir)
+
+from rvc.lib.model_io import model_path_for_format, save_voice_model
+
 
 def replace_keys_in_dict(d, old_key_part, new_key_part):
     # Use OrderedDict if the original is an OrderedDict
@@ -21,11 +27,12 @@ def replace_keys_in_dict(d, old_key_part, new_key_part):
     return updated_dict
 
 
-def extract_small_model(path, name, sr, if_f0, version, epoch, step):
+def extract_small_model(
+    path, name, sr, if_f0, version, epoch, step, model_format="pth"
+):
     try:
         ckpt = torch.load(path, map_location="cpu")
-        pth_file = f"{name}.pth"
-        pth_file_old_version_path = os.path.join("logs", f"{pth_file}_old_version.pth")
+        model_file = model_path_for_format(name, model_format)
         opt = OrderedDict(
             weight={
                 key: value.half() for key, value in ckpt.items() if "enc_q" not in key
@@ -158,18 +165,29 @@ def extract_small_model(path, name, sr, if_f0, version, epoch, step):
         model_hash = hashlib.sha256(hash_input.encode()).hexdigest()
         opt["model_hash"] = model_hash
 
-        model = torch.load(pth_file_old_version_path, map_location=torch.device("cpu"))
-        torch.save(
+        # Saved under the pre-parametrization weight_norm names, as before
+        save_voice_model(
             replace_keys_in_dict(
                 replace_keys_in_dict(
-                    model, ".parametrizations.weight.original1", ".weight_v"
+                    opt, ".parametrizations.weight.original1", ".weight_v"
                 ),
                 ".parametrizations.weight.original0",
                 ".weight_g",
             ),
-            pth_file_old_version_path,
+            model_file,
         )
-        os.remove(pth_file_old_version_path)
-        os.rename(pth_file_old_version_path, pth_file)
     except Exception as error:
         print(error)
+
+
+if __name__ == "__main__":
+    extract_small_model(
+        path=sys.argv[1],
+        name=sys.argv[2],
+        sr=sys.argv[3],
+        if_f0=sys.argv[4],
+        version=sys.argv[5],
+        epoch=sys.argv[6],
+        step=sys.argv[7],
+        model_format=sys.argv[8] if len(sys.argv) > 8 else "pth",
+    )
@@ -1,63 +1,130 @@
 import os
 import torch
-from collections import OrderedDict
 
+from rvc.lib.model_io import MappedVoiceModel, stream_voice_model
 
-def extract(ckpt):
-    a = ckpt["model"]
-    opt = OrderedDict()
-    opt["weight"] = {}
-    for key in a.keys():
-        if "enc_q" in key:
-            continue
-        opt["weight"][key] = a[key]
-    return opt
+# emb_g holds one row per speaker; models trained with different speaker
+# counts are blended over the rows they share, as before
+SPEAKER_EMBEDDING = "emb_g.weight"
 
 
-def model_blender(name, path1, path2, ratio):
+def parse_weights(text):
+    """ "0.5,0.3,0.2" -> [0.5, 0.3, 0.2]"""
+    return [float(w) for w in str(text).split(",") if w.strip()]
+
+
+def parse_group_weights(text):
+    """ "dec=0.2,0.8;flow=1,0" -> {"dec": [0.2, 0.8], "flow": [1.0, 0.0]}"""
+    groups = {}
+    for item in str(text or "").split(";"):
+        if item.strip():
+            prefix, weights = item.split("=", 1)
+            groups[prefix.strip()] = parse_weights(weights)
+    return groups
+
+
+def normalize(weights, n_models, label):
+    if len(weights) != n_models:
+        raise ValueError(f"{label}: {len(weights)} weights for {n_models} models")
+    if any(w < 0 for w in weights) or sum(weights) <= 0:
+        raise ValueError(f"{label}: weights must be non-negative and not all zero")
+    return [w / sum(weights) for w in weights]
+
+
+def check_compatible(models):
+    """Compare architecture from metadata and shapes only; no weight is read."""
+    first = models[0]
+    for model in models[1:]:
+        for field in ("version", "f0"):
+            if model.metadata.get(field) != first.metadata.get(field):
+                raise ValueError(
+                    f"{model.path} has {field} {model.metadata.get(field)}, "
+                    f"{first.path} has {first.metadata.get(field)}"
+                )
+        # Everything but the speaker count (config[-3]) fixes the architecture
+        config, first_config = model.metadata["config"], first.metadata["config"]
+        if len(config) != len(first_config) or any(
+            i != len(config) - 3 and a != b
+            for i, (a, b) in enumerate(zip(config, first_config))
+        ):
+            raise ValueError(f"{model.path} and {first.path} have different configs")
+        if sorted(model.shapes) != sorted(first.shapes):
+            raise ValueError(
+                "Fail to merge the models. The model architectures are not the same."
+            )
+        for key, shape in first.shapes.items():
+            other = model.shapes[key]
+            if key == SPEAKER_EMBEDDING:
+                other, shape = other[1:], shape[1:]
+            if other != shape:
+                raise ValueError(f"{key} is {model.shapes[key]} in {model.path}")
+
+
+def model_blender(name, paths, weights=None, group_weights=None, output_path=None):
+    """
+    Blend N voice models into logs/<name>.safetensors. weights gives each
+    model's share (normalized to sum to 1, equal when omitted); group_weights
+    maps a key prefix ("dec", "flow", "enc_p.encoder") to its own shares,
+    the longest matching prefix winning. Tensors are read from the mapped
+    inputs and written one at a time, so memory stays around one tensor.
+    """
     try:
-        message = f"Model {path1} and {path2} are merged with alpha {ratio}."
-        ckpt1 = torch.load(path1, map_location="cpu")
-        ckpt2 = torch.load(path2, map_location="cpu")
-        cfg = ckpt1["config"]
-        cfg_f0 = ckpt1["f0"]
-        cfg_version = ckpt1["version"]
-
-        if "model" in ckpt1:
-            ckpt1 = extract(ckpt1)
-        else:
-            ckpt1 = ckpt1["weight"]
-        if "model" in ckpt2:
-            ckpt2 = extract(ckpt2)
-        else:
-            ckpt2 = ckpt2["weight"]
-
-        if sorted(list(ckpt1.keys())) != sorted(list(ckpt2.keys())):
-            return "Fail to merge the models. The model architectures are not the same."
-
-        opt = OrderedDict()
-        opt["weight"] = {}
-        for key in ckpt1.keys():
-            if key == "emb_g.weight" and ckpt1[key].shape != ckpt2[key].shape:
-                min_shape0 = min(ckpt1[key].shape[0], ckpt2[key].shape[0])
-                opt["weight"][key] = (
-                    ratio * (ckpt1[key][:min_shape0].float())
-                    + (1 - ratio) * (ckpt2[key][:min_shape0].float())
-                ).half()
-            else:
-                opt["weight"][key] = (
-                    ratio * (ckpt1[key].float()) + (1 - ratio) * (ckpt2[key].float())
-                ).half()
-
-        opt["config"] = cfg
-        opt["sr"] = message
-        opt["f0"] = cfg_f0
-        opt["version"] = cfg_version
-        opt["info"] = message
-
-        torch.save(opt, os.path.join("logs", "%s.pth" % name))
+        models = [MappedVoiceModel(path) for path in paths]
+        check_compatible(models)
+        n = len(models)
+        weights = normalize(weights or [1.0] * n, n, "weights")
+        groups = {
+            prefix: normalize(shares, n, prefix)
+            for prefix, shares in (group_weights or {}).items()
+        }
+        prefixes = sorted(groups, key=len, reverse=True)
+
+        def shares_for(key):
+            for prefix in prefixes:
+                if key == prefix or key.startswith(prefix + "."):
+                    return groups[prefix]
+            return weights
+
+        specs = {}
+        for key, shape in models[0].shapes.items():
+            if key == SPEAKER_EMBEDDING:
+                shape = (min(m.shapes[key][0] for m in models),) + shape[1:]
+            specs[key] = (torch.float16, shape)
+
+        def blend(key):
+            rows = specs[key][1][0] if key == SPEAKER_EMBEDDING else None
+            out = None
+            for model, share in zip(models, shares_for(key)):
+                tensor = model.get(key)
+                if rows is not None:
+                    tensor = tensor[:rows]
+                if out is None:
+                    out = tensor.float() * share
+                else:
+                    out.add_(tensor.float(), alpha=share)
+            return out.half()
+
+        message = "Model " + ", ".join(
+            f"{path} ({share:.2f})" for path, share in zip(paths, weights)
+        )
+        if groups:
+            message += " with group weights " + "; ".join(
+                f"{prefix}: {', '.join(f'{s:.2f}' for s in shares)}"
+                for prefix, shares in groups.items()
+            )
+        message += " are merged."
+        first = models[0].metadata
+        opt = {
+            "config": first["config"],
+            "sr": first.get("sr"),
+            "f0": first["f0"],
+            "version": first["version"],
+            "info": message,
+        }
+        output_path = output_path or os.path.join("logs", f"{name}.safetensors")
+        stream_voice_model(output_path, specs, blend, opt)
         print(message)
-        return message, os.path.join("logs", "%s.pth" % name)
+        return message, output_path
     except Exception as error:
         print(error)
-        return error
+        return str(error), None
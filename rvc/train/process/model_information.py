@@ -1,24 +1,32 @@
-import torch
 from datetime import datetime
 
+from rvc.lib.model_catalog import ModelCatalog
+
 
 def prettify_date(date_str):
     date_time_obj = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%S.%f")
     return date_time_obj.strftime("%Y-%m-%d %H:%M:%S")
 
 
-def model_information(path):
-    model_data = torch.load(path, map_location="cpu")
+def model_information(path, catalog=None):
+    # Served from the model catalog: only files changed since they were last
+    # catalogued are opened, and then without reading their weights. Callers
+    # holding a catalog pass it in (and serialise access to it themselves)
+    catalog = catalog or ModelCatalog()
+    model_data = catalog.get(path)
+    catalog.save()
+    if "error" in model_data:
+        raise ValueError(model_data["error"])
 
     print(f"Loaded model from {path}")
 
-    epochs = model_data.get("epoch", "None")
-    steps = model_data.get("step", "None")
-    sr = model_data.get("sr", "None")
+    epochs = model_data.get("epoch") or "None"
+    steps = model_data.get("step") or "None"
+    sr = model_data.get("sr") or "None"
     f0 = model_data.get("f0", "None")
-    version = model_data.get("version", "None")
-    creation_date = model_data.get("creation_date", "None")
-    model_hash = model_data.get("model_hash", "None")
+    version = model_data.get("version") or "None"
+    creation_date = model_data.get("creation_date") or "None"
+    model_hash = model_data.get("model_hash") or "None"
 
     pitch_guidance = "True" if f0 == 1 else "False"
 
@@ -24,19 +24,22 @@ class Slicer:
         self.min_interval = round(min_interval / self.hop_size)
         self.max_sil_kept = round(sr * max_sil_kept / 1000 / self.hop_size)
 
-    def _apply_slice(self, waveform, begin, end):
-        start_idx = begin * self.hop_size
-        if len(waveform.shape) > 1:
-            end_idx = min(waveform.shape[1], end * self.hop_size)
-            return waveform[:, start_idx:end_idx]
-        else:
-            end_idx = min(waveform.shape[0], end * self.hop_size)
-            return waveform[start_idx:end_idx]
+    def _slice_range(self, waveform, begin, end):
+        return begin * self.hop_size, min(waveform.shape[-1], end * self.hop_size)
 
     def slice(self, waveform):
+        ranges = self.slice_ranges(waveform)
+        if ranges is None:
+            return [waveform]
+        if len(waveform.shape) > 1:
+            return [waveform[:, start:end] for start, end in ranges]
+        return [waveform[start:end] for start, end in ranges]
+
+    def slice_ranges(self, waveform):
+        """Sample (start, end) of every slice, or None when waveform is not split."""
         samples = waveform.mean(axis=0) if len(waveform.shape) > 1 else waveform
         if samples.shape[0] <= self.min_length:
-            return [waveform]
+            return None
 
         rms_list = get_rms(
             y=samples, frame_length=self.win_size, hop_length=self.hop_size
@@ -122,20 +125,20 @@ class Slicer:
             sil_tags.append((pos, total_frames + 1))
 
         if not sil_tags:
-            return [waveform]
+            return None
         else:
             chunks = []
             if sil_tags[0][0] > 0:
-                chunks.append(self._apply_slice(waveform, 0, sil_tags[0][0]))
+                chunks.append(self._slice_range(waveform, 0, sil_tags[0][0]))
 
             for i in range(len(sil_tags) - 1):
                 chunks.append(
-                    self._apply_slice(waveform, sil_tags[i][1], sil_tags[i + 1][0])
+                    self._slice_range(waveform, sil_tags[i][1], sil_tags[i + 1][0])
                 )
 
             if sil_tags[-1][1] < total_frames:
                 chunks.append(
-                    self._apply_slice(waveform, sil_tags[-1][1], total_frames)
+                    self._slice_range(waveform, sil_tags[-1][1], total_frames)
                 )
 
             return chunks
@@ -576,6 +576,7 @@ def train_and_evaluate(rank, epoch, hps, nets, optims, scaler, loaders, writers,
                 global_step,
                 hps.version,
                 hps,
+                hps.model_format,
             )
 
     if hps.overtraining_detector == 1:
@@ -632,6 +633,7 @@ def train_and_evaluate(rank, epoch, hps, nets, optims, scaler, loaders, writers,
             global_step,
             hps.version,
             hps,
+            hps.model_format,
         )
         sleep(1)
         os._exit(2333333)
@@ -639,4 +641,4 @@ def train_and_evaluate(rank, epoch, hps, nets, optims, scaler, loaders, writers,
 
 if __name__ == "__main__":
     torch.multiprocessing.set_start_method("spawn")
-    main()
\ No newline at end of file
+    main()
@@ -190,6 +190,14 @@ def get_hparams():
         default=50,
         help="overtraining_threshold",
     )
+    parser.add_argument(
+        "-mf",
+        "--model_format",
+        type=str,
+        default="pth",
+        choices=["pth", "safetensors"],
+        help="file format of the extracted voice models",
+    )
 
     args = parser.parse_args()
     name = args.experiment_dir
@@ -215,6 +223,7 @@ def get_hparams():
     hparams.data.training_files = f"{experiment_dir}/filelist.txt"
     hparams.overtraining_detector = args.overtraining_detector
     hparams.overtraining_threshold = args.overtraining_threshold
+    hparams.model_format = args.model_format
     return hparams
 
 
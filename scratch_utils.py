@@ -0,0 +1,271 @@
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+_JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ScratchQuotaExceeded(Exception):
+    pass
+
+
+class _Job:
+    __slots__ = ("path", "expires_at", "reserved", "used", "adopted")
+
+    def __init__(
+        self, path: str, expires_at: float, reserved: int, adopted: bool = False
+    ):
+        self.path = path
+        self.expires_at = expires_at
+        self.reserved = reserved
+        self.used = 0
+        # 다른 프로세스(다른 uvicorn 워커, 재시작 전 프로세스)가 만든 디렉터리
+        self.adopted = adopted
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class ScratchSpace:
+    """작업 디렉터리를 TTL/쿼터로 관리하고 단일 reaper 스레드로 정리한다.
+
+    - 각 작업은 예약 용량(reserve_bytes)만큼 쿼터를 차지하고, 실제 사용량이 더 크면 실제 사용량으로 계산한다.
+    - tmpfs 여유 공간이 예약 용량을 감당할 수 있으면 tmpfs 에, 아니면 디스크 임시 폴더에 만든다.
+    - 쿼터를 넘기는 새 작업은 디스크를 채우는 대신 ScratchQuotaExceeded 로 거절한다.
+    - hold=True 로 만든 작업은 처리 중 만료되지 않고, start_ttl() 을 부른 시점부터 TTL 이 흐른다.
+    - 디스크에만 있는 작업 디렉터리(재시작 전 프로세스나 다른 워커가 만든 것)는 reaper 가
+      매 주기마다, 또는 path() 조회 시 등록해 쿼터에 포함하고 mtime + TTL 에 만료시킨다.
+      살아 있는 작업은 소유 프로세스의 reaper 가 매 주기 mtime 을 갱신하므로 다른
+      프로세스가 먼저 지우지 않는다.
+    """
+
+    def __init__(
+        self,
+        quota_bytes: int,
+        default_ttl: float,
+        reserve_bytes: int,
+        tmpfs_dir: Optional[str] = "/dev/shm",
+        disk_dir: Optional[str] = None,
+        reap_interval: float = 10.0,
+        name: str = "yass-scratch",
+    ):
+        self.quota_bytes = quota_bytes
+        self.default_ttl = default_ttl
+        self.reserve_bytes = reserve_bytes
+        self.reap_interval = reap_interval
+
+        self.disk_root = os.path.join(disk_dir or tempfile.gettempdir(), name)
+        os.makedirs(self.disk_root, exist_ok=True)
+        self.tmpfs_root = None
+        if tmpfs_dir and os.path.isdir(tmpfs_dir) and os.access(tmpfs_dir, os.W_OK):
+            self.tmpfs_root = os.path.join(tmpfs_dir, name)
+            os.makedirs(self.tmpfs_root, exist_ok=True)
+
+        self._jobs: Dict[str, _Job] = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+        self._stop = threading.Event()
+        # 재시작 직후 요청이 없어도 이전 프로세스의 디렉터리를 정리한다
+        self._ensure_reaper()
+
+    @classmethod
+    def from_env(cls) -> "ScratchSpace":
+        return cls(
+            quota_bytes=int(os.environ.get("SCRATCH_QUOTA_MB", "2048")) * 1024 * 1024,
+            default_ttl=float(os.environ.get("SCRATCH_TTL_SECONDS", "600")),
+            reserve_bytes=int(os.environ.get("SCRATCH_JOB_RESERVE_MB", "200"))
+            * 1024
+            * 1024,
+            tmpfs_dir=os.environ.get("SCRATCH_TMPFS_DIR", "/dev/shm") or None,
+            disk_dir=os.environ.get("SCRATCH_DISK_DIR") or None,
+        )
+
+    # ---- 작업 등록/조회 ----
+
+    def _roots(self):
+        return [root for root in (self.disk_root, self.tmpfs_root) if root is not None]
+
+    def _adopt(self, job_id: str, path: str) -> Optional[_Job]:
+        """디스크에만 있는 작업 디렉터리를 mtime + TTL 만료로 등록한다 (락을 잡은 채 호출)."""
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        job = _Job(path, mtime + self.default_ttl, 0, adopted=True)
+        self._jobs[job_id] = job
+        return job
+
+    def _committed(self) -> int:
+        return sum(max(job.reserved, job.used) for job in self._jobs.values())
+
+    def _pick_root(self, reserve: int) -> str:
+        if self.tmpfs_root is not None:
+            tmpfs_reserved = sum(
+                max(job.reserved, job.used) - job.used
+                for job in self._jobs.values()
+                if job.path.startswith(self.tmpfs_root)
+            )
+            if shutil.disk_usage(self.tmpfs_root).free - tmpfs_reserved >= reserve:
+                return self.tmpfs_root
+        return self.disk_root
+
+    def create_job(
+        self,
+        ttl: Optional[float] = None,
+        reserve_bytes: Optional[int] = None,
+        hold: bool = False,
+    ) -> Tuple[str, str]:
+        reserve = self.reserve_bytes if reserve_bytes is None else reserve_bytes
+        with self._lock:
+            committed = self._committed()
+            if committed + reserve > self.quota_bytes:
+                raise ScratchQuotaExceeded(
+                    f"Scratch quota exceeded: {committed + reserve} > {self.quota_bytes} bytes"
+                )
+            root = self._pick_root(reserve)
+            if root == self.disk_root and shutil.disk_usage(root).free < reserve:
+                raise ScratchQuotaExceeded(f"Not enough free disk space in {root}")
+
+            job_id = uuid.uuid4().hex
+            path = os.path.join(root, job_id)
+            os.makedirs(path)
+            # hold: 다운로드/분리가 끝날 때까지 reaper 가 지우지 않도록 만료 시각을 두지 않는다
+            expires_at = (
+                float("inf") if hold else time.time() + (ttl or self.default_ttl)
+            )
+            self._jobs[job_id] = _Job(path, expires_at, reserve)
+
+        self._ensure_reaper()
+        return job_id, path
+
+    def path(self, job_id: str) -> Optional[str]:
+        if not _JOB_ID_RE.match(job_id):
+            return None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                # 재시작 전이나 다른 워커에서 발급한 스트림 URL
+                for root in self._roots():
+                    candidate = os.path.join(root, job_id)
+                    if os.path.isdir(candidate):
+                        job = self._adopt(job_id, candidate)
+                        break
+            return job.path if job is not None else None
+
+    def start_ttl(self, job_id: str, ttl: Optional[float] = None):
+        """만료 시각을 now + ttl 로 새로 잡는다 (hold 로 만든 작업의 처리가 끝난 뒤 호출)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.expires_at = time.time() + (ttl or self.default_ttl)
+
+    def touch(self, job_id: str, ttl: float):
+        """만료 시각을 최소 now + ttl 까지 늘린다 (스트리밍 중인 작업 유지용)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.expires_at = max(job.expires_at, time.time() + ttl)
+
+    def expire(self, job_id: str, grace: float):
+        """만료 시각을 최대 now + grace 로 당긴다 (스트림 완료 후 정리용)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.expires_at = min(job.expires_at, time.time() + grace)
+
+    def release(self, job_id: str):
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is not None:
+            shutil.rmtree(job.path, ignore_errors=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "jobs": len(self._jobs),
+                "committed_bytes": self._committed(),
+                "used_bytes": sum(job.used for job in self._jobs.values()),
+                "quota_bytes": self.quota_bytes,
+            }
+
+    # ---- reaper ----
+
+    def _ensure_reaper(self):
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(
+                target=self._reap_loop, name="scratch-reaper", daemon=True
+            )
+            self._reaper.start()
+
+    def _adopt_orphans(self):
+        for root in self._roots():
+            try:
+                names = os.listdir(root)
+            except OSError:
+                continue
+            for name in names:
+                if not _JOB_ID_RE.match(name):
+                    continue
+                with self._lock:
+                    if name not in self._jobs:
+                        self._adopt(name, os.path.join(root, name))
+
+    def reap_once(self):
+        self._adopt_orphans()
+        now = time.time()
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items() if job.expires_at <= now
+            ]
+            expired_jobs = [self._jobs.pop(job_id) for job_id in expired]
+            alive = list(self._jobs.items())
+
+        for job in expired_jobs:
+            print(f"[CLEANUP] Deleting temp dir: {job.path}")
+            shutil.rmtree(job.path, ignore_errors=True)
+
+        # 실제 사용량은 락 밖에서 측정 후 반영
+        for job_id, job in alive:
+            try:
+                if job.adopted:
+                    # 소유 프로세스가 살아 있는 동안은 mtime 이 계속 갱신된다
+                    mtime = os.stat(job.path).st_mtime
+                    job.expires_at = max(job.expires_at, mtime + self.default_ttl)
+                else:
+                    os.utime(job.path)
+            except FileNotFoundError:
+                # 소유 프로세스가 이미 지운 디렉터리
+                with self._lock:
+                    if self._jobs.get(job_id) is job:
+                        del self._jobs[job_id]
+                continue
+            except OSError:
+                pass
+            job.used = _dir_size(job.path)
+
+    def _reap_loop(self):
+        while True:
+            try:
+                self.reap_once()
+            except Exception as e:
+                print("❌ [CLEANUP] reaper error:", e)
+            if self._stop.wait(self.reap_interval):
+                break
+
+    def shutdown(self):
+        self._stop.set()
@@ -0,0 +1,206 @@
+import os
+import re
+import stat
+import typing
+from email.utils import formatdate, parsedate_to_datetime
+
+import anyio
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+# os.pread 한 번에 읽어 보내는 크기
+CHUNK_SIZE = 1024 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def make_etag(stat_result: os.stat_result) -> str:
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+def parse_range(
+    range_header: str, file_size: int
+) -> typing.Optional[typing.Tuple[int, int]]:
+    """단일 `bytes=` 범위를 (start, end) 로 변환. 해석 불가하면 None, 만족 불가하면 ValueError."""
+    match = _RANGE_RE.match(range_header.strip())
+    if match is None:
+        # 다중 범위나 다른 단위는 무시하고 전체 파일로 응답 (RFC 9110 허용)
+        return None
+
+    first, last = match.groups()
+    if first == "" and last == "":
+        return None
+
+    if first == "":
+        # suffix range: 마지막 N 바이트
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(file_size - suffix, 0), file_size - 1
+
+    start = int(first)
+    end = int(last) if last != "" else file_size - 1
+    if start >= file_size or start > end:
+        raise ValueError("Unsatisfiable range")
+    return start, min(end, file_size - 1)
+
+
+def _etag_matches(header_value: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in header_value.split(",")]
+    # If-None-Match 는 weak 비교
+    return "*" in candidates or any(
+        tag.removeprefix("W/") == etag for tag in candidates
+    )
+
+
+def _not_modified_since(header_value: str, stat_result: os.stat_result) -> bool:
+    try:
+        since = parsedate_to_datetime(header_value).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(stat_result.st_mtime) <= since
+
+
+class RangeFileResponse(Response):
+    """Range/조건부 요청을 지원하는 파일 응답.
+
+    본문은 스레드에서 `os.pread` 로 읽은 청크로 보낸다 (zero-copy 아님: uvicorn 은
+    sendfile 용 ASGI 확장을 제공하지 않는다). on_complete 는 파일 끝까지의 본문을
+    클라이언트 연결이 끊기지 않은 채 모두 보낸 경우에만 실행된다. 끝부분만 읽는
+    suffix range(`bytes=-N`)는 재생 완료로 보지 않는다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        request_headers: typing.Mapping[str, str],
+        media_type: str = "application/octet-stream",
+        method: str = "GET",
+        on_complete: typing.Optional[BackgroundTask] = None,
+    ) -> None:
+        self.path = path
+        self.media_type = media_type
+        self.background = None
+        self.on_complete = on_complete
+        self.send_header_only = method.upper() == "HEAD"
+
+        self.stat_result = os.stat(path)
+        if not stat.S_ISREG(self.stat_result.st_mode):
+            raise RuntimeError(f"File at path {path} is not a file.")
+
+        file_size = self.stat_result.st_size
+        etag = make_etag(self.stat_result)
+        headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "last-modified": formatdate(self.stat_result.st_mtime, usegmt=True),
+            "cache-control": "no-cache",
+        }
+
+        self.status_code = 200
+        self.start, self.end = 0, file_size - 1
+        suffix_range = False
+
+        if_none_match = request_headers.get("if-none-match")
+        if_modified_since = request_headers.get("if-modified-since")
+        if (if_none_match is not None and _etag_matches(if_none_match, etag)) or (
+            if_none_match is None
+            and if_modified_since is not None
+            and _not_modified_since(if_modified_since, self.stat_result)
+        ):
+            self.status_code = 304
+        else:
+            range_header = request_headers.get("range")
+            if_range = request_headers.get("if-range")
+            if range_header is not None and if_range is not None:
+                # If-Range 가 현재 표현과 다르면 Range 를 무시하고 전체를 보낸다
+                if if_range.startswith('"') or if_range.startswith("W/"):
+                    if if_range != etag:
+                        range_header = None
+                elif not _not_modified_since(if_range, self.stat_result):
+                    range_header = None
+
+            if range_header is not None and file_size > 0:
+                try:
+                    byte_range = parse_range(range_header, file_size)
+                except ValueError:
+                    self.status_code = 416
+                    headers["content-range"] = f"bytes */{file_size}"
+                    byte_range = None
+                if byte_range is not None:
+                    self.status_code = 206
+                    self.start, self.end = byte_range
+                    suffix_range = range_header.strip().startswith("bytes=-")
+                    headers["content-range"] = (
+                        f"bytes {self.start}-{self.end}/{file_size}"
+                    )
+
+        if self.status_code in (304, 416):
+            self.count = 0
+        else:
+            self.count = self.end - self.start + 1
+        # 전체 응답이거나, 시작 위치를 지정해 파일 끝까지 요청한 경우 (탐색 후 재생)
+        self.reaches_end = (
+            self.count > 0
+            and self.end == file_size - 1
+            and not (self.status_code == 206 and suffix_range)
+        )
+        if self.status_code != 304:
+            headers["content-length"] = str(self.count)
+
+        self.init_headers(headers)
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if self.send_header_only or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        sent_all = False
+
+        async def stream_body():
+            nonlocal sent_all
+            sent_all = await self._send_body(send)
+            task_group.cancel_scope.cancel()
+
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(stream_body)
+            # 연결이 끊기면 전송을 중단한다 (uvicorn 은 끊긴 뒤의 send 를 조용히 무시)
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            task_group.cancel_scope.cancel()
+
+        if sent_all and self.reaches_end and self.on_complete is not None:
+            await self.on_complete()
+
+    async def _send_body(self, send) -> bool:
+        """본문을 청크로 보내고, 요청한 범위를 모두 보냈으면 True."""
+        with open(self.path, "rb") as file:
+            fd = file.fileno()
+            offset, remaining = self.start, self.count
+            while remaining > 0:
+                chunk = await anyio.to_thread.run_sync(
+                    os.pread, fd, min(CHUNK_SIZE, remaining), offset
+                )
+                if not chunk:
+                    break
+                offset += len(chunk)
+                remaining -= len(chunk)
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": remaining > 0,
+                    }
+                )
+        if remaining > 0:
+            # 전송 중 파일이 잘린 경우 응답을 닫는다
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return False
+        return True
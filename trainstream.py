@@ -14,7 +14,7 @@ logs_path = os.path.join(current_script_directory, "logs")
 
 # Preprocess
 def run_preprocess_script(model_name, dataset_path, sampling_rate):
-    per = 3.0 if config.is_half else 3.7
+    per = config.preprocess_per
     preprocess_script_path = os.path.join("rvc", "train", "preprocess", "preprocess.py")
     command = [
         "python",
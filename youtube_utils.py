@@ -1,7 +1,11 @@
+import os
+import shlex
 import subprocess
 import json
+from metrics_utils import observe_stage
 
-YTDLP_CMD = [
+# YTDLP_CMD 환경변수로 교체 가능 (부하 테스트에서는 로컬 fake yt-dlp 사용)
+YTDLP_CMD = shlex.split(os.environ["YTDLP_CMD"]) if os.environ.get("YTDLP_CMD") else [
     "/usr/bin/sudo", "-u", "user1",
     "/home/user1/.local/bin/yt-dlp",
     "--cookies-from-browser", "chrome"
@@ -10,7 +14,8 @@ YTDLP_CMD = [
 def get_video_duration(url: str) -> int:
     command = YTDLP_CMD + ["--skip-download", "--print-json", url]
     try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
+        with observe_stage("probe"):
+            result = subprocess.run(command, capture_output=True, text=True, check=True)
         info = json.loads(result.stdout)
 
         duration = info.get("duration")
@@ -26,7 +31,8 @@ def get_video_duration(url: str) -> int:
 def validate_youtube_exists(url: str) -> bool:
     command = YTDLP_CMD + ["--skip-download", "--print-json", url]
     try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
+        with observe_stage("probe"):
+            result = subprocess.run(command, capture_output=True, text=True, check=True)
         info = json.loads(result.stdout)
         return "duration" in info
     except Exception as e: